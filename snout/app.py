@@ -3,12 +3,16 @@ Snout - eBay Reseller Price Lookup API
 """
 import functools
 import logging
+import math
 import os
-from dataclasses import asdict
+import time
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.datastructures import Headers, MultiDict
 
 # Load .env from snout/ directory
 load_dotenv(Path(__file__).parent / ".env", override=True)
@@ -18,10 +22,28 @@ from flask_limiter.util import get_remote_address
 
 from .config import BROWSE_BUYING_OPTIONS_MAP, BROWSE_CONDITION_MAP, BROWSE_SORT_MAP, CONDITION_MAP, SORT_MAP, Config, setup_logging
 from .services import EbayFindingService, calculate_price_stats
-from .services.auth_service import AuthError, EbayAuthService
-from .services.ebay_browse_service import BrowseApiError, BrowseSearchQuery, EbayBrowseService
-from .services.ebay_service import EbayApiError, SearchQuery
-from .services.price_analyzer import compare_prices
+from .services.auth_service import AuthError, EbayAuthService, FileTokenStore, MemoryTokenStore
+from .services.change_tracker import ChangeTracker
+from .services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from .services.ebay_service import EbayApiError, EbayItem, SearchQuery
+from .services.fanout import DeadlineExceeded, FanOutExecutor
+from .services.http_transport import HttpTransport
+from .services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .services.metrics import RATE_LIMITED, REGISTRY, REQUEST_SECONDS, SERIALIZE_SECONDS, render_family
+from .services.price_analyzer import (
+    DEFAULT_PERCENTILES,
+    TRIM_METHODS,
+    PriceAccumulator,
+    calculate_extended_stats,
+    compare_prices,
+)
+from .services.price_history import TREND_INTERVALS, PriceHistoryStore
+from .services.rate_limit import QuotaAccountant, QuotaExhaustedError
+from .services.resilience import CircuitOpenError
+from .services.watchlist import Watchlist, WatchlistFullError
+from .services.search_cache import build_search_cache
+from .utils import json_codec
+from .utils.http_cache import CachePolicy, cacheable_response
 from .utils.validators import ValidationError, validate_keywords, validate_price
 
 # Initialize logging
@@ -32,33 +54,114 @@ logger = setup_logging(
 # Load configuration
 config = Config.from_env()
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app, origins=[
+# Allowed browser origins (shared with the ASGI entry point)
+CORS_ORIGINS = [
     "https://stephenbeale.github.io",
     "http://localhost:5173",
     "http://localhost:5174",
-])
+]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding with orjson when installed, and recording
+    encode time for every response body and stream frame.
+
+    Bodies are compact UTF-8 with sorted keys. Unlike Flask's default
+    provider, non-ASCII characters are written as UTF-8 rather than
+    ``\\uXXXX`` escapes (orjson cannot escape them); the decoded JSON is the
+    same.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        with SERIALIZE_SECONDS.time():
+            if kwargs:
+                return super().dumps(obj, **kwargs)
+            return json_codec.dumps(obj, default=self.default, sort_keys=self.sort_keys).decode()
+
+    def encode_body(self, obj) -> bytes:
+        """Encode a response body; the ASGI routes use this too, so both give identical bytes and ETags."""
+        with SERIALIZE_SECONDS.time():
+            return json_codec.dumps(obj, default=self.default, sort_keys=self.sort_keys) + b"\n"
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(obj)
+        return self._app.response_class(self.encode_body(obj), mimetype=self.mimetype)
+
+
+# Initialize Flask app
+app = Flask(__name__)
+app.json = FastJSONProvider(app)
+CORS(app, origins=CORS_ORIGINS)
 
 # Initialize rate limiter
 limiter = Limiter(
     key_func=get_remote_address,
     app=app,
     default_limits=[config.rate_limit_default],
-    storage_uri="memory://",
+    storage_uri=config.rate_limit_storage_uri,
 )
 
 # API key for request authentication
 SNOUT_API_KEY = os.environ.get("SNOUT_API_KEY")
 
+# Shared executor bounding concurrent eBay searches across both services
+fanout = FanOutExecutor(config.fanout_workers)
+
+# Keep-alive connection pool shared by every eBay client
+http_transport = HttpTransport.from_config(config)
+
+# Daily eBay call budgets, shared by workers through the rate-limit storage
+quota = QuotaAccountant.from_config(config)
+
+
+def build_cache_policies(config: Config) -> dict[str, CachePolicy]:
+    """Cache-Control policies for active- and sold-listing responses."""
+    return {
+        "active": CachePolicy(config.http_cache_active_max_age, config.search_cache_stale_ttl),
+        "sold": CachePolicy(config.http_cache_sold_max_age, config.search_cache_stale_ttl),
+    }
+
+
+# HTTP caching of search responses
+cache_policies = build_cache_policies(config)
+compress_min_size = config.http_compress_min_size
+
 # Initialize eBay services
-ebay_service = EbayFindingService(config)
+ebay_service = EbayFindingService(
+    config, cache=build_search_cache(config, EbayItem), executor=fanout, transport=http_transport, quota=quota
+)
+
+
+def build_browse_services(
+    config: Config, transport: HttpTransport, quota: QuotaAccountant | None = None
+) -> tuple[EbayAuthService | None, EbayBrowseService | None]:
+    """Build the OAuth and Browse services, or (None, None) without APP_ID + CERT_ID."""
+    if not (config.ebay_app_id and config.ebay_cert_id):
+        return None, None
+
+    auth = EbayAuthService(
+        config.ebay_app_id,
+        config.ebay_cert_id,
+        config.ebay_token_endpoint,
+        store=FileTokenStore(config.token_store_path) if config.token_store_path else MemoryTokenStore(),
+        refresh_fraction=config.token_refresh_fraction,
+        transport=transport,
+    )
+    browse = EbayBrowseService(
+        config, auth, cache=build_search_cache(config, BrowseItem), executor=fanout, transport=transport,
+        quota=quota,
+    )
+    return auth, browse
+
 
 # Initialize Browse API service (requires both app_id and cert_id)
-browse_service = None
-if config.ebay_app_id and config.ebay_cert_id:
-    auth_service = EbayAuthService(config.ebay_app_id, config.ebay_cert_id, config.ebay_token_endpoint)
-    browse_service = EbayBrowseService(config, auth_service)
+auth_service, browse_service = build_browse_services(config, http_transport, quota)
+
+# Local price history (disabled unless PRICE_HISTORY_PATH is set)
+price_history = PriceHistoryStore(config.price_history_path) if config.price_history_path else None
 
 
 def require_api_key(f):
@@ -74,20 +177,76 @@ def require_api_key(f):
     return decorated
 
 
+def response_vary() -> tuple[str, ...]:
+    """Request headers that cacheable responses vary on."""
+    return ("Accept-Encoding", "X-Snout-Key") if SNOUT_API_KEY else ("Accept-Encoding",)
+
+
+def http_cached(kind: str):
+    """
+    Decorator giving a view's 200 JSON responses an ETag plus Cache-Control
+    and Vary headers for the "active" or "sold" policy, answering a matching
+    If-None-Match with 304 and compressing large bodies. Streamed responses
+    pass through unchanged.
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated(*args, **kwargs):
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            status, body, headers = cacheable_response(
+                response.get_data(),
+                cache_policies[kind],
+                request.headers.get("If-None-Match"),
+                request.headers.get("Accept-Encoding"),
+                vary=response_vary(),
+                min_compress_size=compress_min_size,
+            )
+            response.status_code = status
+            response.set_data(body)
+            response.headers.update(headers)
+            return response
+        return decorated
+    return decorator
+
+
+@app.before_request
+def start_request_timer():
+    """Note when handling started, for the request duration histogram."""
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def observe_request_time(response: Response) -> Response:
+    """Record how long the request took, by endpoint, method and status."""
+    started = g.get("request_started")
+    if started is not None:
+        REQUEST_SECONDS.labels(
+            request.endpoint or "unmatched", request.method, str(response.status_code)
+        ).observe(time.perf_counter() - started)
+    return response
+
+
 @app.errorhandler(429)
 def handle_rate_limit(e):
     """Return JSON for rate-limit errors instead of HTML."""
+    RATE_LIMITED.labels(request.endpoint or "unmatched").inc()
     return jsonify({"error": "Rate limit exceeded", "retry_after": e.description}), 429
 
 
-def parse_filter_params() -> dict:
-    """Parse common filter parameters from request args."""
-    condition = request.args.get("condition")
-    min_price = request.args.get("min_price", type=float)
-    max_price = request.args.get("max_price", type=float)
-    sort = request.args.get("sort")
-    listing_type = request.args.get("listing_type")
-    uk_only = request.args.get("uk_only", "").lower() == "true"
+def parse_filter_params(args: MultiDict | None = None) -> dict:
+    """Parse common filter parameters from request args (defaults to the current request)."""
+    if args is None:
+        args = request.args
+
+    condition = args.get("condition")
+    min_price = args.get("min_price", type=float)
+    max_price = args.get("max_price", type=float)
+    sort = args.get("sort")
+    listing_type = args.get("listing_type")
+    uk_only = args.get("uk_only", "").lower() == "true"
 
     # Validate prices
     min_price = validate_price(min_price, "min_price")
@@ -128,31 +287,261 @@ def build_filters_response(
     return filters if filters else None
 
 
+def cache_allowed(args: MultiDict | None = None, headers: Headers | None = None) -> bool:
+    """Check whether the request allows a cached response (defaults to the current request)."""
+    if args is None:
+        args, headers = request.args, request.headers
+
+    if args.get("cache", "").lower() == "false":
+        return False
+    return "no-cache" not in headers.get("Cache-Control", "").lower()
+
+
 def items_to_dicts(items) -> list[dict]:
     """Convert EbayItem objects to dictionaries."""
-    result = []
-    for item in items:
-        d = {
-            "title": item.title,
-            "price": item.price,
-            "currency": item.currency,
-            "item_id": item.item_id,
-            "url": item.url,
-            "condition": item.condition,
-            "listing_type": item.listing_type,
-        }
-        if item.sold_date:
-            d["sold_date"] = item.sold_date
-        result.append(d)
-    return result
+    return [item.to_dict() for item in items]
 
 
 def browse_items_to_dicts(items) -> list[dict]:
     """Convert BrowseItem objects to dictionaries."""
-    return [asdict(item) for item in items]
+    return [item.to_dict() for item in items]
+
+
+def parse_browse_query(args: MultiDict) -> tuple[str, dict, BrowseSearchQuery]:
+    """
+    Validate /api/search args and build the Browse query.
+
+    Args:
+        args: Request query args
+
+    Returns:
+        Tuple of (keywords, filters, query)
+
+    Raises:
+        ValidationError: If keywords or prices are invalid
+    """
+    keywords = validate_keywords(
+        args.get("q"),
+        max_length=config.max_keyword_length,
+    )
+
+    filters = parse_filter_params(args)
+    limit = min(args.get("limit", 50, type=int), 200)
+    offset = args.get("offset", 0, type=int)
+
+    query = BrowseSearchQuery(
+        keywords=keywords,
+        condition=filters["condition"],
+        min_price=filters["min_price"],
+        max_price=filters["max_price"],
+        sort=filters["sort"],
+        listing_type=filters["listing_type"],
+        uk_only=filters["uk_only"],
+        marketplace=config.default_marketplace,
+        limit=limit,
+        offset=offset,
+    )
+    return keywords, filters, query
+
+
+def parse_deep_target(args: MultiDict) -> int | None:
+    """Parse the deep-mode result target, clamped to the configured maximum."""
+    target = args.get("deep", type=int)
+    if not target or target <= 0:
+        return None
+    return min(target, config.deep_search_max_items)
+
+
+def parse_extended_stats_params(args: MultiDict) -> dict | None:
+    """
+    Parse the opt-in extended stats params.
+
+    Returns:
+        Keyword arguments for calculate_extended_stats, or None unless
+        stats=extended was requested
+
+    Raises:
+        ValidationError: If percentiles, bins or trim are invalid
+    """
+    if args.get("stats", "").lower() != "extended":
+        return None
+
+    raw = args.get("percentiles")
+    try:
+        percentiles = [float(p) for p in raw.split(",")] if raw else list(DEFAULT_PERCENTILES)
+    except ValueError:
+        raise ValidationError("percentiles must be comma-separated numbers", field="percentiles")
+    if not 1 <= len(percentiles) <= 20 or any(p < 0 or p > 100 for p in percentiles):
+        raise ValidationError("percentiles must be 1-20 values between 0 and 100", field="percentiles")
+
+    bins = args.get("bins", 10, type=int)
+    if not 1 <= bins <= 100:
+        raise ValidationError("bins must be between 1 and 100", field="bins")
+
+    trim = args.get("trim", "iqr").lower()
+    if trim not in TRIM_METHODS:
+        raise ValidationError(f"trim must be one of: {', '.join(TRIM_METHODS)}", field="trim")
+
+    return {"percentiles": percentiles, "bins": bins, "trim": trim}
+
+
+def extended_stats_dict(prices, extended: dict | None) -> dict | None:
+    """Calculate extended stats as a dict when requested."""
+    if extended is None:
+        return None
+    stats = calculate_extended_stats(prices, **extended)
+    return stats.to_dict() if stats else None
+
+
+def build_browse_filters(filters: dict) -> dict | None:
+    """Build the filters block of a Browse response."""
+    return build_filters_response(
+        filters["condition"],
+        filters["min_price"],
+        filters["max_price"],
+        filters["sort"],
+        filters["listing_type"],
+        filters["uk_only"],
+    )
+
+
+def build_browse_response(
+    keywords: str,
+    filters: dict,
+    query: BrowseSearchQuery,
+    items,
+    deep: int | None = None,
+    extended: dict | None = None,
+) -> dict:
+    """Build the /api/search response body, with stats over total_price."""
+    stats = calculate_price_stats(items, attr="total_price")
+
+    response = {
+        "query": keywords,
+        "filters": build_browse_filters(filters),
+        "stats": stats.to_dict() if stats else None,
+        "items": browse_items_to_dicts(items),
+        "pagination": {
+            "limit": deep or query.limit,
+            "offset": query.offset,
+            "returned": len(items),
+            "deep": deep is not None,
+        },
+    }
+    if extended is not None:
+        response["extended_stats"] = extended_stats_dict((i.total_price for i in items), extended)
+    return response
+
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def stream_browse_response(
+    keywords: str,
+    filters: dict,
+    query: BrowseSearchQuery,
+    deep: int | None,
+    use_cache: bool,
+    stream_format: str,
+) -> Response:
+    """
+    Stream /api/search results as NDJSON lines or server-sent events.
+
+    Frames, each a JSON object tagged by type: one "query" frame, an "item"
+    frame per result as soon as its page is parsed, then a final "stats"
+    frame. An upstream failure after streaming has started ends the stream
+    with an "error" frame instead of an HTTP error status.
+    """
+
+    def frame(frame_type: str, payload: dict) -> str:
+        body = app.json.dumps({"type": frame_type, **payload})
+        if stream_format == "sse":
+            return f"event: {frame_type}\ndata: {body}\n\n"
+        return body + "\n"
+
+    def generate():
+        yield frame("query", {"query": keywords, "filters": build_browse_filters(filters)})
+
+        seen: set[str] = set()
+        observed = []
+        accumulator = PriceAccumulator()
+        try:
+            for page in browse_service.iter_pages(query, deep, use_cache=use_cache):
+                for item in page:
+                    if item.item_id in seen or (deep and len(seen) >= deep):
+                        continue
+                    seen.add(item.item_id)
+                    observed.append(item)
+                    accumulator.add(item.total_price)
+                    yield frame("item", {"item": item.to_dict()})
+        except (BrowseApiError, AuthError, DeadlineExceeded) as e:
+            logger.error("Browse stream failed: %s", e)
+            yield frame("error", {"error": "Failed to fetch data from eBay Browse API"})
+            return
+        finally:
+            record_history("active", keywords, observed)
+
+        stats = accumulator.to_stats()
+        yield frame("stats", {
+            "stats": stats.to_dict() if stats else None,
+            "pagination": {
+                "limit": deep or query.limit,
+                "offset": query.offset,
+                "returned": len(seen),
+                "deep": deep is not None,
+            },
+        })
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=STREAM_FORMATS[stream_format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def record_history(kind: str, keywords: str, items) -> None:
+    """Queue observed listings for the price history store, if enabled."""
+    if price_history is not None:
+        price_history.record(kind, keywords, items)
+
+
+def refresh_watched(query: BrowseSearchQuery) -> list[BrowseItem]:
+    """Run a watched query upstream for the watchlist, recording what it saw."""
+    items = browse_service.search(query, use_cache=False)
+    record_history("active", query.keywords, items)
+    change_tracker.record(query.cache_key(), items)
+    return items
+
+
+# Per-query listing snapshots for /api/search/changes (shared by workers with sqlite:// rate-limit storage)
+change_tracker = ChangeTracker.from_config(config)
+
 
+# Watched queries kept warm in the background (shared by workers with sqlite:// rate-limit storage)
+watchlist = Watchlist.from_config(config, refresh_watched, fanout, quota)
 
-def execute_search(keywords: str, sold: bool, filters: dict) -> tuple[dict, int]:
+
+def parse_pages_param(args: MultiDict) -> int:
+    """
+    Parse the Finding API page budget, clamped to the configured maximum.
+
+    Raises:
+        ValidationError: If pages is not a positive integer
+    """
+    if "pages" not in args:
+        return 1
+    pages = args.get("pages", type=int)
+    if pages is None or pages < 1:
+        raise ValidationError("pages must be a positive integer", field="pages")
+    return min(pages, config.finding_max_pages)
+
+
+def execute_search(
+    keywords: str, sold: bool, filters: dict, use_cache: bool = True, pages: int = 1
+) -> tuple[dict, int]:
     """
     Execute a search using the Finding API and return the response.
 
@@ -160,6 +549,8 @@ def execute_search(keywords: str, sold: bool, filters: dict) -> tuple[dict, int]
         keywords: Search keywords
         sold: Whether to search sold items
         filters: Filter parameters
+        use_cache: Whether a cached result may be returned
+        pages: Page budget; further pages are fetched concurrently
 
     Returns:
         Tuple of (response_dict, status_code)
@@ -173,10 +564,14 @@ def execute_search(keywords: str, sold: bool, filters: dict) -> tuple[dict, int]
         sort=filters["sort"],
     )
 
-    items = ebay_service.search(query)
+    if pages > 1:
+        items = ebay_service.search_many([query], use_cache=use_cache, pages=pages)[0]
+    else:
+        items = ebay_service.search(query, use_cache=use_cache)
+    record_history("sold" if sold else "active", keywords, items)
     stats = calculate_price_stats(items)
 
-    return {
+    response = {
         "query": keywords,
         "type": "sold" if sold else "active",
         "filters": build_filters_response(
@@ -187,7 +582,10 @@ def execute_search(keywords: str, sold: bool, filters: dict) -> tuple[dict, int]
         ),
         "stats": stats.to_dict() if stats else None,
         "items": items_to_dicts(items),
-    }, 200
+    }
+    if pages > 1:
+        response["pages"] = pages
+    return response, 200
 
 
 @app.errorhandler(ValidationError)
@@ -197,18 +595,48 @@ def handle_validation_error(error: ValidationError):
     return jsonify({"error": error.message, "field": error.field}), 400
 
 
+def unavailable_reason(error: Exception) -> tuple[str, int] | None:
+    """
+    Return (message, Retry-After seconds) if error was raised by an open
+    circuit or an exhausted daily quota, else None.
+    """
+    cause = error.__cause__
+    if isinstance(cause, CircuitOpenError):
+        message = "eBay is temporarily unavailable"
+    elif isinstance(cause, QuotaExhaustedError):
+        message = "Daily eBay API quota exhausted"
+    else:
+        return None
+    return message, max(math.ceil(cause.retry_after), 1)
+
+
+def unavailable_response(error: Exception):
+    """
+    Return a 503 with Retry-After if error was raised by an open circuit or
+    an exhausted daily quota, else None.
+    """
+    unavailable = unavailable_reason(error)
+    if unavailable is None:
+        return None
+    message, retry_after = unavailable
+    response = jsonify({"error": message, "retry_after": retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
 @app.errorhandler(EbayApiError)
 def handle_ebay_error(error: EbayApiError):
     """Handle eBay Finding API errors."""
     logger.error("eBay API error: %s", str(error))
-    return jsonify({"error": "Failed to fetch data from eBay"}), 502
+    return unavailable_response(error) or (jsonify({"error": "Failed to fetch data from eBay"}), 502)
 
 
 @app.errorhandler(BrowseApiError)
 def handle_browse_error(error: BrowseApiError):
     """Handle eBay Browse API errors."""
     logger.error("Browse API error: %s", str(error))
-    return jsonify({"error": "Failed to fetch data from eBay Browse API"}), 502
+    return unavailable_response(error) or (jsonify({"error": "Failed to fetch data from eBay Browse API"}), 502)
 
 
 @app.errorhandler(AuthError)
@@ -218,11 +646,19 @@ def handle_auth_error(error: AuthError):
     return jsonify({"error": "eBay authentication failed"}), 502
 
 
+@app.errorhandler(DeadlineExceeded)
+def handle_deadline_exceeded(error: DeadlineExceeded):
+    """Handle concurrent eBay searches that missed their deadline."""
+    logger.error("Fan-out deadline exceeded: %s", str(error))
+    return jsonify({"error": "eBay searches timed out"}), 504
+
+
 # ─── Browse API endpoint (new) ──────────────────────────────────────────────
 
 @app.route("/api/search")
 @limiter.limit(config.rate_limit_browse)
 @require_api_key
+@http_cached("active")
 def api_search():
     """
     Search active eBay listings via Browse API.
@@ -237,68 +673,320 @@ def api_search():
         uk_only: Restrict to UK sellers (true/false)
         limit: Results per page (default 50, max 200)
         offset: Pagination offset (default 0)
+        deep: Fetch this many items (max deep_search_max_items) as concurrent
+            pages in one request; stats cover the merged, deduplicated set
+        stream: Stream results as "ndjson" or "sse" frames instead of one JSON body
+        stats: Set to "extended" for percentiles, a histogram and outlier-trimmed
+            mean/median (not available when streaming)
+        percentiles: Comma-separated percentiles for extended stats (default 10,25,75,90)
+        bins: Histogram bins for extended stats (default 10)
+        trim: Outlier rule for extended stats, "iqr" (default) or "mad"
+        cache: Set to false to bypass the response cache
+
+    Watched queries (see /api/watchlist) are answered from the watchlist's
+    snapshot while it is within its refresh interval and the search cache TTL.
     """
     if not browse_service:
         return jsonify({"error": "eBay Browse API not configured (need APP_ID + CERT_ID)"}), 500
 
-    keywords = validate_keywords(
-        request.args.get("q"),
-        max_length=config.max_keyword_length,
-    )
+    keywords, filters, query = parse_browse_query(request.args)
+    deep = parse_deep_target(request.args)
+    extended = parse_extended_stats_params(request.args)
+    stream_format = request.args.get("stream", "").lower()
+    if stream_format and stream_format not in STREAM_FORMATS:
+        raise ValidationError(f"stream must be one of: {', '.join(STREAM_FORMATS)}", field="stream")
 
-    filters = parse_filter_params()
-    limit = min(request.args.get("limit", 50, type=int), 200)
-    offset = request.args.get("offset", 0, type=int)
+    logger.info("Browse search: ip=%s, keywords=%s, filters=%s, deep=%s", request.remote_addr, keywords, filters, deep)
 
-    logger.info("Browse search: ip=%s, keywords=%s, filters=%s", request.remote_addr, keywords, filters)
+    if stream_format:
+        return stream_browse_response(keywords, filters, query, deep, cache_allowed(), stream_format)
 
-    query = BrowseSearchQuery(
+    use_cache = cache_allowed()
+    snapshot = watchlist.snapshot(query) if use_cache and not deep else None
+    if snapshot is not None:
+        # Recorded to the price history when the snapshot was refreshed
+        return jsonify(build_browse_response(keywords, filters, query, snapshot, extended=extended))
+
+    if deep:
+        items = browse_service.search_deep(query, deep, use_cache=use_cache)
+    else:
+        items = browse_service.search(query, use_cache=use_cache)
+    record_history("active", keywords, items)
+    return jsonify(build_browse_response(keywords, filters, query, items, deep=deep, extended=extended))
+
+
+@app.route("/api/search/changes")
+@limiter.limit(config.rate_limit_browse)
+@require_api_key
+def api_search_changes():
+    """
+    Listings added, removed or repriced since an earlier fetch of a search.
+
+    Query params:
+        The /api/search query params (q, condition, min_price, max_price,
+        sort, listing_type, uk_only, limit, offset, cache)
+        since: Token from a previous response; omit it to start tracking
+
+    Without a usable since token (missing, unknown to the tracker, or older
+    than the retained history) the response has reset=true and lists every
+    current item as added. Removed means no longer in this page of results.
+    """
+    if not browse_service:
+        return jsonify({"error": "eBay Browse API not configured (need APP_ID + CERT_ID)"}), 500
+
+    keywords, filters, query = parse_browse_query(request.args)
+    since = request.args.get("since")
+    use_cache = cache_allowed()
+
+    items = watchlist.snapshot(query) if use_cache else None
+    if items is None:
+        items = browse_service.search(query, use_cache=use_cache)
+        record_history("active", keywords, items)
+
+    diff, token = change_tracker.changes(query.cache_key(), items, since)
+    by_id = {item.item_id: item for item in items}
+    added = list(by_id) if diff is None else list(diff.added)
+
+    return jsonify({
+        "query": keywords,
+        "filters": build_browse_filters(filters),
+        "since": since,
+        "token": token,
+        "reset": diff is None,
+        "count": len(by_id),
+        "added": [by_id[item_id].to_dict() for item_id in added],
+        "removed": [] if diff is None else list(diff.removed),
+        "price_changed": [] if diff is None else [
+            {"item_id": item_id, "old_price": old, "new_price": new, "item": by_id[item_id].to_dict()}
+            for item_id, (old, new) in diff.repriced.items()
+        ],
+    })
+
+
+def batch_spec_args(spec) -> MultiDict:
+    """
+    Convert one JSON batch query spec into /api/search-style args.
+
+    Raises:
+        ValidationError: If the spec is not an object
+    """
+    if not isinstance(spec, dict):
+        raise ValidationError("Each query must be an object", field="queries")
+
+    args = MultiDict()
+    for name, value in spec.items():
+        if value is None:
+            continue
+        args[name] = str(value).lower() if isinstance(value, bool) else str(value)
+    return args
+
+
+@app.route("/api/search/batch", methods=["POST"])
+@limiter.limit(config.rate_limit_browse)
+@require_api_key
+def api_search_batch():
+    """
+    Run many Browse searches in one request.
+
+    JSON body:
+        queries: List of query objects taking the /api/search params
+            (q, condition, min_price, max_price, sort, listing_type,
+            uk_only, limit, offset); at most batch_search_max_queries
+        include_items: Whether to return items as well as stats (default true)
+        cache: Set to false to bypass the response cache
+
+    Queries run concurrently under a shared cap. Each result carries its own
+    status; a failed query is reported in place without failing the batch.
+    """
+    if not browse_service:
+        return jsonify({"error": "eBay Browse API not configured (need APP_ID + CERT_ID)"}), 500
+
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ValidationError("Request body must be a JSON object", field="body")
+
+    specs = body.get("queries")
+    if not isinstance(specs, list) or not specs:
+        raise ValidationError("queries must be a non-empty list", field="queries")
+    if len(specs) > config.batch_search_max_queries:
+        raise ValidationError(
+            f"queries must contain at most {config.batch_search_max_queries} items", field="queries"
+        )
+
+    include_items = body.get("include_items", True) is not False
+    use_cache = body.get("cache", True) is not False and cache_allowed(MultiDict(), request.headers)
+
+    results: list[dict | None] = [None] * len(specs)
+    parsed = []
+    for index, spec in enumerate(specs):
+        try:
+            parsed.append((index, *parse_browse_query(batch_spec_args(spec))))
+        except ValidationError as e:
+            results[index] = {"index": index, "status": 400, "error": e.message, "field": e.field}
+
+    logger.info("Browse batch: ip=%s, queries=%d, valid=%d", request.remote_addr, len(specs), len(parsed))
+
+    outcomes = browse_service.search_batch([query for _, _, _, query in parsed], use_cache=use_cache)
+
+    for (index, keywords, filters, query), outcome in zip(parsed, outcomes):
+        if isinstance(outcome, BrowseApiError):
+            unavailable = unavailable_reason(outcome)
+            if unavailable is not None:
+                message, retry_after = unavailable
+                results[index] = {"index": index, "status": 503, "error": message, "retry_after": retry_after}
+            else:
+                results[index] = {"index": index, "status": 502, "error": "Failed to fetch data from eBay Browse API"}
+        elif isinstance(outcome, AuthError):
+            results[index] = {"index": index, "status": 502, "error": "eBay authentication failed"}
+        elif isinstance(outcome, DeadlineExceeded):
+            results[index] = {"index": index, "status": 504, "error": "eBay search timed out"}
+        else:
+            record_history("active", keywords, outcome)
+            result = build_browse_response(keywords, filters, query, outcome)
+            if not include_items:
+                del result["items"]
+            results[index] = {"index": index, "status": 200, **result}
+
+    succeeded = sum(1 for result in results if result["status"] == 200)
+    return jsonify({
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    })
+
+
+@app.route("/api/watchlist")
+@require_api_key
+def api_watchlist():
+    """List watched queries with their refresh schedule and latest stats."""
+    entries = watchlist.entries()
+    return jsonify({"count": len(entries), "entries": [entry.to_dict() for entry in entries]})
+
+
+@app.route("/api/watchlist", methods=["POST"])
+@limiter.limit(config.rate_limit_browse)
+@require_api_key
+def api_watchlist_add():
+    """
+    Register queries to be refreshed in the background.
+
+    JSON body:
+        queries: List of query objects taking the /api/search params
+            (q, condition, min_price, max_price, sort, listing_type,
+            uk_only, limit, offset)
+
+    Registering an already watched query returns its existing entry. New
+    queries are refreshed as soon as a watchlist worker is free; from then
+    on /api/search answers them from the latest snapshot.
+    """
+    if not browse_service:
+        return jsonify({"error": "eBay Browse API not configured (need APP_ID + CERT_ID)"}), 500
+
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ValidationError("Request body must be a JSON object", field="body")
+
+    specs = body.get("queries")
+    if not isinstance(specs, list) or not specs:
+        raise ValidationError("queries must be a non-empty list", field="queries")
+
+    queries = [parse_browse_query(batch_spec_args(spec))[2] for spec in specs]
+    try:
+        entries = watchlist.add(queries)
+    except WatchlistFullError as e:
+        return jsonify({"error": str(e)}), 409
+
+    logger.info("Watchlist add: ip=%s, queries=%d", request.remote_addr, len(queries))
+    return jsonify({"count": len(entries), "entries": [entry.to_dict() for entry in entries]}), 201
+
+
+@app.route("/api/watchlist/<watch_id>", methods=["DELETE"])
+@require_api_key
+def api_watchlist_remove(watch_id: str):
+    """Stop watching a query."""
+    if not watchlist.remove(watch_id):
+        return jsonify({"error": "Not watched"}), 404
+    return "", 204
+
+
+def finding_total_price(item: EbayItem) -> float:
+    """Price plus flat shipping for a Finding item, comparable with Browse total_price."""
+    return item.price + (item.shipping_cost or 0.0)
+
+
+@app.route("/api/compare")
+@limiter.limit(config.rate_limit_browse)
+@require_api_key
+@http_cached("active")
+def api_compare():
+    """
+    Browse active listings plus Finding sold prices, fetched concurrently.
+
+    Takes the /api/search query params (except deep and stream) and returns
+    the /api/search body plus a "sold" block, a comparison of sold vs active
+    total prices (item + shipping) and a market summary. If the Finding API
+    fails, sold data is null and the active results are still returned.
+
+    The market summary uses eBay's total match counts (Browse total,
+    Finding totalEntries), not the page sizes, and is null where a total
+    is unknown (e.g. a result served from a cache filled by another process).
+    """
+    if not browse_service:
+        return jsonify({"error": "eBay Browse API not configured (need APP_ID + CERT_ID)"}), 500
+
+    keywords, filters, query = parse_browse_query(request.args)
+    extended = parse_extended_stats_params(request.args)
+    use_cache = cache_allowed()
+    sold_query = SearchQuery(
         keywords=keywords,
+        sold=True,
         condition=filters["condition"],
         min_price=filters["min_price"],
         max_price=filters["max_price"],
-        sort=filters["sort"],
-        listing_type=filters["listing_type"],
-        uk_only=filters["uk_only"],
-        marketplace=config.default_marketplace,
-        limit=limit,
-        offset=offset,
     )
 
-    items = browse_service.search(query)
-
-    # Calculate stats using total_price
-    prices = [item.total_price for item in items if item.total_price > 0]
-    stats = None
-    if prices:
-        import statistics
-        stats = {
-            "count": len(prices),
-            "average": round(statistics.mean(prices), 2),
-            "median": round(statistics.median(prices), 2),
-            "min": round(min(prices), 2),
-            "max": round(max(prices), 2),
-            "std_dev": round(statistics.stdev(prices), 2) if len(prices) > 1 else 0,
-        }
+    logger.info("Cross-API compare: ip=%s, keywords=%s, filters=%s", request.remote_addr, keywords, filters)
 
-    return jsonify({
-        "query": keywords,
-        "filters": build_filters_response(
-            filters["condition"],
-            filters["min_price"],
-            filters["max_price"],
-            filters["sort"],
-            filters["listing_type"],
-            filters["uk_only"],
-        ),
-        "stats": stats,
-        "items": browse_items_to_dicts(items),
-        "pagination": {
-            "limit": limit,
-            "offset": offset,
-            "returned": len(items),
-        },
-    })
+    def search_sold() -> list[EbayItem] | EbayApiError:
+        try:
+            return ebay_service.search(sold_query, use_cache=use_cache)
+        except EbayApiError as e:
+            return e
+
+    active_items, sold_items = fanout.gather(
+        lambda search: search(),
+        [lambda: browse_service.search(query, use_cache=use_cache), search_sold],
+        timeout=config.fanout_deadline,
+    )
+    record_history("active", keywords, active_items)
+
+    response = build_browse_response(keywords, filters, query, active_items, extended=extended)
+
+    if isinstance(sold_items, EbayApiError):
+        logger.warning("Sold search failed during compare: %s", sold_items)
+        response["sold"] = None
+        response["comparison"] = None
+        sold_total = None
+    else:
+        record_history("sold", keywords, sold_items)
+        sold_stats = PriceAccumulator.from_prices(finding_total_price(item) for item in sold_items).to_stats()
+        response["sold"] = {
+            "stats": sold_stats.to_dict() if sold_stats else None,
+            "sample_count": len(sold_items),
+        }
+        comparison = compare_prices(sold_stats, calculate_price_stats(active_items, attr="total_price"))
+        response["comparison"] = comparison.to_dict() if comparison else None
+        sold_total = ebay_service.total_matches(sold_query)
+
+    active_total = browse_service.total_matches(query)
+    response["market"] = {
+        "active_count": active_total,
+        "sold_count": sold_total,
+        "sell_through": round(sold_total / (sold_total + active_total), 3)
+        if sold_total is not None and active_total is not None and sold_total + active_total else None,
+    }
+    return jsonify(response)
 
 
 # ─── Legacy Finding API endpoints ───────────────────────────────────────────
@@ -312,11 +1000,18 @@ def index():
         "version": "2.0.0",
         "endpoints": {
             "/api/search": "Search active listings (Browse API)",
+            "/api/search/batch": "Run many Browse searches in one POST request",
+            "/api/compare": "Browse active vs Finding sold prices and market summary in one call",
+            "/api/search/changes": "Listings added, removed or repriced since a since token",
+            "/api/watchlist": "List (GET) or register (POST) queries refreshed in the background; DELETE /api/watchlist/<id> stops one",
             "/search/sold": "[Legacy] Search sold/completed listings (Finding API)",
             "/search/active": "[Legacy] Search active listings (Finding API)",
             "/search/compare": "[Legacy] Compare sold vs active prices (Finding API)",
+            "/api/history": "Recorded sold/active prices from the local history store",
+            "/api/trend": "Sold price stats per day or week from the local history store",
             "/config/status": "Check credential configuration status",
             "/health": "Health check",
+            "/metrics": "Prometheus metrics (latency histograms, cache and rate-limit counters)",
         },
         "filters": {
             "condition": list(BROWSE_CONDITION_MAP.keys()),
@@ -332,6 +1027,7 @@ def index():
 @app.route("/search/sold")
 @limiter.limit(config.rate_limit_search)
 @require_api_key
+@http_cached("sold")
 def search_sold():
     """
     [Legacy] Search for sold/completed eBay listings via Finding API.
@@ -342,6 +1038,8 @@ def search_sold():
         min_price: Minimum price filter
         max_price: Maximum price filter
         sort: Sort order (best_match, price_asc, price_desc, date_asc, date_desc)
+        pages: Finding API pages to fetch concurrently (default 1, max
+            finding_max_pages); stops early at eBay's last page
     """
     keywords = validate_keywords(
         request.args.get("q"),
@@ -352,15 +1050,17 @@ def search_sold():
         return jsonify({"error": "eBay API not configured"}), 500
 
     filters = parse_filter_params()
-    logger.info("Search sold: ip=%s, keywords=%s, filters=%s", request.remote_addr, keywords, filters)
+    pages = parse_pages_param(request.args)
+    logger.info("Search sold: ip=%s, keywords=%s, filters=%s, pages=%d", request.remote_addr, keywords, filters, pages)
 
-    response, status = execute_search(keywords, sold=True, filters=filters)
+    response, status = execute_search(keywords, sold=True, filters=filters, use_cache=cache_allowed(), pages=pages)
     return jsonify(response), status
 
 
 @app.route("/search/active")
 @limiter.limit(config.rate_limit_search)
 @require_api_key
+@http_cached("active")
 def search_active():
     """
     [Legacy] Search for active eBay listings via Finding API.
@@ -383,13 +1083,57 @@ def search_active():
     filters = parse_filter_params()
     logger.info("Search active: ip=%s, keywords=%s, filters=%s", request.remote_addr, keywords, filters)
 
-    response, status = execute_search(keywords, sold=False, filters=filters)
+    response, status = execute_search(keywords, sold=False, filters=filters, use_cache=cache_allowed())
     return jsonify(response), status
 
 
+def parse_conditions_param(args: MultiDict) -> list[str]:
+    """
+    Parse the comma-separated conditions param of /search/compare.
+
+    Raises:
+        ValidationError: If a condition is unknown
+    """
+    raw = args.get("conditions")
+    if not raw:
+        return []
+
+    conditions = list(dict.fromkeys(c.strip().lower() for c in raw.split(",") if c.strip()))
+    unknown = [c for c in conditions if c not in CONDITION_MAP]
+    if unknown:
+        raise ValidationError(
+            f"conditions must be from: {', '.join(CONDITION_MAP)}", field="conditions"
+        )
+    return conditions
+
+
+def build_comparison(sold_items, active_items, extended: dict | None = None) -> dict:
+    """Build the sold/active/comparison blocks of a /search/compare response."""
+    sold_stats = calculate_price_stats(sold_items)
+    active_stats = calculate_price_stats(active_items)
+    comparison = compare_prices(sold_stats, active_stats)
+
+    result = {
+        "sold": {
+            "stats": sold_stats.to_dict() if sold_stats else None,
+            "sample_count": len(sold_items),
+        },
+        "active": {
+            "stats": active_stats.to_dict() if active_stats else None,
+            "sample_count": len(active_items),
+        },
+        "comparison": comparison.to_dict() if comparison else None,
+    }
+    if extended is not None:
+        result["sold"]["extended_stats"] = extended_stats_dict((i.price for i in sold_items), extended)
+        result["active"]["extended_stats"] = extended_stats_dict((i.price for i in active_items), extended)
+    return result
+
+
 @app.route("/search/compare")
 @limiter.limit(config.rate_limit_search)
 @require_api_key
+@http_cached("active")
 def compare_prices_endpoint():
     """
     [Legacy] Compare sold vs active prices via Finding API.
@@ -399,6 +1143,12 @@ def compare_prices_endpoint():
         condition: Filter by condition (new, open_box, refurbished, used, for_parts)
         min_price: Minimum price filter
         max_price: Maximum price filter
+        stats: Set to "extended" for percentiles, histograms and trimmed stats
+            (percentiles, bins and trim as for /api/search)
+        conditions: Comma-separated conditions to compare side by side under
+            "by_condition"; all searches run concurrently
+        pages: Finding API pages of sold listings to fetch per sold search
+            (default 1, max finding_max_pages); active searches use one page
     """
     keywords = validate_keywords(
         request.args.get("q"),
@@ -409,49 +1159,157 @@ def compare_prices_endpoint():
         return jsonify({"error": "eBay API not configured"}), 500
 
     filters = parse_filter_params()
-    logger.info("Compare prices: ip=%s, keywords=%s, filters=%s", request.remote_addr, keywords, filters)
-
-    # Build queries for concurrent execution
-    sold_query = SearchQuery(
-        keywords=keywords,
-        sold=True,
-        condition=filters["condition"],
-        min_price=filters["min_price"],
-        max_price=filters["max_price"],
-        sort=filters["sort"],
-    )
-    active_query = SearchQuery(
-        keywords=keywords,
-        sold=False,
-        condition=filters["condition"],
-        min_price=filters["min_price"],
-        max_price=filters["max_price"],
-        sort=filters["sort"],
+    extended = parse_extended_stats_params(request.args)
+    conditions = parse_conditions_param(request.args)
+    pages = parse_pages_param(request.args)
+    logger.info(
+        "Compare prices: ip=%s, keywords=%s, filters=%s, conditions=%s, pages=%d",
+        request.remote_addr, keywords, filters, conditions, pages,
     )
 
-    # Execute searches concurrently
-    sold_items, active_items = ebay_service.search_concurrent(sold_query, active_query)
+    def build_query(sold: bool, condition: str | None) -> SearchQuery:
+        return SearchQuery(
+            keywords=keywords,
+            sold=sold,
+            condition=condition,
+            min_price=filters["min_price"],
+            max_price=filters["max_price"],
+            sort=filters["sort"],
+        )
 
-    sold_stats = calculate_price_stats(sold_items)
-    active_stats = calculate_price_stats(active_items)
-    comparison = compare_prices(sold_stats, active_stats)
+    sold_query = build_query(True, filters["condition"])
+    active_query = build_query(False, filters["condition"])
 
-    return jsonify({
+    # Execute searches concurrently
+    if conditions or pages > 1:
+        queries = [sold_query, active_query]
+        for condition in conditions:
+            queries += [build_query(True, condition), build_query(False, condition)]
+        budgets = [pages if query.sold else 1 for query in queries]
+        results = ebay_service.search_many(queries, use_cache=cache_allowed(), pages=budgets)
+    else:
+        results = ebay_service.search_concurrent(sold_query, active_query, use_cache=cache_allowed())
+
+    for query, items in zip([sold_query, active_query], results):
+        record_history("sold" if query.sold else "active", keywords, items)
+
+    response = {
         "query": keywords,
         "filters": build_filters_response(
             filters["condition"],
             filters["min_price"],
             filters["max_price"],
         ),
-        "sold": {
-            "stats": sold_stats.to_dict() if sold_stats else None,
-            "sample_count": len(sold_items),
-        },
-        "active": {
-            "stats": active_stats.to_dict() if active_stats else None,
-            "sample_count": len(active_items),
-        },
-        "comparison": comparison.to_dict() if comparison else None,
+        **build_comparison(results[0], results[1], extended),
+    }
+    if conditions:
+        response["by_condition"] = {
+            condition: build_comparison(results[2 + 2 * i], results[3 + 2 * i], extended)
+            for i, condition in enumerate(conditions)
+        }
+
+    return jsonify(response)
+
+
+@app.route("/api/history")
+@require_api_key
+def api_history():
+    """
+    Query the local price history without calling eBay.
+
+    Query params:
+        q: Search keywords (required; matched after lowercasing and
+            collapsing whitespace)
+        type: "sold" (default) or "active"
+        days: How far back to look (default 30, max 3650)
+        limit: Maximum listings to return, newest first (default 100, max 1000)
+    """
+    keywords = validate_keywords(
+        request.args.get("q"),
+        max_length=config.max_keyword_length,
+    )
+
+    if price_history is None:
+        return jsonify({"error": "Price history not enabled (set PRICE_HISTORY_PATH)"}), 500
+
+    kind = request.args.get("type", "sold").lower()
+    if kind not in ("sold", "active"):
+        raise ValidationError("type must be one of: sold, active", field="type")
+
+    days = request.args.get("days", 30, type=int)
+    if not 1 <= days <= 3650:
+        raise ValidationError("days must be between 1 and 3650", field="days")
+
+    limit = request.args.get("limit", 100, type=int)
+    if not 1 <= limit <= 1000:
+        raise ValidationError("limit must be between 1 and 1000", field="limit")
+
+    since = time.time() - days * 86400
+    stats = price_history.stats(keywords, kind, since=since)
+
+    return jsonify({
+        "query": keywords,
+        "type": kind,
+        "days": days,
+        "stats": stats.to_dict() if stats else None,
+        "items": price_history.query(keywords, kind, since=since, limit=limit),
+    })
+
+
+def parse_date_param(args: MultiDict, name: str, default: date) -> date:
+    """Parse an optional YYYY-MM-DD query param."""
+    raw = args.get(name)
+    if not raw:
+        return default
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValidationError(f"{name} must be a date (YYYY-MM-DD)", field=name)
+
+
+@app.route("/api/trend")
+@require_api_key
+def api_trend():
+    """
+    Sold price stats bucketed by day or week, from the local price history.
+
+    Served from rollups that are updated as sold results are recorded, so
+    no eBay call is made and raw observations are not rescanned.
+
+    Query params:
+        q: Search keywords (required)
+        interval: "day" (default) or "week" (weeks start on Monday)
+        since: First day, YYYY-MM-DD (default: 90 days before until)
+        until: Last day, YYYY-MM-DD (default: today, UTC)
+    """
+    keywords = validate_keywords(
+        request.args.get("q"),
+        max_length=config.max_keyword_length,
+    )
+
+    if price_history is None:
+        return jsonify({"error": "Price history not enabled (set PRICE_HISTORY_PATH)"}), 500
+
+    interval = request.args.get("interval", "day").lower()
+    if interval not in TREND_INTERVALS:
+        raise ValidationError(f"interval must be one of: {', '.join(TREND_INTERVALS)}", field="interval")
+
+    until = parse_date_param(request.args, "until", datetime.now(timezone.utc).date())
+    since = parse_date_param(request.args, "since", until - timedelta(days=90))
+    if since > until:
+        raise ValidationError("since must not be after until", field="since")
+    if (until - since).days > 3650:
+        raise ValidationError("date range must be at most 3650 days", field="since")
+
+    return jsonify({
+        "query": keywords,
+        "interval": interval,
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "buckets": [
+            {"start": start.isoformat(), "stats": stats.to_dict()}
+            for start, stats in price_history.trend(keywords, interval, since, until)
+        ],
     })
 
 
@@ -462,9 +1320,61 @@ def health():
         "status": "healthy",
         "ebay_configured": config.is_ebay_configured,
         "browse_api_configured": browse_service is not None,
+        "search_cache": {
+            "browse": browse_service.cache.stats() if browse_service and browse_service.cache else None,
+            "finding": ebay_service.cache.stats() if ebay_service.cache else None,
+        },
+        "auth": auth_service.metrics() if auth_service else None,
+        "fanout": fanout.metrics(),
+        "http": http_transport.metrics(),
+        "quota": quota.metrics(),
+        "circuits": {
+            "browse": browse_service.guard.metrics() if browse_service else None,
+            "finding": ebay_service.guard.metrics(),
+        },
+        "watchlist": watchlist.metrics(),
+        "changes": change_tracker.metrics(),
     })
 
 
+@app.route("/metrics")
+@limiter.exempt
+def metrics():
+    """
+    Prometheus metrics: latency histograms per stage plus cache, rate-limit
+    and fan-out counters.
+    """
+    caches = {
+        "browse": browse_service.cache if browse_service else None,
+        "finding": ebay_service.cache,
+    }
+    cache_samples = []
+    for name, cache in caches.items():
+        if cache is None:
+            continue
+        stats = cache.stats()
+        for result, key in (("hit", "hits"), ("stale", "stale_hits"), ("miss", "misses")):
+            cache_samples.append(({"cache": name, "result": result}, stats[key]))
+
+    fanout_metrics = fanout.metrics()
+    body = "".join([
+        REGISTRY.render(),
+        render_family(
+            "snout_cache_lookups_total", "counter",
+            "Search cache lookups by result (stale = served while refreshing).", cache_samples,
+        ),
+        render_family(
+            "snout_fanout_active", "gauge", "eBay calls running on the shared executor.",
+            [({}, fanout_metrics["active"])],
+        ),
+        render_family(
+            "snout_fanout_queued", "gauge", "eBay calls waiting for an executor worker.",
+            [({}, fanout_metrics["queued"])],
+        ),
+    ])
+    return Response(body, content_type=METRICS_CONTENT_TYPE)
+
+
 @app.route("/config/status")
 def config_status():
     """
@@ -489,11 +1399,26 @@ def config_status():
 
 def create_app(test_config: Config | None = None) -> Flask:
     """Application factory for testing."""
-    global config, ebay_service
+    global config, http_transport, quota, ebay_service, auth_service, browse_service, price_history
+    global cache_policies, compress_min_size, watchlist, change_tracker
 
     if test_config:
         config = test_config
-        ebay_service = EbayFindingService(config)
+        http_transport = HttpTransport.from_config(config)
+        quota = QuotaAccountant.from_config(config)
+        cache_policies = build_cache_policies(config)
+        compress_min_size = config.http_compress_min_size
+        ebay_service = EbayFindingService(
+            config, cache=build_search_cache(config, EbayItem), executor=fanout, transport=http_transport,
+            quota=quota,
+        )
+        if auth_service is not None:
+            auth_service.close()
+        auth_service, browse_service = build_browse_services(config, http_transport, quota)
+        price_history = PriceHistoryStore(config.price_history_path) if config.price_history_path else None
+        watchlist.close()
+        watchlist = Watchlist.from_config(config, refresh_watched, fanout, quota)
+        change_tracker = ChangeTracker.from_config(config)
 
     return app
 
@@ -0,0 +1,194 @@
+"""
+ASGI entry point for Snout.
+
+``GET /api/search`` is served natively on asyncio through the async eBay
+clients, so one process can keep hundreds of Browse calls in flight without
+a worker thread blocked on each. Every other route, and streamed searches
+(``stream=ndjson|sse``), are delegated to the Flask app unchanged.
+
+Run with any ASGI server, e.g.::
+
+    uvicorn snout.asgi:application --port 5000
+"""
+import asyncio
+import logging
+import time
+from urllib.parse import parse_qsl
+
+import httpx
+from asgiref.wsgi import WsgiToAsgi
+from limits import parse as parse_limit
+from werkzeug.datastructures import Headers, MultiDict
+
+from . import app as server
+from .services.async_services import AsyncEbayAuthService, AsyncEbayBrowseService
+from .services.auth_service import AuthError
+from .services.ebay_browse_service import BrowseApiError
+from .services.fanout import DeadlineExceeded
+from .services.http_transport import build_async_client
+from .services.metrics import RATE_LIMITED, REQUEST_SECONDS
+from .utils.http_cache import cacheable_response
+from .utils.validators import ValidationError
+
+logger = logging.getLogger("snout.asgi")
+
+
+class SnoutASGI:
+    """ASGI app serving /api/search natively and everything else through Flask."""
+
+    def __init__(
+        self,
+        flask_app,
+        browse_service: AsyncEbayBrowseService | None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self._wsgi = WsgiToAsgi(flask_app)
+        self._browse = browse_service
+        self._client = client
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif self._is_native(scope):
+            await self._api_search(scope, send)
+        else:
+            await self._wsgi(scope, receive, send)
+
+    @staticmethod
+    def _is_native(scope) -> bool:
+        """Check whether a request is a non-streamed GET /api/search."""
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] != "/api/search":
+            return False
+        args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1")))
+        return not args.get("stream")
+
+    async def _lifespan(self, receive, send):
+        """Handle ASGI startup/shutdown, closing the HTTP client on shutdown."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client is not None:
+                    await self._client.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _api_search(self, scope, send):
+        """Async equivalent of the Flask api_search view."""
+        headers = Headers([(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope["headers"]])
+        args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        started = time.perf_counter()
+        response_headers = [(b"content-type", b"application/json")]
+
+        try:
+            status, body = await self._search(args, headers, client_ip)
+        except ValidationError as e:
+            logger.warning("Validation error: %s", e.message)
+            status, body = 400, {"error": e.message, "field": e.field}
+        except BrowseApiError as e:
+            logger.error("Browse API error: %s", str(e))
+            unavailable = server.unavailable_reason(e)
+            if unavailable is not None:
+                message, retry_after = unavailable
+                status, body = 503, {"error": message, "retry_after": retry_after}
+                response_headers.append((b"retry-after", str(retry_after).encode()))
+            else:
+                status, body = 502, {"error": "Failed to fetch data from eBay Browse API"}
+        except AuthError as e:
+            logger.error("Auth error: %s", str(e))
+            status, body = 502, {"error": "eBay authentication failed"}
+        except DeadlineExceeded as e:
+            logger.error("Fan-out deadline exceeded: %s", str(e))
+            status, body = 504, {"error": "eBay searches timed out"}
+
+        origin = headers.get("Origin")
+        if origin in server.CORS_ORIGINS:
+            response_headers.append((b"access-control-allow-origin", origin.encode("latin-1")))
+            response_headers.append((b"vary", b"Origin"))
+
+        encoded = server.app.json.encode_body(body)
+        if status == 200:
+            status, encoded, cache_headers = cacheable_response(
+                encoded,
+                server.cache_policies["active"],
+                headers.get("If-None-Match"),
+                headers.get("Accept-Encoding"),
+                vary=server.response_vary(),
+                min_compress_size=server.compress_min_size,
+            )
+            response_headers.extend(
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in cache_headers.items()
+            )
+        REQUEST_SECONDS.labels("api_search", "GET", str(status)).observe(time.perf_counter() - started)
+
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": encoded})
+
+    async def _search(self, args: MultiDict, headers: Headers, client_ip: str) -> tuple[int, dict]:
+        """Authenticate, rate-limit and run the search, returning (status, body)."""
+        if server.SNOUT_API_KEY and headers.get("X-Snout-Key") != server.SNOUT_API_KEY:
+            logger.warning("Rejected request: invalid API key from %s", client_ip)
+            return 401, {"error": "Unauthorized — invalid or missing API key"}
+
+        limit = parse_limit(server.config.rate_limit_browse)
+        # sqlite:// limiter storage takes a write lock, so keep it off the event loop
+        if not await asyncio.to_thread(server.limiter.limiter.hit, limit, "asgi_api_search", client_ip):
+            RATE_LIMITED.labels("api_search").inc()
+            return 429, {"error": "Rate limit exceeded", "retry_after": str(limit)}
+
+        if self._browse is None:
+            return 500, {"error": "eBay Browse API not configured (need APP_ID + CERT_ID)"}
+
+        keywords, filters, query = server.parse_browse_query(args)
+        deep = server.parse_deep_target(args)
+        extended = server.parse_extended_stats_params(args)
+        use_cache = server.cache_allowed(args, headers)
+
+        logger.info("Browse search: ip=%s, keywords=%s, filters=%s, deep=%s", client_ip, keywords, filters, deep)
+
+        if use_cache and not deep:
+            # A shared watchlist reads SQLite, so keep the lookup off the event loop
+            snapshot = await asyncio.to_thread(server.watchlist.snapshot, query)
+            if snapshot is not None:
+                # Recorded to the price history when the snapshot was refreshed
+                return 200, server.build_browse_response(keywords, filters, query, snapshot, extended=extended)
+
+        if deep:
+            items = await self._browse.search_deep(query, deep, use_cache=use_cache)
+        else:
+            items = await self._browse.search(query, use_cache=use_cache)
+        server.record_history("active", keywords, items)
+        return 200, server.build_browse_response(
+            keywords, filters, query, items, deep=deep, extended=extended
+        )
+
+
+def create_asgi_app() -> SnoutASGI:
+    """Build the ASGI app around the already-configured Flask app."""
+    config = server.config
+    browse_service = None
+    client = None
+
+    if config.ebay_app_id and config.ebay_cert_id:
+        client = build_async_client(config)
+        auth_service = AsyncEbayAuthService(
+            config.ebay_app_id,
+            config.ebay_cert_id,
+            config.ebay_token_endpoint,
+            client=client,
+            store=server.auth_service.store if server.auth_service else None,
+            refresh_fraction=config.token_refresh_fraction,
+        )
+        # Share the response cache and circuit breaker with the Flask services
+        cache = server.browse_service.cache if server.browse_service else None
+        guard = server.browse_service.guard if server.browse_service else None
+        browse_service = AsyncEbayBrowseService(
+            config, auth_service, cache=cache, client=client, quota=server.quota, guard=guard
+        )
+
+    return SnoutASGI(server.app, browse_service, client)
+
+
+application = create_asgi_app()
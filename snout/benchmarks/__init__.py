@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for Snout (run with ``python -m snout.benchmarks``).
+"""
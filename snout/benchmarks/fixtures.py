@@ -0,0 +1,155 @@
+"""
+Deterministic eBay response fixtures for benchmarks.
+
+The payloads follow the shape of real Browse item_summary/search and
+Finding findCompletedItems/findItemsByKeywords responses, including the
+fields Snout ignores, so JSON size and parse cost are realistic. The same
+seed always produces the same bytes, so runs are comparable across commits.
+"""
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+TITLES = [
+    "Nintendo Switch OLED Console White Joy-Con Boxed",
+    "Sony PlayStation 5 Disc Edition 825GB Console",
+    "Apple AirPods Pro 2nd Generation MagSafe USB-C",
+    "Dyson V15 Detect Absolute Cordless Vacuum Cleaner",
+    "Lego Technic 42056 Porsche 911 GT3 RS Sealed",
+    "Sony WH-1000XM5 Wireless Noise Cancelling Headphones",
+    "Samsung Galaxy S24 Ultra 256GB Titanium Black Unlocked",
+    "Canon EOS R6 Mark II Mirrorless Camera Body Only",
+]
+CONDITIONS = [("1000", "New"), ("1500", "Open box"), ("2500", "Refurbished"), ("3000", "Used")]
+BROWSE_SIZES = (50, 200, 1000)
+
+
+def browse_item(rng: random.Random, index: int) -> dict[str, Any]:
+    """Build one Browse API item summary."""
+    condition_id, condition = rng.choice(CONDITIONS)
+    price = round(rng.lognormvariate(5.0, 0.5), 2)
+    item_id = f"v1|{110000000000 + index}|0"
+    summary = {
+        "itemId": item_id,
+        "title": f"{rng.choice(TITLES)} #{index}",
+        "leafCategoryIds": ["139971"],
+        "categories": [{"categoryId": "139971", "categoryName": "Consoles"}],
+        "image": {"imageUrl": f"https://i.ebayimg.com/images/g/{index:08d}/s-l225.jpg"},
+        "price": {"value": f"{price:.2f}", "currency": "GBP"},
+        "itemHref": f"https://api.ebay.com/buy/browse/v1/item/{item_id}",
+        "seller": {
+            "username": f"seller_{rng.randrange(10000)}",
+            "feedbackPercentage": f"{rng.uniform(95, 100):.1f}",
+            "feedbackScore": rng.randrange(20000),
+        },
+        "condition": condition,
+        "conditionId": condition_id,
+        "thumbnailImages": [{"imageUrl": f"https://i.ebayimg.com/images/g/{index:08d}/s-l1600.jpg"}],
+        "buyingOptions": rng.choice([["FIXED_PRICE"], ["FIXED_PRICE", "BEST_OFFER"], ["AUCTION"]]),
+        "itemWebUrl": f"https://www.ebay.co.uk/itm/{110000000000 + index}",
+        "itemLocation": {"postalCode": f"SW{rng.randrange(1, 20)}****", "country": "GB"},
+        "adultOnly": False,
+        "legacyItemId": str(110000000000 + index),
+        "availableCoupons": False,
+        "itemCreationDate": "2024-01-15T10:30:00.000Z",
+        "topRatedBuyingExperience": rng.random() < 0.3,
+        "priorityListing": False,
+        "listingMarketplaceId": "EBAY_GB",
+    }
+    if rng.random() < 0.7:
+        shipping = rng.choice(["0.00", "2.99", "3.95", "4.99", "7.50"])
+        summary["shippingOptions"] = [{
+            "shippingCostType": "FIXED",
+            "shippingCost": {"value": shipping, "currency": "GBP"},
+        }]
+    return summary
+
+
+def browse_response(size: int, seed: int = 0) -> dict[str, Any]:
+    """Build a Browse API search response with size items."""
+    rng = random.Random(seed)
+    return {
+        "href": "https://api.ebay.com/buy/browse/v1/item_summary/search?q=bench",
+        "total": size,
+        "limit": size,
+        "offset": 0,
+        "itemSummaries": [browse_item(rng, i) for i in range(size)],
+    }
+
+
+def finding_item(rng: random.Random, index: int, sold: bool) -> dict[str, Any]:
+    """Build one Finding API item."""
+    condition_id, condition = rng.choice(CONDITIONS)
+    price = round(rng.lognormvariate(5.0, 0.5), 2)
+    item_id = str(220000000000 + index)
+    item = {
+        "itemId": [item_id],
+        "title": [f"{rng.choice(TITLES)} #{index}"],
+        "globalId": ["EBAY-GB"],
+        "primaryCategory": [{"categoryId": ["139971"], "categoryName": ["Consoles"]}],
+        "galleryURL": [f"https://thumbs.ebaystatic.com/pict/{item_id}.jpg"],
+        "viewItemURL": [f"https://www.ebay.co.uk/itm/{item_id}"],
+        "location": ["London,United Kingdom"],
+        "country": ["GB"],
+        "shippingInfo": [{
+            "shippingServiceCost": [{"@currencyId": "GBP", "__value__": rng.choice(["0.0", "2.99", "4.99"])}],
+            "shippingType": ["Flat"],
+            "shipToLocations": ["GB"],
+        }],
+        "sellingStatus": [{
+            "currentPrice": [{"@currencyId": "GBP", "__value__": f"{price:.2f}"}],
+            "convertedCurrentPrice": [{"@currencyId": "GBP", "__value__": f"{price:.2f}"}],
+            "sellingState": ["EndedWithSales" if sold else "Active"],
+        }],
+        "listingInfo": [{
+            "bestOfferEnabled": ["false"],
+            "buyItNowAvailable": ["false"],
+            "startTime": ["2024-01-01T10:30:00.000Z"],
+            "endTime": [f"2024-01-{1 + index % 28:02d}T10:30:00.000Z"],
+            "listingType": [rng.choice(["FixedPrice", "Auction", "StoreInventory"])],
+        }],
+        "condition": [{"conditionId": [condition_id], "conditionDisplayName": [condition]}],
+        "topRatedListing": ["false"],
+    }
+    return item
+
+
+def finding_response(size: int, sold: bool = True, seed: int = 0) -> dict[str, Any]:
+    """Build a Finding API response with size items."""
+    rng = random.Random(seed)
+    key = "findCompletedItemsResponse" if sold else "findItemsByKeywordsResponse"
+    return {
+        key: [{
+            "ack": ["Success"],
+            "version": ["1.13.0"],
+            "timestamp": ["2024-01-15T10:30:00.000Z"],
+            "searchResult": [{
+                "@count": str(size),
+                "item": [finding_item(rng, i, sold) for i in range(size)],
+            }],
+            "paginationOutput": [{
+                "pageNumber": ["1"],
+                "entriesPerPage": [str(size)],
+                "totalPages": ["1"],
+                "totalEntries": [str(size)],
+            }],
+        }]
+    }
+
+
+def write_fixtures(directory: str, sizes=BROWSE_SIZES) -> list[Path]:
+    """Write every fixture to JSON files (for inspection or replay elsewhere)."""
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for size in sizes:
+        for name, data in (
+            (f"browse_{size}.json", browse_response(size)),
+            (f"finding_sold_{size}.json", finding_response(size, sold=True)),
+            (f"finding_active_{size}.json", finding_response(size, sold=False)),
+        ):
+            path = out / name
+            path.write_text(json.dumps(data))
+            paths.append(path)
+    return paths
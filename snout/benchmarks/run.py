@@ -0,0 +1,304 @@
+"""
+Offline benchmark suite for Snout.
+
+Replays fixture eBay responses (50, 200 and 1,000 items by default)
+through a local stub server and measures, per size:
+
+- parse: ``_parse_results`` for Browse and Finding payloads
+- stats: ``calculate_price_stats`` over the parsed items
+- serialise: building and JSON-encoding the response body
+- page: one Browse page from raw response bytes to encoded response body
+  (decode, parse, stats, build, encode), the CPU cost per upstream page
+- endpoints: p50/p99 latency and throughput of /api/search,
+  /search/sold and /api/compare, end to end through Flask, the services
+  and HTTP to the stub
+
+Results are written as JSON so runs can be compared across commits::
+
+    python -m snout.benchmarks --output bench.json
+    python -m snout.benchmarks --baseline bench.json --output new.json
+"""
+import argparse
+import json
+import logging
+import math
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from werkzeug.datastructures import MultiDict
+
+from .. import app as server
+from ..config import Config
+from ..services.ebay_browse_service import EbayBrowseService
+from ..services.ebay_service import EbayFindingService
+from ..services.price_analyzer import calculate_price_stats
+from ..utils import json_codec
+from .fixtures import BROWSE_SIZES, browse_response, finding_response
+from .stub_server import BROWSE_PATH, FINDING_PATH, TOKEN_PATH, StubEbayServer
+
+logger = logging.getLogger("snout.benchmarks")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (0-100) of already sorted values."""
+    rank = max(math.ceil(q / 100 * len(values)) - 1, 0)
+    return values[rank]
+
+
+def summarize(durations: list[float]) -> dict[str, float]:
+    """Summarise durations in seconds as milliseconds."""
+    ordered = sorted(durations)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+    }
+
+
+def time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 3) -> list[float]:
+    """Call fn repeatedly, returning the duration of each timed call."""
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def bench_micro(size: int, iterations: int) -> dict[str, dict]:
+    """Time parsing, stats and serialisation for one fixture size."""
+    browse_data = browse_response(size)
+    browse_bytes = json_codec.dumps(browse_data)
+    finding_data = finding_response(size, sold=True)
+    browse_items = EbayBrowseService._parse_results(browse_data)
+    finding_items = EbayFindingService._parse_results(finding_data, True)
+    keywords, filters, query = server.parse_browse_query(MultiDict({"q": "bench", "limit": "200"}))
+
+    def serialise_browse():
+        return server.app.json.dumps(server.build_browse_response(keywords, filters, query, browse_items))
+
+    def browse_page():
+        items = EbayBrowseService._parse_results(json_codec.loads(browse_bytes))
+        return server.app.json.dumps(server.build_browse_response(keywords, filters, query, items))
+
+    def serialise_finding():
+        stats = calculate_price_stats(finding_items)
+        return server.app.json.dumps({"stats": stats.to_dict(), "items": server.items_to_dicts(finding_items)})
+
+    return {
+        "parse": {
+            "browse": summarize(time_calls(lambda: EbayBrowseService._parse_results(browse_data), iterations)),
+            "finding": summarize(time_calls(lambda: EbayFindingService._parse_results(finding_data, True), iterations)),
+        },
+        "stats": {
+            "browse": summarize(time_calls(lambda: calculate_price_stats(browse_items, attr="total_price"), iterations)),
+            "finding": summarize(time_calls(lambda: calculate_price_stats(finding_items), iterations)),
+        },
+        "serialise": {
+            "browse": summarize(time_calls(serialise_browse, iterations)),
+            "finding": summarize(time_calls(serialise_finding, iterations)),
+        },
+        "page": {
+            "browse": summarize(time_calls(browse_page, iterations)),
+        },
+    }
+
+
+def endpoint_urls(size: int) -> dict[str, str]:
+    """Request URLs per endpoint; sizes over one Browse page use deep mode."""
+    browse = f"q=bench&limit={min(size, EbayBrowseService.MAX_PAGE_SIZE)}"
+    if size > EbayBrowseService.MAX_PAGE_SIZE:
+        browse += f"&deep={size}"
+    return {
+        "/api/search": f"/api/search?{browse}",
+        "/search/sold": "/search/sold?q=bench",
+        "/api/compare": f"/api/compare?q=bench&limit={min(size, EbayBrowseService.MAX_PAGE_SIZE)}",
+    }
+
+
+def bench_endpoints(size: int, iterations: int, concurrency: int) -> dict[str, dict]:
+    """Measure end-to-end latency and throughput of each endpoint."""
+    results = {}
+    for endpoint, url in endpoint_urls(size).items():
+        client = server.app.test_client()
+
+        def call(client=client, url=url):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url} returned {response.status_code}: {response.get_data(as_text=True)}")
+            return response
+
+        latency = summarize(time_calls(call, iterations))
+
+        clients = [server.app.test_client() for _ in range(concurrency)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda i: call(clients[i % concurrency]), range(iterations)))
+        elapsed = time.perf_counter() - started
+
+        results[endpoint] = {
+            **latency,
+            "throughput_rps": round(iterations / elapsed, 2),
+            "concurrency": concurrency,
+        }
+    return results
+
+
+def benchmark_config(stub_url: str, size: int) -> Config:
+    """Config pointing every eBay endpoint at the stub, with caching off."""
+    return Config(
+        ebay_app_id="benchmark-app",
+        ebay_cert_id="benchmark-cert",
+        ebay_oauth_token=None,
+        ebay_finding_api=stub_url + FINDING_PATH,
+        ebay_browse_api=stub_url + BROWSE_PATH,
+        ebay_token_endpoint=stub_url + TOKEN_PATH,
+        max_results_per_page=size,
+        deep_search_max_items=max(size, Config.deep_search_max_items),
+        search_cache_backend="none",
+    )
+
+
+@contextmanager
+def benchmark_app(config: Config) -> Iterator[None]:
+    """Point the Flask app at a benchmark config, restoring its state afterwards."""
+    saved = {
+        name: getattr(server, name)
+        for name in (
+            "config", "http_transport", "quota", "ebay_service", "auth_service", "browse_service", "price_history",
+            "cache_policies", "compress_min_size", "watchlist", "change_tracker", "SNOUT_API_KEY",
+        )
+    }
+    limiter_enabled = server.limiter.enabled
+    try:
+        server.create_app(config)
+        server.price_history = None
+        server.SNOUT_API_KEY = None
+        server.limiter.enabled = False
+        yield
+    finally:
+        if server.auth_service is not None:
+            server.auth_service.close()
+        for name, value in saved.items():
+            setattr(server, name, value)
+        server.limiter.enabled = limiter_enabled
+
+
+def git_commit() -> str | None:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = BROWSE_SIZES,
+    iterations: int = 50,
+    concurrency: int = 8,
+    endpoints: bool = True,
+) -> dict[str, Any]:
+    """
+    Run the suite and return the results.
+
+    Args:
+        sizes: Fixture sizes (items per response)
+        iterations: Timed calls per measurement
+        concurrency: Parallel clients for the throughput measurement
+        endpoints: Whether to run the end-to-end endpoint benchmarks
+
+    Returns:
+        JSON-compatible results, keyed by size
+    """
+    results: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "concurrency": concurrency,
+        },
+        "sizes": {},
+    }
+
+    stub = StubEbayServer().start() if endpoints else None
+    try:
+        for size in sizes:
+            logger.info("Benchmarking %d items", size)
+            result = bench_micro(size, iterations)
+            if stub is not None:
+                stub.size = size
+                with benchmark_app(benchmark_config(stub.url, size)):
+                    result["endpoints"] = bench_endpoints(size, iterations, concurrency)
+            results["sizes"][str(size)] = result
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    return results
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    """Describe p50 changes between two result sets, one line per measurement."""
+    lines = []
+    for size, groups in current["sizes"].items():
+        for group, measurements in groups.items():
+            for name, summary in measurements.items():
+                before = baseline.get("sizes", {}).get(size, {}).get(group, {}).get(name)
+                if not before or not before.get("p50_ms"):
+                    continue
+                change = (summary["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+                lines.append(
+                    f"{size:>5} {group:<10} {name:<14} p50 {before['p50_ms']:>10.3f} -> "
+                    f"{summary['p50_ms']:>10.3f} ms ({change:+.1f}%)"
+                )
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run Snout's offline benchmark suite.")
+    parser.add_argument("--sizes", default=",".join(map(str, BROWSE_SIZES)),
+                        help="comma-separated items per response (default: 50,200,1000)")
+    parser.add_argument("--iterations", type=int, default=50, help="timed calls per measurement")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel clients for throughput")
+    parser.add_argument("--skip-endpoints", action="store_true", help="only run parse/stats/serialise")
+    parser.add_argument("--output", help="write results JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("snout").setLevel(logging.WARNING)
+
+    results = run_benchmarks(
+        sizes=tuple(int(s) for s in args.sizes.split(",")),
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        endpoints=not args.skip_endpoints,
+    )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        print("\n".join(compare_results(baseline, results)), file=sys.stderr)
+
+    return 0
@@ -0,0 +1,120 @@
+"""
+Local stub of the eBay endpoints Snout calls, serving benchmark fixtures.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .fixtures import browse_response, finding_response
+
+TOKEN_PATH = "/identity/v1/oauth2/token"
+BROWSE_PATH = "/buy/browse/v1/item_summary/search"
+FINDING_PATH = "/services/search/FindingService/v1"
+
+
+class StubEbayServer:
+    """
+    Threaded HTTP server replaying fixtures for the token, Browse and Finding endpoints.
+
+    ``size`` sets how many items the current fixtures hold. Browse requests
+    get the ``offset``/``limit`` slice, so deep searches page through it.
+    Responses are encoded once and reused, keeping the stub's own cost out
+    of the measurements.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.size = 50
+        self.requests = 0
+        self._bodies: dict[tuple, bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ebay-stub", daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubEbayServer":
+        """Start serving in a background thread."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def body(self, path: str, params: dict[str, list[str]]) -> bytes | None:
+        """Return the encoded response for a request, or None for unknown paths."""
+        size = self.size
+        if path == TOKEN_PATH:
+            key = ("token",)
+        elif path == BROWSE_PATH:
+            offset = int(params.get("offset", ["0"])[0])
+            limit = int(params.get("limit", ["50"])[0])
+            key = ("browse", size, offset, limit)
+        elif path == FINDING_PATH:
+            key = ("finding", size, params.get("OPERATION-NAME", [""])[0] == "findCompletedItems")
+        else:
+            return None
+
+        with self._lock:
+            body = self._bodies.get(key)
+        if body is not None:
+            return body
+
+        if key[0] == "token":
+            data = {"access_token": "benchmark-token", "expires_in": 7200, "token_type": "Application Access Token"}
+        elif key[0] == "browse":
+            data = browse_response(size)
+            data["offset"], data["limit"] = offset, limit
+            data["itemSummaries"] = data["itemSummaries"][offset:offset + limit]
+        else:
+            data = finding_response(size, sold=key[2])
+
+        body = json.dumps(data).encode()
+        with self._lock:
+            self._bodies[key] = body
+        return body
+
+    def _handler(self):
+        """Build the request handler class bound to this server."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                body = stub.body(url.path, parse_qs(url.query))
+                with stub._lock:
+                    stub.requests += 1
+
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
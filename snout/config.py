@@ -42,9 +42,55 @@ class Config:
     default_marketplace: str = "EBAY_GB"
 
     # Request settings
-    request_timeout: int = 30
+    request_timeout: int = 30  # read timeout for eBay calls
     max_results_per_page: int = 100
 
+    # Shared HTTP transport for all eBay clients
+    http_pool_size: int = 32  # keep-alive connections per host
+    http_connect_timeout: float = 5.0
+    http_connect_retries: int = 2  # retries of failed connects (nothing was sent yet)
+
+    # Retries, hedging and circuit breaking per upstream endpoint
+    upstream_retry_attempts: int = 3  # total tries for timeouts, 429 and 5xx
+    upstream_retry_base_delay: float = 0.2  # seconds; full-jitter exponential backoff
+    upstream_retry_max_delay: float = 2.0
+    circuit_failure_threshold: int = 5  # consecutive failed calls before opening
+    circuit_reset_timeout: float = 30.0  # seconds open before a probe is let through
+    hedge_requests: bool = False  # send a duplicate request after the recent p95 latency
+    hedge_min_delay: float = 0.05  # never hedge sooner than this (seconds)
+
+    # HTTP caching of search responses (ETag, Cache-Control, compression)
+    http_cache_active_max_age: int = 60  # seconds clients/CDNs may reuse active-listing results
+    http_cache_sold_max_age: int = 900  # sold results change slowly
+    http_compress_min_size: int = 1024  # bytes; smaller bodies are sent uncompressed
+
+    # Shared executor for concurrent eBay searches
+    fanout_workers: int = 16  # upstream searches in flight across the process
+    fanout_deadline: float = 60.0  # seconds for one fan-out (deep, batch, compare)
+
+    # Deep (multi-page) Browse searches
+    deep_search_max_items: int = 2000
+    deep_search_workers: int = 5
+
+    # Multi-page Finding searches (pages= on /search/sold and /search/compare)
+    finding_max_pages: int = 10  # eBay serves at most 100 pages of max_results_per_page
+
+    # Batch Browse searches (POST /api/search/batch)
+    batch_search_max_queries: int = 100
+    batch_search_workers: int = 8  # searches in flight per batch
+
+    # Watchlist of queries refreshed in the background (/api/watchlist)
+    watchlist_workers: int = 4  # refreshes in flight at once
+    watchlist_max_entries: int = 500
+    watchlist_initial_interval: float = 300.0  # seconds between refreshes of a new entry
+    watchlist_min_interval: float = 60.0  # intervals adapt to price movement within these bounds
+    watchlist_max_interval: float = 3600.0
+    watchlist_change_threshold: float = 0.02  # relative median change that shortens the interval
+
+    # Listing change detection (/api/search/changes)
+    change_tracker_max_queries: int = 1024  # queries with a retained snapshot (LRU)
+    change_tracker_history: int = 32  # versions a since token can reach back
+
     # Validation limits
     max_keyword_length: int = 1000
     min_keyword_length: int = 1
@@ -53,6 +99,26 @@ class Config:
     rate_limit_default: str = "100 per minute"
     rate_limit_search: str = "30 per minute"
     rate_limit_browse: str = "20 per minute"
+    rate_limit_storage_uri: str = "memory://"  # sqlite:///path shares limits across worker processes
+
+    # Daily eBay call quota (0 = unlimited), counted in the rate-limit storage
+    ebay_daily_quota_browse: int = 5000
+    ebay_daily_quota_finding: int = 5000
+    quota_cache_only_fraction: float = 0.9  # past this share of a quota, answer from cache when possible
+
+    # OAuth token management
+    token_refresh_fraction: float = 0.8  # proactively refresh after this share of expires_in
+    token_store_path: str | None = None  # shared token file for multi-worker deployments
+
+    # Search response cache
+    search_cache_backend: str = "memory"  # memory, disk or none
+    search_cache_ttl: int = 300
+    search_cache_stale_ttl: int = 60  # serve stale while revalidating; 0 disables
+    search_cache_max_entries: int = 1024
+    search_cache_path: str = ".snout_cache/search_cache.sqlite3"
+
+    # Local price history (SQLite); None disables recording
+    price_history_path: str | None = None
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -74,6 +140,46 @@ class Config:
             default_marketplace=os.environ.get("DEFAULT_MARKETPLACE", "EBAY_GB"),
             ebay_browse_api=browse_api,
             ebay_token_endpoint=token_endpoint,
+            rate_limit_storage_uri=os.environ.get("RATE_LIMIT_STORAGE_URI", "memory://"),
+            ebay_daily_quota_browse=int(os.environ.get("EBAY_DAILY_QUOTA_BROWSE", 5000)),
+            ebay_daily_quota_finding=int(os.environ.get("EBAY_DAILY_QUOTA_FINDING", 5000)),
+            quota_cache_only_fraction=float(os.environ.get("QUOTA_CACHE_ONLY_FRACTION", 0.9)),
+            token_refresh_fraction=float(os.environ.get("TOKEN_REFRESH_FRACTION", 0.8)),
+            token_store_path=os.environ.get("TOKEN_STORE_PATH"),
+            search_cache_backend=os.environ.get("SEARCH_CACHE_BACKEND", "memory"),
+            search_cache_ttl=int(os.environ.get("SEARCH_CACHE_TTL", 300)),
+            search_cache_stale_ttl=int(os.environ.get("SEARCH_CACHE_STALE_TTL", 60)),
+            search_cache_max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 1024)),
+            search_cache_path=os.environ.get("SEARCH_CACHE_PATH", ".snout_cache/search_cache.sqlite3"),
+            http_pool_size=int(os.environ.get("HTTP_POOL_SIZE", 32)),
+            http_connect_timeout=float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5.0)),
+            http_connect_retries=int(os.environ.get("HTTP_CONNECT_RETRIES", 2)),
+            upstream_retry_attempts=int(os.environ.get("UPSTREAM_RETRY_ATTEMPTS", 3)),
+            upstream_retry_base_delay=float(os.environ.get("UPSTREAM_RETRY_BASE_DELAY", 0.2)),
+            upstream_retry_max_delay=float(os.environ.get("UPSTREAM_RETRY_MAX_DELAY", 2.0)),
+            circuit_failure_threshold=int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5)),
+            circuit_reset_timeout=float(os.environ.get("CIRCUIT_RESET_TIMEOUT", 30.0)),
+            hedge_requests=os.environ.get("HEDGE_REQUESTS", "").lower() in ("1", "true", "yes"),
+            hedge_min_delay=float(os.environ.get("HEDGE_MIN_DELAY", 0.05)),
+            http_cache_active_max_age=int(os.environ.get("HTTP_CACHE_ACTIVE_MAX_AGE", 60)),
+            http_cache_sold_max_age=int(os.environ.get("HTTP_CACHE_SOLD_MAX_AGE", 900)),
+            http_compress_min_size=int(os.environ.get("HTTP_COMPRESS_MIN_SIZE", 1024)),
+            fanout_workers=int(os.environ.get("FANOUT_WORKERS", 16)),
+            fanout_deadline=float(os.environ.get("FANOUT_DEADLINE", 60.0)),
+            deep_search_max_items=int(os.environ.get("DEEP_SEARCH_MAX_ITEMS", 2000)),
+            deep_search_workers=int(os.environ.get("DEEP_SEARCH_WORKERS", 5)),
+            batch_search_max_queries=int(os.environ.get("BATCH_SEARCH_MAX_QUERIES", 100)),
+            batch_search_workers=int(os.environ.get("BATCH_SEARCH_WORKERS", 8)),
+            finding_max_pages=int(os.environ.get("FINDING_MAX_PAGES", 10)),
+            watchlist_workers=int(os.environ.get("WATCHLIST_WORKERS", 4)),
+            watchlist_max_entries=int(os.environ.get("WATCHLIST_MAX_ENTRIES", 500)),
+            watchlist_initial_interval=float(os.environ.get("WATCHLIST_INITIAL_INTERVAL", 300.0)),
+            watchlist_min_interval=float(os.environ.get("WATCHLIST_MIN_INTERVAL", 60.0)),
+            watchlist_max_interval=float(os.environ.get("WATCHLIST_MAX_INTERVAL", 3600.0)),
+            watchlist_change_threshold=float(os.environ.get("WATCHLIST_CHANGE_THRESHOLD", 0.02)),
+            change_tracker_max_queries=int(os.environ.get("CHANGE_TRACKER_MAX_QUERIES", 1024)),
+            change_tracker_history=int(os.environ.get("CHANGE_TRACKER_HISTORY", 32)),
+            price_history_path=os.environ.get("PRICE_HISTORY_PATH"),
         )
 
     @property
@@ -81,6 +187,13 @@ class Config:
         """Check if eBay API is configured."""
         return bool(self.ebay_app_id)
 
+    @property
+    def shared_state_path(self) -> str | None:
+        """SQLite file shared by worker processes (the sqlite:/// rate-limit storage), or None."""
+        if self.rate_limit_storage_uri.startswith("sqlite://"):
+            return self.rate_limit_storage_uri.split("://", 1)[1]
+        return None
+
     @property
     def has_app_id(self) -> bool:
         """Check if eBay App ID is configured."""
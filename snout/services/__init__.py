@@ -2,11 +2,12 @@
 from .auth_service import EbayAuthService
 from .ebay_browse_service import EbayBrowseService
 from .ebay_service import EbayFindingService
-from .price_analyzer import calculate_price_stats
+from .price_analyzer import PriceAccumulator, calculate_price_stats
 
 __all__ = [
     "EbayAuthService",
     "EbayBrowseService",
     "EbayFindingService",
+    "PriceAccumulator",
     "calculate_price_stats",
 ]
@@ -0,0 +1,312 @@
+"""
+asyncio-native eBay API clients.
+
+Request building and response parsing are shared with the synchronous
+services; only the transport (``httpx.AsyncClient``) differs, so results are
+the same ``BrowseItem`` objects. The legacy Finding API routes are served by
+the sync service only.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from ..config import Config
+from ..utils import json_codec
+from .auth_service import AuthError, EbayAuthService, FileTokenStore, MemoryTokenStore, TokenRecord, token_usable
+from .ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from .fanout import DeadlineExceeded
+from .http_transport import async_timeout
+from .metrics import TOKEN_REFRESH_SECONDS, UPSTREAM_SECONDS
+from .rate_limit import QuotaAccountant, QuotaExhaustedError
+from .resilience import CircuitOpenError, UpstreamGuard
+from .search_cache import SearchCache
+from .singleflight import AsyncSingleFlight
+
+logger = logging.getLogger("snout.async")
+
+
+class AsyncEbayAuthService:
+    """
+    Async manager for OAuth client_credentials tokens.
+
+    Refreshes follow the sync service: coroutines share one refresh, worker
+    processes serialise on the token store's lock, and a token already in the
+    store (for example one refreshed by the sync service or another worker)
+    is adopted before fetching a new one. Once ``refresh_fraction`` of a
+    token's lifetime has passed, the next caller gets the current token
+    while a background task renews it.
+    """
+
+    def __init__(
+        self,
+        app_id: str,
+        cert_id: str,
+        token_endpoint: str = "https://api.ebay.com/identity/v1/oauth2/token",
+        client: httpx.AsyncClient | None = None,
+        store: MemoryTokenStore | FileTokenStore | None = None,
+        refresh_fraction: float = 0.8,
+    ):
+        self._app_id = app_id
+        self._cert_id = cert_id
+        self._token_endpoint = token_endpoint
+        self._store = store or MemoryTokenStore()
+        self._refresh_fraction = refresh_fraction
+        self._record: TokenRecord | None = None
+        self._lock = asyncio.Lock()
+        self._early_refresh: asyncio.Task | None = None
+        self._client = client or httpx.AsyncClient()
+
+    async def get_token(self) -> str:
+        """
+        Return a valid Bearer token, refreshing if expired.
+
+        Concurrent callers wait for a single refresh.
+
+        Returns:
+            Bearer token string
+
+        Raises:
+            AuthError: If token acquisition fails
+        """
+        record = self._record
+        if token_usable(record):
+            if not token_usable(record, proactive=True) and self._early_refresh is None:
+                self._early_refresh = asyncio.create_task(self._refresh_early())
+            return record.access_token
+
+        return (await self._obtain(proactive=False)).access_token
+
+    async def _obtain(self, proactive: bool) -> TokenRecord:
+        """
+        Return a usable token, refreshing at most once across coroutines and processes.
+
+        Args:
+            proactive: Treat tokens past their refresh point as due, not just
+                expired ones
+        """
+        async with self._lock:
+            if token_usable(self._record, proactive):
+                return self._record
+
+            async with self._store_lock():
+                # A file-backed store reads and writes disk, so keep it off the event loop
+                record = await asyncio.to_thread(self._store.load)
+                if not token_usable(record, proactive):
+                    record = await self._refresh_token()
+                    await asyncio.to_thread(self._store.save, record)
+
+            self._record = record
+            return record
+
+    @asynccontextmanager
+    async def _store_lock(self) -> AsyncIterator[None]:
+        """Hold the token store's cross-process lock, waiting for it in a thread."""
+        lock = self._store.lock()
+        acquire = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # The thread still takes the lock; release it once it has
+            acquire.add_done_callback(lambda f: f.cancelled() or f.exception() or lock.__exit__(None, None, None))
+            raise
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+
+    async def _refresh_early(self) -> None:
+        """Background task: renew a token past its refresh point before it expires."""
+        try:
+            await self._obtain(proactive=True)
+        except AuthError as e:
+            logger.warning("Proactive token refresh failed: %s", e)
+        finally:
+            self._early_refresh = None
+
+    async def _refresh_token(self) -> TokenRecord:
+        """Fetch a new client_credentials token from eBay."""
+        headers, data = EbayAuthService._build_token_request(self._app_id, self._cert_id)
+
+        started = time.perf_counter()
+        try:
+            response = await self._client.post(
+                self._token_endpoint,
+                headers=headers,
+                data=data,
+                timeout=10,
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error("Failed to acquire eBay token: %s", e)
+            raise AuthError("Failed to acquire eBay OAuth token") from e
+        finally:
+            TOKEN_REFRESH_SECONDS.observe(time.perf_counter() - started)
+
+        return EbayAuthService._read_token_response(response.json(), self._refresh_fraction)
+
+    async def aclose(self) -> None:
+        """Cancel any early refresh and close the underlying HTTP client."""
+        if self._early_refresh is not None:
+            self._early_refresh.cancel()
+        await self._client.aclose()
+
+
+class AsyncEbayBrowseService:
+    """Async service for eBay Browse API item_summary/search."""
+
+    def __init__(
+        self,
+        config: Config,
+        auth_service: AsyncEbayAuthService,
+        cache: SearchCache | None = None,
+        client: httpx.AsyncClient | None = None,
+        quota: QuotaAccountant | None = None,
+        guard: UpstreamGuard | None = None,
+    ):
+        self._config = config
+        self._auth = auth_service
+        self._cache = cache
+        self._quota = quota
+        self._guard = guard or UpstreamGuard.from_config("browse", config)
+        self._flight = AsyncSingleFlight()
+        self._background: set[asyncio.Task] = set()
+        self._client = client or httpx.AsyncClient()
+
+    @property
+    def cache(self) -> SearchCache | None:
+        """The response cache, if one is configured."""
+        return self._cache
+
+    @property
+    def guard(self) -> UpstreamGuard:
+        """Retry, hedging and circuit-breaker state, shared with the sync service when passed in."""
+        return self._guard
+
+    async def search(self, query: BrowseSearchQuery, use_cache: bool = True) -> list[BrowseItem]:
+        """
+        Search active listings via Browse API.
+
+        Same contract as EbayBrowseService.search.
+
+        Args:
+            query: Search parameters
+            use_cache: Whether a cached result may be returned
+
+        Returns:
+            List of BrowseItem results
+
+        Raises:
+            BrowseApiError: If the API request fails
+        """
+        key = query.cache_key()
+        # The quota counters and the disk cache may be SQLite files, so their
+        # reads and writes run off the event loop
+        cache_only = self._guard.is_open() or (
+            self._quota is not None and await asyncio.to_thread(self._quota.cache_only, "browse")
+        )
+
+        if self._cache is not None and (use_cache or cache_only):
+            cached = await asyncio.to_thread(self._cache.lookup, key)
+            if cached is not None:
+                items, fresh = cached
+                if not fresh and not cache_only and not self._flight.in_flight(key):
+                    task = asyncio.create_task(self._revalidate(key, query))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return items
+
+        return await self._flight.do(key, lambda: self._fetch_and_store(key, query))
+
+    async def search_deep(
+        self, query: BrowseSearchQuery, target: int, use_cache: bool = True
+    ) -> list[BrowseItem]:
+        """
+        Fetch up to target items by requesting the offset pages concurrently.
+
+        Same contract as EbayBrowseService.search_deep: at most
+        ``deep_search_workers`` pages in flight, and the remaining page
+        fetches are cancelled when one fails or fanout_deadline passes.
+
+        Raises:
+            BrowseApiError: If any page request fails
+            DeadlineExceeded: If the pages take longer than fanout_deadline
+        """
+        page_queries = EbayBrowseService._page_queries(query, target)
+        semaphore = asyncio.Semaphore(self._config.deep_search_workers)
+        timeout = self._config.fanout_deadline
+
+        async def fetch_page(page_query: BrowseSearchQuery) -> list[BrowseItem]:
+            async with semaphore:
+                return await self.search(page_query, use_cache)
+
+        tasks = [asyncio.ensure_future(fetch_page(q)) for q in page_queries]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+            for task in tasks:
+                if task in done and task.exception() is not None:
+                    raise task.exception()
+            if pending:
+                raise DeadlineExceeded(f"{len(pending)} of {len(tasks)} pages did not finish within {timeout}s")
+            pages = [task.result() for task in tasks]
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        return EbayBrowseService._merge_pages(pages, target)
+
+    async def _fetch_and_store(self, key: str, query: BrowseSearchQuery) -> list[BrowseItem]:
+        """Fetch a page and store it in the cache, if one is configured."""
+        items = await self._fetch(query)
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache.set, key, items)
+        return items
+
+    async def _revalidate(self, key: str, query: BrowseSearchQuery) -> None:
+        """Refresh a stale cache entry in the background."""
+        try:
+            await self._flight.do(key, lambda: self._fetch_and_store(key, query))
+        except (BrowseApiError, AuthError) as e:
+            logger.warning("Background refresh failed for %s: %s", query.keywords, e)
+
+    async def _fetch(self, query: BrowseSearchQuery) -> list[BrowseItem]:
+        """Fetch and parse one page of results from the Browse API, retrying transient failures."""
+        token = await self._auth.get_token()
+        headers = EbayBrowseService._build_headers(query, token)
+
+        logger.debug("Browse API request: q=%s, params=%s", query.keywords, query.query_string)
+
+        async def request() -> httpx.Response:
+            if self._quota is not None:
+                # The shared counter may be a SQLite file, so keep it off the event loop
+                await asyncio.to_thread(self._quota.spend, "browse")
+            with UPSTREAM_SECONDS.labels("browse", "item_summary_search").time():
+                response = await self._client.get(
+                    query.url(self._config.ebay_browse_api),
+                    headers=headers,
+                    timeout=async_timeout(self._config),
+                )
+                response.raise_for_status()
+            return response
+
+        try:
+            response = await self._guard.acall(request)
+        except (CircuitOpenError, QuotaExhaustedError) as e:
+            raise BrowseApiError(f"eBay Browse API is unavailable: {e}") from e
+        except httpx.HTTPError as e:
+            logger.error("Browse API request failed: %s", e)
+            raise BrowseApiError("Failed to communicate with eBay Browse API") from e
+
+        try:
+            data = json_codec.loads(response.content)
+        except ValueError as e:
+            logger.error("Browse API returned invalid JSON: %s", e)
+            raise BrowseApiError("eBay Browse API returned an invalid response") from e
+        return EbayBrowseService._parse_results(data)
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client."""
+        await self._client.aclose()
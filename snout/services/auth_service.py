@@ -2,11 +2,26 @@
 eBay OAuth client_credentials token manager.
 """
 import base64
+import json
 import logging
+import os
+import threading
 import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
 
 import requests
 
+from .http_transport import HttpTransport
+from .metrics import TOKEN_REFRESH_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
 logger = logging.getLogger("snout.auth")
 
 
@@ -16,18 +31,143 @@ class AuthError(Exception):
     pass
 
 
+@dataclass
+class TokenRecord:
+    """An OAuth token with its hard expiry and proactive refresh times."""
+
+    access_token: str
+    expires_at: float
+    refresh_at: float
+
+
+def token_usable(record: TokenRecord | None, proactive: bool = False) -> bool:
+    """
+    Check whether a token can still be used.
+
+    Args:
+        record: Token to check
+        proactive: Treat tokens past their refresh point as due, not just
+            expired ones
+    """
+    if record is None:
+        return False
+    return time.time() < (record.refresh_at if proactive else record.expires_at)
+
+
+class MemoryTokenStore:
+    """Token store local to one process."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._record: TokenRecord | None = None
+        self._lock = threading.Lock()
+
+    def load(self) -> TokenRecord | None:
+        """Return the stored token, if any."""
+        return self._record
+
+    def save(self, record: TokenRecord) -> None:
+        """Store a token."""
+        self._record = record
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold exclusive refresh rights."""
+        with self._lock:
+            yield
+
+
+class FileTokenStore:
+    """
+    Token store in a JSON file, shared by every process on the host.
+
+    Refreshes are serialised with an flock on a sibling ``.lock`` file, so a
+    multi-worker deployment holds one token instead of one per worker.
+    """
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self._path.with_name(self._path.name + ".lock")
+
+    def load(self) -> TokenRecord | None:
+        """Return the stored token, or None if missing or unreadable."""
+        try:
+            return TokenRecord(**json.loads(self._path.read_text()))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable token store %s: %s", self._path, e)
+            return None
+
+    def save(self, record: TokenRecord) -> None:
+        """Atomically replace the stored token (owner read/write only)."""
+        tmp_path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(record), f)
+        os.replace(tmp_path, self._path)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold exclusive refresh rights across processes."""
+        with open(self._lock_path, "a") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
 class EbayAuthService:
-    """Manages OAuth client_credentials tokens for eBay Browse API."""
+    """
+    Manages OAuth client_credentials tokens for eBay Browse API.
+
+    Only one refresh runs at a time: threads share a lock and processes
+    share the token store's lock, and a token refreshed elsewhere is adopted
+    rather than fetched again. With proactive refresh on, a background timer
+    renews the token once ``refresh_fraction`` of its lifetime has passed, so
+    requests never wait on the identity endpoint.
+    """
 
     TOKEN_LIFETIME = 7200  # 2 hours
 
-    def __init__(self, app_id: str, cert_id: str, token_endpoint: str = "https://api.ebay.com/identity/v1/oauth2/token"):
+    def __init__(
+        self,
+        app_id: str,
+        cert_id: str,
+        token_endpoint: str = "https://api.ebay.com/identity/v1/oauth2/token",
+        store: MemoryTokenStore | FileTokenStore | None = None,
+        refresh_fraction: float = 0.8,
+        proactive_refresh: bool = True,
+        transport: HttpTransport | None = None,
+    ):
         self._app_id = app_id
         self._cert_id = cert_id
         self._token_endpoint = token_endpoint
-        self._token: str | None = None
-        self._expires_at: float = 0
-        self._session = requests.Session()
+        self._store = store or MemoryTokenStore()
+        self._refresh_fraction = refresh_fraction
+        self._proactive_refresh = proactive_refresh
+        self._record: TokenRecord | None = None
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._transport = transport or HttpTransport()
+        self._session = self._transport.session
+
+        self.refresh_count = 0
+        self.refresh_failures = 0
+        self.last_refresh_latency = 0.0
+        self._total_refresh_latency = 0.0
+
+    @property
+    def store(self) -> MemoryTokenStore | FileTokenStore:
+        """The token store shared with other services and processes."""
+        return self._store
 
     def get_token(self) -> str:
         """
@@ -39,44 +179,128 @@ class EbayAuthService:
         Raises:
             AuthError: If token acquisition fails
         """
-        if self._token and time.time() < self._expires_at:
-            return self._token
-
-        return self._refresh_token()
+        record = self._record
+        if record and time.time() < record.expires_at:
+            return record.access_token
 
-    def _refresh_token(self) -> str:
-        """Fetch a new client_credentials token from eBay."""
-        credentials = base64.b64encode(
-            f"{self._app_id}:{self._cert_id}".encode()
-        ).decode()
+        return self._obtain(proactive=False).access_token
 
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {credentials}",
+    def metrics(self) -> dict:
+        """Return refresh count and latency for monitoring."""
+        record = self._record
+        return {
+            "store": self._store.name,
+            "refresh_count": self.refresh_count,
+            "refresh_failures": self.refresh_failures,
+            "last_refresh_latency_ms": round(self.last_refresh_latency * 1000, 1),
+            "avg_refresh_latency_ms": round(
+                self._total_refresh_latency / self.refresh_count * 1000, 1
+            ) if self.refresh_count else 0.0,
+            "token_expires_in": max(int(record.expires_at - time.time()), 0) if record else None,
         }
 
-        data = {
-            "grant_type": "client_credentials",
-            "scope": "https://api.ebay.com/oauth/api_scope",
-        }
+    def close(self) -> None:
+        """Cancel any scheduled proactive refresh."""
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def _obtain(self, proactive: bool) -> TokenRecord:
+        """
+        Return a usable token, refreshing at most once across threads and processes.
+
+        Args:
+            proactive: Treat tokens past their refresh point as due, not just
+                expired ones
+        """
+        with self._lock:
+            if token_usable(self._record, proactive):
+                return self._record
+
+            with self._store.lock():
+                record = self._store.load()
+                if not token_usable(record, proactive):
+                    record = self._refresh_token()
+                    self._store.save(record)
+
+            self._adopt(record)
+            return record
+
+    def _adopt(self, record: TokenRecord) -> None:
+        """Use a token and schedule its proactive refresh."""
+        self._record = record
+        if self._proactive_refresh:
+            self._schedule(record.refresh_at - time.time())
+
+    def _schedule(self, delay: float) -> None:
+        """(Re)arm the proactive refresh timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(max(delay, 1.0), self._refresh_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _refresh_in_background(self) -> None:
+        """Timer callback: renew the token before it expires."""
+        try:
+            self._obtain(proactive=True)
+        except AuthError:
+            record = self._record
+            if record and time.time() < record.expires_at:
+                self._schedule(min(30.0, record.expires_at - time.time()))
 
+    def _refresh_token(self) -> TokenRecord:
+        """Fetch a new client_credentials token from eBay."""
+        headers, data = self._build_token_request(self._app_id, self._cert_id)
+
+        started = time.perf_counter()
         try:
             response = self._session.post(
                 self._token_endpoint,
                 headers=headers,
                 data=data,
-                timeout=10,
+                timeout=(self._transport.connect_timeout, 10),
             )
             response.raise_for_status()
         except requests.RequestException as e:
+            self.refresh_failures += 1
             logger.error("Failed to acquire eBay token: %s", e)
             raise AuthError("Failed to acquire eBay OAuth token") from e
+        finally:
+            self.last_refresh_latency = time.perf_counter() - started
+            TOKEN_REFRESH_SECONDS.observe(self.last_refresh_latency)
+
+        self.refresh_count += 1
+        self._total_refresh_latency += self.last_refresh_latency
+        return self._read_token_response(response.json(), self._refresh_fraction)
+
+    @staticmethod
+    def _build_token_request(app_id: str, cert_id: str) -> tuple[dict[str, str], dict[str, str]]:
+        """Build the headers and form body for a client_credentials grant."""
+        credentials = base64.b64encode(
+            f"{app_id}:{cert_id}".encode()
+        ).decode()
+
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {credentials}",
+        }
+
+        data = {
+            "grant_type": "client_credentials",
+            "scope": "https://api.ebay.com/oauth/api_scope",
+        }
+        return headers, data
 
-        body = response.json()
-        self._token = body["access_token"]
-        expires_in = body.get("expires_in", self.TOKEN_LIFETIME)
-        # Refresh 60s early to avoid edge-case expiry
-        self._expires_at = time.time() + expires_in - 60
+    @classmethod
+    def _read_token_response(cls, body: dict, refresh_fraction: float = 1.0) -> TokenRecord:
+        """Build a TokenRecord from a token response."""
+        now = time.time()
+        expires_in = body.get("expires_in", cls.TOKEN_LIFETIME)
 
         logger.info("eBay OAuth token refreshed (expires in %ds)", expires_in)
-        return self._token
+        return TokenRecord(
+            access_token=body["access_token"],
+            # Refresh 60s early to avoid edge-case expiry
+            expires_at=now + expires_in - 60,
+            refresh_at=now + expires_in * min(refresh_fraction, 1.0) - 60,
+        )
@@ -0,0 +1,368 @@
+"""
+Added, removed and repriced listings between successive fetches of a query.
+
+Each tracked query keeps one compact snapshot (item_id -> total_price) plus
+the diffs that led to it. A fetch is compared with the snapshot in one pass
+over each side using dict lookups, and bumps the query's version only when
+something changed. A ``since`` token names a version; the changes since then
+are found by undoing the newer diffs on a copy of the snapshot and diffing
+that against the current one, so a client polling with its last token gets
+only the delta.
+
+Tracked queries live in a ``MemoryChangeStore`` (one worker process) or a
+``SqliteChangeStore`` shared by every worker, so with the shared store a
+token issued by one worker is honoured by the others and survives restarts.
+Tokens are opaque and include a per-query nonce, so a token from an evicted
+entry or from another store is detected and answered with a full reset
+instead of a wrong delta.
+"""
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from ..config import Config
+from ..utils import json_codec
+
+
+@dataclass(frozen=True)
+class SnapshotDiff:
+    """Changes between two snapshots of a query's results."""
+
+    added: dict[str, float] = field(default_factory=dict)
+    removed: dict[str, float] = field(default_factory=dict)
+    repriced: dict[str, tuple[float, float]] = field(default_factory=dict)  # item_id -> (old, new)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.repriced)
+
+
+def snapshot_of(items: Iterable[Any]) -> dict[str, float]:
+    """Compact snapshot of listings: item_id -> total_price rounded to pence."""
+    return {item.item_id: round(item.total_price, 2) for item in items}
+
+
+def diff_snapshots(old: dict[str, float], new: dict[str, float]) -> SnapshotDiff:
+    """
+    Compare two snapshots in O(len(old) + len(new)).
+
+    Returns:
+        Items only in new (added), only in old (removed), and in both at a
+        different price (repriced)
+    """
+    added = {}
+    repriced = {}
+    for item_id, price in new.items():
+        previous = old.get(item_id)
+        if previous is None:
+            added[item_id] = price
+        elif previous != price:
+            repriced[item_id] = (previous, price)
+    removed = {item_id: price for item_id, price in old.items() if item_id not in new}
+    return SnapshotDiff(added, removed, repriced)
+
+
+def undo(snapshot: dict[str, float], diff: SnapshotDiff) -> None:
+    """Revert a diff in place, turning its newer snapshot into the older one."""
+    for item_id in diff.added:
+        del snapshot[item_id]
+    snapshot.update(diff.removed)
+    for item_id, (old, _) in diff.repriced.items():
+        snapshot[item_id] = old
+
+
+@dataclass
+class _Tracked:
+    """Snapshot and recent diffs for one query; snapshot is None until its first fetch."""
+
+    nonce: str
+    history: int
+    version: int = 0
+    snapshot: dict[str, float] | None = None
+    diffs: deque = field(init=False)
+
+    def __post_init__(self):
+        self.diffs = deque(maxlen=self.history)
+
+    @property
+    def token(self) -> str:
+        return f"{self.nonce}-{self.version}"
+
+
+class MemoryChangeStore:
+    """Tracked queries in process memory (LRU), for a single worker process."""
+
+    def __init__(self, max_queries: int = 1024, history: int = 32):
+        self._max_queries = max_queries
+        self._history = history
+        self._queries: OrderedDict[str, _Tracked] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    @contextmanager
+    def tracked(self, key: str) -> Iterator[_Tracked]:
+        """Hold a query's state (created if new) for update; changes are kept on exit."""
+        with self._lock:
+            tracked = self._queries.get(key)
+            if tracked is None:
+                tracked = _Tracked(secrets.token_hex(4), self._history)
+                self._queries[key] = tracked
+                while len(self._queries) > self._max_queries:
+                    self._queries.popitem(last=False)
+            else:
+                self._queries.move_to_end(key)
+            yield tracked
+
+
+class SqliteChangeStore:
+    """
+    Tracked queries in a SQLite (WAL mode) file shared by worker processes.
+
+    Each update runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers recording the same query never lose a version. Queries beyond
+    ``max_queries`` are dropped least recently used first.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS change_queries (
+        key TEXT PRIMARY KEY,
+        nonce TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        snapshot TEXT NOT NULL,
+        used_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS change_diffs (
+        key TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        diff TEXT NOT NULL,
+        PRIMARY KEY (key, version)
+    );
+    CREATE INDEX IF NOT EXISTS change_queries_used_at ON change_queries (used_at);
+    """
+
+    def __init__(self, path: str, max_queries: int = 1024, history: int = 32):
+        """
+        Args:
+            path: SQLite file, usually the shared rate-limit storage
+            max_queries: Most queries tracked; the least recently used is dropped
+            history: Versions per query a since token can reach back
+        """
+        self.path = path
+        self._max_queries = max_queries
+        self._history = history
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM change_queries").fetchone()[0]
+
+    @contextmanager
+    def tracked(self, key: str) -> Iterator[_Tracked]:
+        """Same contract as MemoryChangeStore.tracked, atomic across processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                tracked = self._load(key)
+                new = tracked is None
+                if new:
+                    tracked = _Tracked(secrets.token_hex(4), self._history)
+                version = tracked.version
+
+                yield tracked
+
+                self._save(key, tracked, new, version)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _load(self, key: str) -> _Tracked | None:
+        """Read a query's state and retained diffs (transaction open)."""
+        row = self._conn.execute(
+            "SELECT nonce, version, snapshot FROM change_queries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        tracked = _Tracked(row[0], self._history, row[1], json_codec.loads(row[2]))
+        rows = self._conn.execute(
+            "SELECT diff FROM change_diffs WHERE key = ? AND version > ? ORDER BY version",
+            (key, row[1] - self._history),
+        )
+        tracked.diffs.extend(self._decode_diff(diff) for (diff,) in rows)
+        return tracked
+
+    def _save(self, key: str, tracked: _Tracked, new: bool, version: int) -> None:
+        """Write back a query's state if it was created or gained versions (transaction open)."""
+        now = time.time()
+        if not new and tracked.version == version:
+            self._conn.execute("UPDATE change_queries SET used_at = ? WHERE key = ?", (now, key))
+            return
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO change_queries VALUES (?, ?, ?, ?, ?)",
+            (key, tracked.nonce, tracked.version, json_codec.dumps(tracked.snapshot).decode(), now),
+        )
+        added = tracked.version - version
+        if added:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO change_diffs VALUES (?, ?, ?)",
+                [
+                    (key, tracked.version - i, self._encode_diff(diff))
+                    for i, diff in enumerate(reversed(list(tracked.diffs)[-added:]))
+                ],
+            )
+            self._conn.execute(
+                "DELETE FROM change_diffs WHERE key = ? AND version <= ?", (key, tracked.version - self._history)
+            )
+        if new:
+            stale = [
+                row[0] for row in self._conn.execute(
+                    "SELECT key FROM change_queries ORDER BY used_at DESC LIMIT -1 OFFSET ?", (self._max_queries,)
+                )
+            ]
+            self._conn.executemany("DELETE FROM change_queries WHERE key = ?", [(k,) for k in stale])
+            self._conn.executemany("DELETE FROM change_diffs WHERE key = ?", [(k,) for k in stale])
+
+    @staticmethod
+    def _encode_diff(diff: SnapshotDiff) -> str:
+        """Serialise a diff for the change_diffs table."""
+        return json_codec.dumps({"added": diff.added, "removed": diff.removed, "repriced": diff.repriced}).decode()
+
+    @staticmethod
+    def _decode_diff(data: str) -> SnapshotDiff:
+        """Rebuild a diff stored by _encode_diff."""
+        diff = json_codec.loads(data)
+        repriced = {item_id: tuple(prices) for item_id, prices in diff["repriced"].items()}
+        return SnapshotDiff(diff["added"], diff["removed"], repriced)
+
+
+class ChangeTracker:
+    """
+    Per-query snapshots and change history, bounded in queries (LRU) and in
+    retained diffs per query.
+    """
+
+    def __init__(
+        self,
+        max_queries: int = 1024,
+        history: int = 32,
+        store: MemoryChangeStore | SqliteChangeStore | None = None,
+    ):
+        """
+        Args:
+            max_queries: Most queries tracked; the least recently used is dropped
+            history: Versions per query a since token can reach back
+            store: Where tracked queries are kept; in process memory if omitted
+        """
+        self._max_queries = max_queries
+        self._store = store if store is not None else MemoryChangeStore(max_queries, history)
+        self._lock = threading.Lock()
+        self._resets = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ChangeTracker":
+        """
+        Build a tracker with the configured bounds.
+
+        Queries are shared by all workers when the rate-limit storage is a
+        SQLite file, and kept per process otherwise.
+        """
+        max_queries, history = config.change_tracker_max_queries, config.change_tracker_history
+        path = config.shared_state_path
+        store = SqliteChangeStore(path, max_queries, history) if path else None
+        return cls(max_queries, history, store=store)
+
+    def record(self, key: str, items: Iterable[Any]) -> str:
+        """
+        Record a fetch of a query.
+
+        Args:
+            key: Query cache key
+            items: Listings with item_id and total_price
+
+        Returns:
+            Token for the query's version after this fetch
+        """
+        with self._store.tracked(key) as tracked:
+            self._advance(tracked, snapshot_of(items))
+            return tracked.token
+
+    def changes(self, key: str, items: Iterable[Any], since: str | None) -> tuple[SnapshotDiff | None, str]:
+        """
+        Record a fetch of a query and return what changed since a token.
+
+        Args:
+            key: Query cache key
+            items: Listings just fetched
+            since: Token from an earlier call, or None
+
+        Returns:
+            Tuple of (diff, token): the changes between the since version and
+            this fetch, or None when since is missing, unknown or older than
+            the retained history (the client must start from the full
+            result); and the token for this fetch
+        """
+        with self._store.tracked(key) as tracked:
+            self._advance(tracked, snapshot_of(items))
+            version = self._since_version(tracked, since)
+            if version is None:
+                with self._lock:
+                    self._resets += 1
+                return None, tracked.token
+            if version == tracked.version:
+                return SnapshotDiff(), tracked.token
+
+            # Undo the newest diffs back to the since version, then compare once
+            base = dict(tracked.snapshot)
+            newer = list(tracked.diffs)[-(tracked.version - version):]
+            for diff in reversed(newer):
+                undo(base, diff)
+            return diff_snapshots(base, tracked.snapshot), tracked.token
+
+    def metrics(self) -> dict[str, Any]:
+        """Return tracked query count and reset count for monitoring."""
+        queries = len(self._store)
+        with self._lock:
+            return {
+                "queries": queries,
+                "max_queries": self._max_queries,
+                "shared": isinstance(self._store, SqliteChangeStore),
+                "resets": self._resets,
+            }
+
+    @staticmethod
+    def _advance(tracked: _Tracked, snapshot: dict[str, float]) -> None:
+        """Store a snapshot as the query's first, or as a new version if it differs from the last (store held)."""
+        if tracked.snapshot is None:
+            tracked.snapshot = snapshot
+            return
+        diff = diff_snapshots(tracked.snapshot, snapshot)
+        if diff:
+            tracked.diffs.append(diff)
+            tracked.snapshot = snapshot
+            tracked.version += 1
+
+    @staticmethod
+    def _since_version(tracked: _Tracked, since: str | None) -> int | None:
+        """Version named by a token, or None if it is not reachable from the retained diffs."""
+        if not since:
+            return None
+        nonce, _, version = since.rpartition("-")
+        if nonce != tracked.nonce or not version.isdigit():
+            return None
+        version = int(version)
+        if version > tracked.version or version < tracked.version - len(tracked.diffs):
+            return None
+        return version
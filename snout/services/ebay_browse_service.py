@@ -2,20 +2,45 @@
 eBay Browse API client.
 """
 import logging
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, replace
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping
+from urllib.parse import urlencode
 
 import requests
 
 from ..config import BROWSE_BUYING_OPTIONS_MAP, BROWSE_CONDITION_MAP, BROWSE_SORT_MAP, Config
-from .auth_service import EbayAuthService
+from ..utils import json_codec
+from ..utils.validators import normalize_keyword
+from .auth_service import AuthError, EbayAuthService
+from .fanout import DeadlineExceeded, FanOutExecutor
+from .http_transport import HttpTransport
+from .metrics import PARSE_ERRORS, PARSE_SECONDS, UPSTREAM_SECONDS
+from .rate_limit import QuotaAccountant, QuotaExhaustedError
+from .resilience import CircuitOpenError, UpstreamGuard
+from .search_cache import SearchCache
+from .singleflight import SingleFlight
 
 logger = logging.getLogger("snout.browse")
 
+_upstream_seconds = UPSTREAM_SECONDS.labels("browse", "item_summary_search")
+_parse_seconds = PARSE_SECONDS.labels("browse")
+_parse_errors = PARSE_ERRORS.labels("browse")
 
-@dataclass
+
+@dataclass(frozen=True)
 class BrowseSearchQuery:
-    """Browse API search parameters."""
+    """
+    Browse API search parameters.
+
+    Immutable and canonical: filter values the API does not recognise are
+    dropped and prices are floats, so queries that produce the same
+    upstream request compare and hash equal. Keywords are sent as given;
+    only the cache key folds their case and whitespace, so such queries
+    share cached results. The filter string and encoded query string are
+    built once per query and memoised.
+    """
 
     keywords: str
     condition: str | None = None
@@ -28,8 +53,69 @@ class BrowseSearchQuery:
     limit: int = 50
     offset: int = 0
 
+    def __post_init__(self):
+        condition = self.condition.lower() if self.condition else None
+        sort = self.sort.lower() if self.sort else None
+        listing_type = self.listing_type.lower() if self.listing_type else None
+
+        set_field = object.__setattr__
+        set_field(self, "condition", condition if condition in BROWSE_CONDITION_MAP else None)
+        set_field(self, "min_price", float(self.min_price) if self.min_price is not None else None)
+        set_field(self, "max_price", float(self.max_price) if self.max_price is not None else None)
+        set_field(self, "sort", sort if sort in BROWSE_SORT_MAP else None)
+        set_field(self, "listing_type", listing_type if listing_type in BROWSE_BUYING_OPTIONS_MAP else None)
+        set_field(self, "uk_only", bool(self.uk_only))
+        set_field(self, "marketplace", self.marketplace.upper())
+
+    @cached_property
+    def filter_string(self) -> str | None:
+        """The Browse API ``filter`` param, or None without filters."""
+        filters = []
+        if self.condition:
+            filters.append(f"conditionIds:{{{BROWSE_CONDITION_MAP[self.condition]}}}")
+        if self.min_price is not None:
+            filters.append(f"price:[{self.min_price}..],priceCurrency:GBP")
+        if self.max_price is not None:
+            filters.append(f"price:[..{self.max_price}],priceCurrency:GBP")
+        if self.listing_type:
+            filters.append(f"buyingOptions:{{{BROWSE_BUYING_OPTIONS_MAP[self.listing_type]}}}")
+        if self.uk_only:
+            filters.append("itemLocationCountry:GB")
+        return ",".join(filters) or None
+
+    @cached_property
+    def params(self) -> Mapping[str, str]:
+        """Read-only query params for the search request."""
+        params = {"q": self.keywords, "limit": str(self.limit), "offset": str(self.offset)}
+        if self.filter_string:
+            params["filter"] = self.filter_string
+        if self.sort:
+            params["sort"] = BROWSE_SORT_MAP[self.sort]
+        return MappingProxyType(params)
+
+    @cached_property
+    def query_string(self) -> str:
+        """The URL-encoded params."""
+        return urlencode(self.params)
+
+    def url(self, endpoint: str) -> str:
+        """Full request URL for this query against the search endpoint."""
+        return f"{endpoint}?{self.query_string}"
+
+    @cached_property
+    def _cache_key(self) -> str:
+        return f"browse/{self.marketplace}?{urlencode({**self.params, 'q': normalize_keyword(self.keywords)})}"
+
+    def cache_key(self) -> str:
+        """
+        Canonical key for this query: the marketplace plus the encoded
+        params with folded keywords, so equal queries (see the class
+        docstring) and case or spacing variants share a key.
+        """
+        return self._cache_key
+
 
-@dataclass
+@dataclass(slots=True)
 class BrowseItem:
     """Parsed item from Browse API."""
 
@@ -43,6 +129,20 @@ class BrowseItem:
     condition: str
     image_url: str | None = None
 
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the response dictionary (same shape as asdict, without the deep copy)."""
+        return {
+            "title": self.title,
+            "item_price": self.item_price,
+            "shipping_cost": self.shipping_cost,
+            "total_price": self.total_price,
+            "currency": self.currency,
+            "item_id": self.item_id,
+            "url": self.url,
+            "condition": self.condition,
+            "image_url": self.image_url,
+        }
+
 
 class BrowseApiError(Exception):
     """Raised when Browse API calls fail."""
@@ -53,131 +153,356 @@ class BrowseApiError(Exception):
 class EbayBrowseService:
     """Service for eBay Browse API item_summary/search."""
 
-    def __init__(self, config: Config, auth_service: EbayAuthService):
+    # Browse API limits: items per page, and offset + limit per query
+    MAX_PAGE_SIZE = 200
+    MAX_RESULT_WINDOW = 10000
+    # Bound on remembered result totals (cleared when full)
+    MAX_TRACKED_QUERIES = 4096
+
+    def __init__(
+        self,
+        config: Config,
+        auth_service: EbayAuthService,
+        cache: SearchCache | None = None,
+        executor: FanOutExecutor | None = None,
+        transport: HttpTransport | None = None,
+        guard: UpstreamGuard | None = None,
+        quota: QuotaAccountant | None = None,
+    ):
         self._config = config
         self._auth = auth_service
-        self._session = requests.Session()
-
-    def search(self, query: BrowseSearchQuery) -> list[BrowseItem]:
+        self._cache = cache
+        self._executor = executor or FanOutExecutor(config.fanout_workers)
+        self._flight = SingleFlight()
+        self._transport = transport or HttpTransport.from_config(config)
+        self._session = self._transport.session
+        self._guard = guard or UpstreamGuard.from_config("browse", config)
+        self._quota = quota
+        self._totals: dict[str, int] = {}
+
+    @property
+    def cache(self) -> SearchCache | None:
+        """The response cache, if one is configured."""
+        return self._cache
+
+    @property
+    def guard(self) -> UpstreamGuard:
+        """Retry, hedging and circuit-breaker state for the search endpoint."""
+        return self._guard
+
+    def search(self, query: BrowseSearchQuery, use_cache: bool = True) -> list[BrowseItem]:
         """
         Search active listings via Browse API.
 
+        Concurrent identical queries share a single upstream request. A stale
+        cached result is returned immediately while a background refresh runs.
+        While the endpoint's circuit is open or its daily quota is nearly used
+        up, a cached result is returned even if use_cache is False and is not
+        refreshed; without one the search goes upstream (or fails fast).
+
         Args:
             query: Search parameters
+            use_cache: Whether a cached result may be returned. Fresh results
+                are stored in the cache either way.
 
         Returns:
             List of BrowseItem results
 
         Raises:
-            BrowseApiError: If the API request fails
+            BrowseApiError: If the API request fails or the circuit is open
+        """
+        key = query.cache_key()
+
+        cache_only = self._cache_only()
+        if self._cache is not None and (use_cache or cache_only):
+            cached = self._cache.lookup(key)
+            if cached is not None:
+                items, fresh = cached
+                if not fresh and not cache_only:
+                    self._revalidate(key, query)
+                return items
+
+        return self._flight.do(key, lambda: self._fetch_and_store(key, query))
+
+    def search_deep(
+        self, query: BrowseSearchQuery, target: int, use_cache: bool = True
+    ) -> list[BrowseItem]:
+        """
+        Fetch up to target items by requesting the offset pages concurrently.
+
+        Pages are fetched through search() on the shared executor, at most
+        ``deep_search_workers`` at a time, so each one is cached and
+        coalesced individually. Results are merged in page order and
+        deduplicated by item_id.
+
+        Args:
+            query: Search parameters; its offset is where the crawl starts
+            target: Total number of items wanted
+            use_cache: Whether cached pages may be returned
+
+        Returns:
+            Up to target unique BrowseItem results
+
+        Raises:
+            BrowseApiError: If any page request fails (remaining pages are cancelled)
+            DeadlineExceeded: If the pages take longer than fanout_deadline
+        """
+        page_queries = self._page_queries(query, target)
+
+        logger.debug("Deep search: q=%s, target=%d, pages=%d", query.keywords, target, len(page_queries))
+
+        pages = self._executor.gather(
+            lambda q: self.search(q, use_cache),
+            page_queries,
+            limit=self._config.deep_search_workers,
+            timeout=self._config.fanout_deadline,
+        )
+        return self._merge_pages(pages, target)
+
+    def iter_pages(
+        self, query: BrowseSearchQuery, target: int | None = None, use_cache: bool = True
+    ) -> Iterator[list[BrowseItem]]:
         """
+        Yield result pages as soon as each one is fetched and parsed.
+
+        Without a target this yields the single page described by query.
+        With one, the offset pages are fetched concurrently and yielded in
+        completion order (not offset order); callers deduplicate. Closing
+        the generator early cancels pages not yet started.
+
+        Args:
+            query: Search parameters
+            target: Total number of items wanted, or None for one page
+            use_cache: Whether cached pages may be returned
+
+        Raises:
+            BrowseApiError: If a page request fails
+            DeadlineExceeded: If the pages take longer than fanout_deadline
+        """
+        if not target:
+            yield self.search(query, use_cache)
+            return
+
+        pages = self._executor.as_completed(
+            lambda q: self.search(q, use_cache),
+            self._page_queries(query, target),
+            limit=self._config.deep_search_workers,
+            timeout=self._config.fanout_deadline,
+        )
+        try:
+            for _, page in pages:
+                yield page
+        finally:
+            pages.close()
+
+    def search_batch(
+        self, queries: list[BrowseSearchQuery], use_cache: bool = True
+    ) -> list[list[BrowseItem] | BrowseApiError | AuthError | DeadlineExceeded]:
+        """
+        Run many independent searches concurrently.
+
+        Queries run on the shared executor, whose size caps upstream
+        concurrency across all callers, with at most
+        ``batch_search_workers`` from one batch in flight. A failed query
+        does not affect the others; queries unfinished at the
+        fanout_deadline are reported as DeadlineExceeded.
+
+        Args:
+            queries: Search parameters, one per query
+            use_cache: Whether cached results may be returned
+
+        Returns:
+            One entry per query, in input order: its items, or the
+            BrowseApiError/AuthError/DeadlineExceeded it failed with
+        """
+
+        def run(query: BrowseSearchQuery) -> list[BrowseItem] | BrowseApiError | AuthError:
+            try:
+                return self.search(query, use_cache)
+            except (BrowseApiError, AuthError) as e:
+                return e
+
+        results: list = [None] * len(queries)
+        try:
+            for index, result in self._executor.as_completed(
+                run, queries, limit=self._config.batch_search_workers, timeout=self._config.fanout_deadline
+            ):
+                results[index] = result
+        except DeadlineExceeded as e:
+            logger.warning("Batch search deadline exceeded: %s", e)
+            results = [e if result is None else result for result in results]
+        return results
+
+    @classmethod
+    def _page_queries(cls, query: BrowseSearchQuery, target: int) -> list[BrowseSearchQuery]:
+        """Split a deep request into page-sized queries within the result window."""
+        end = min(query.offset + target, cls.MAX_RESULT_WINDOW)
+        return [
+            replace(query, offset=offset, limit=min(cls.MAX_PAGE_SIZE, end - offset))
+            for offset in range(query.offset, end, cls.MAX_PAGE_SIZE)
+        ]
+
+    @staticmethod
+    def _merge_pages(pages: list[list[BrowseItem]], target: int) -> list[BrowseItem]:
+        """Concatenate pages in order, dropping repeated item_ids, up to target items."""
+        seen: set[str] = set()
+        merged = []
+        for page in pages:
+            for item in page:
+                if item.item_id in seen:
+                    continue
+                seen.add(item.item_id)
+                merged.append(item)
+                if len(merged) >= target:
+                    return merged
+        return merged
+
+    def _cache_only(self) -> bool:
+        """Check whether cached results should be served without going upstream."""
+        return self._guard.is_open() or (self._quota is not None and self._quota.cache_only("browse"))
+
+    def _spend_quota(self) -> None:
+        """Count one upstream call against the daily quota, if one is tracked."""
+        if self._quota is not None:
+            self._quota.spend("browse")
+
+    def _fetch_and_store(self, key: str, query: BrowseSearchQuery) -> list[BrowseItem]:
+        """Fetch a page and store it in the cache, if one is configured."""
+        items = self._fetch(query)
+        if self._cache is not None:
+            self._cache.set(key, items)
+        return items
+
+    def _revalidate(self, key: str, query: BrowseSearchQuery) -> None:
+        """Refresh a stale cache entry in the background unless already refreshing."""
+        if self._flight.in_flight(key):
+            return
+
+        def refresh():
+            try:
+                self._flight.do(key, lambda: self._fetch_and_store(key, query))
+            except (BrowseApiError, AuthError) as e:
+                logger.warning("Background refresh failed for %s: %s", query.keywords, e)
+
+        self._executor.submit(refresh)
+
+    def _fetch(self, query: BrowseSearchQuery) -> list[BrowseItem]:
+        """Fetch and parse one page of results from the Browse API, retrying transient failures."""
         try:
             token = self._auth.get_token()
-            data = self._make_request(query, token)
+
+            def request() -> dict[str, Any]:
+                self._spend_quota()
+                return self._make_request(query, token)
+
+            data = self._guard.call(request)
+            self._note_total(query, data)
             return self._parse_results(data)
+        except (CircuitOpenError, QuotaExhaustedError) as e:
+            raise BrowseApiError(f"eBay Browse API is unavailable: {e}") from e
         except requests.RequestException as e:
             logger.error("Browse API request failed: %s", e)
             raise BrowseApiError("Failed to communicate with eBay Browse API") from e
 
+    def total_matches(self, query: BrowseSearchQuery) -> int | None:
+        """
+        Listings eBay reported matching a query (its total) when it was last
+        fetched upstream by this process, or None if unknown.
+        """
+        return self._totals.get(query.cache_key())
+
+    def _note_total(self, query: BrowseSearchQuery, data: dict[str, Any]) -> None:
+        """Remember eBay's total match count for a query."""
+        total = data.get("total")
+        if not isinstance(total, int):
+            return
+        if len(self._totals) >= self.MAX_TRACKED_QUERIES:
+            self._totals.clear()
+        self._totals[query.cache_key()] = total
+
     def _make_request(self, query: BrowseSearchQuery, token: str) -> dict[str, Any]:
-        """Make the Browse API search request."""
-        headers = {
+        """Make the Browse API search request with the query's pre-encoded URL."""
+        logger.debug("Browse API request: q=%s, params=%s", query.keywords, query.query_string)
+
+        with _upstream_seconds.time():
+            response = self._session.get(
+                query.url(self._config.ebay_browse_api),
+                headers=self._build_headers(query, token),
+                timeout=self._transport.timeout,
+            )
+            response.raise_for_status()
+        try:
+            return json_codec.loads(response.content)
+        except ValueError as e:
+            logger.error("Browse API returned invalid JSON: %s", e)
+            raise BrowseApiError("eBay Browse API returned an invalid response") from e
+
+    @staticmethod
+    def _build_headers(query: BrowseSearchQuery, token: str) -> dict[str, str]:
+        """Build the headers for a Browse API search."""
+        return {
             "Authorization": f"Bearer {token}",
             "X-EBAY-C-MARKETPLACE-ID": query.marketplace,
             "Content-Type": "application/json",
         }
 
-        params: dict[str, str] = {
-            "q": query.keywords,
-            "limit": str(query.limit),
-            "offset": str(query.offset),
-        }
-
-        # Build filter string
-        filters = []
-        if query.condition and query.condition.lower() in BROWSE_CONDITION_MAP:
-            filters.append(
-                f"conditionIds:{{{BROWSE_CONDITION_MAP[query.condition.lower()]}}}"
-            )
-        if query.min_price is not None:
-            filters.append(f"price:[{query.min_price}..],priceCurrency:GBP")
-        if query.max_price is not None:
-            filters.append(f"price:[..{query.max_price}],priceCurrency:GBP")
-        if query.listing_type and query.listing_type.lower() in BROWSE_BUYING_OPTIONS_MAP:
-            filters.append(
-                f"buyingOptions:{{{BROWSE_BUYING_OPTIONS_MAP[query.listing_type.lower()]}}}"
-            )
-        if query.uk_only:
-            filters.append("itemLocationCountry:GB")
-
-        if filters:
-            params["filter"] = ",".join(filters)
-
-        # Sort
-        if query.sort and query.sort.lower() in BROWSE_SORT_MAP:
-            params["sort"] = BROWSE_SORT_MAP[query.sort.lower()]
-
-        logger.debug("Browse API request: q=%s, params=%s", query.keywords, params)
-
-        response = self._session.get(
-            self._config.ebay_browse_api,
-            headers=headers,
-            params=params,
-            timeout=self._config.request_timeout,
-        )
-        response.raise_for_status()
-        return response.json()
+    @classmethod
+    def _parse_results(cls, data: dict[str, Any]) -> list[BrowseItem]:
+        """
+        Parse Browse API response into BrowseItem list.
 
-    def _parse_results(self, data: dict[str, Any]) -> list[BrowseItem]:
-        """Parse Browse API response into BrowseItem list."""
-        results = []
+        Well-formed pages are parsed in a single comprehension; only a page
+        containing a malformed item is re-walked item by item to skip it.
+        """
         items = data.get("itemSummaries", [])
-        parse_errors = 0
+        parse = cls._parse_item
 
-        for item in items:
+        with _parse_seconds.time():
             try:
-                parsed = self._parse_item(item)
-                results.append(parsed)
-            except (KeyError, ValueError, TypeError) as e:
-                parse_errors += 1
-                logger.debug("Failed to parse browse item: %s", e)
-                continue
-
-        if parse_errors:
-            logger.warning(
-                "Failed to parse %d of %d browse items", parse_errors, len(items)
-            )
-
+                return [parse(item) for item in items]
+            except (KeyError, ValueError, TypeError, AttributeError):
+                pass
+
+            results = []
+            parse_errors = 0
+            for item in items:
+                try:
+                    results.append(parse(item))
+                except (KeyError, ValueError, TypeError, AttributeError) as e:
+                    parse_errors += 1
+                    logger.debug("Failed to parse browse item: %s", e)
+
+        _parse_errors.inc(parse_errors)
+        logger.warning(
+            "Failed to parse %d of %d browse items", parse_errors, len(items)
+        )
         return results
 
-    def _parse_item(self, item: dict[str, Any]) -> BrowseItem:
+    @staticmethod
+    def _parse_item(item: dict[str, Any]) -> BrowseItem:
         """Parse a single item from the Browse API response."""
-        price_data = item.get("price", {})
+        get = item.get
+        price_data = get("price") or {}
         item_price = float(price_data.get("value", 0))
-        currency = price_data.get("currency", "GBP")
 
         # Shipping cost from first shipping option
         shipping_cost = 0.0
-        shipping_options = item.get("shippingOptions", [])
+        shipping_options = get("shippingOptions")
         if shipping_options:
-            ship_cost_data = shipping_options[0].get("shippingCost", {})
-            shipping_cost = float(ship_cost_data.get("value", 0))
-
-        # Image
-        image = item.get("image", {})
-        image_url = image.get("imageUrl")
+            ship_cost_data = shipping_options[0].get("shippingCost")
+            if ship_cost_data:
+                shipping_cost = float(ship_cost_data.get("value", 0))
 
-        # Condition
-        condition = item.get("condition", "Unknown")
+        image = get("image")
 
         return BrowseItem(
-            title=item.get("title", ""),
-            item_price=item_price,
-            shipping_cost=shipping_cost,
-            total_price=round(item_price + shipping_cost, 2),
-            currency=currency,
-            item_id=item.get("itemId", ""),
-            url=item.get("itemWebUrl", ""),
-            condition=condition,
-            image_url=image_url,
+            get("title", ""),
+            item_price,
+            shipping_cost,
+            round(item_price + shipping_cost, 2),
+            price_data.get("currency", "GBP"),
+            get("itemId", ""),
+            get("itemWebUrl", ""),
+            get("condition", "Unknown"),
+            image.get("imageUrl") if image else None,
         )
@@ -2,20 +2,41 @@
 eBay Finding API service.
 """
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
-from typing import Any
+import time
+from dataclasses import dataclass, replace
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+from urllib.parse import urlencode
 
 import requests
 
 from ..config import CONDITION_MAP, SORT_MAP, Config
+from ..utils import json_codec
+from ..utils.validators import normalize_keyword
+from .fanout import FanOutExecutor
+from .http_transport import HttpTransport
+from .metrics import PARSE_ERRORS, PARSE_SECONDS, UPSTREAM_SECONDS
+from .rate_limit import QuotaAccountant, QuotaExhaustedError
+from .resilience import CircuitOpenError, UpstreamGuard
+from .search_cache import SearchCache
+from .singleflight import SingleFlight
 
 logger = logging.getLogger("snout.ebay")
 
+_parse_seconds = PARSE_SECONDS.labels("finding")
+_parse_errors = PARSE_ERRORS.labels("finding")
 
-@dataclass
+
+@dataclass(frozen=True)
 class SearchQuery:
-    """Search query parameters."""
+    """
+    Search query parameters.
+
+    Immutable and canonical like BrowseSearchQuery: equal queries produce
+    the same upstream request, keywords are sent as given but folded in
+    the cache key, and the encoded params are built once.
+    """
 
     keywords: str
     sold: bool = False
@@ -23,9 +44,63 @@ class SearchQuery:
     min_price: float | None = None
     max_price: float | None = None
     sort: str | None = None
-
-
-@dataclass
+    page: int = 1
+
+    def __post_init__(self):
+        condition = self.condition.lower() if self.condition else None
+        sort = self.sort.lower() if self.sort else None
+
+        set_field = object.__setattr__
+        set_field(self, "sold", bool(self.sold))
+        set_field(self, "condition", condition if condition in CONDITION_MAP else None)
+        set_field(self, "min_price", float(self.min_price) if self.min_price is not None else None)
+        set_field(self, "max_price", float(self.max_price) if self.max_price is not None else None)
+        set_field(self, "sort", sort if sort in SORT_MAP else None)
+
+    @property
+    def operation(self) -> str:
+        """The Finding API operation this query calls."""
+        return "findCompletedItems" if self.sold else "findItemsByKeywords"
+
+    @cached_property
+    def params(self) -> Mapping[str, str]:
+        """Read-only query-specific params: operation, keywords, page, sort and item filters."""
+        params = {"OPERATION-NAME": self.operation, "keywords": self.keywords}
+        if self.page > 1:
+            params["paginationInput.pageNumber"] = str(self.page)
+        if self.sort:
+            params["sortOrder"] = SORT_MAP[self.sort]
+
+        item_filters = []
+        if self.sold:
+            item_filters.append(("SoldItemsOnly", "true"))
+        if self.condition:
+            item_filters.append(("Condition", CONDITION_MAP[self.condition]))
+        if self.min_price is not None:
+            item_filters.append(("MinPrice", str(self.min_price)))
+        if self.max_price is not None:
+            item_filters.append(("MaxPrice", str(self.max_price)))
+        for index, (name, value) in enumerate(item_filters):
+            params[f"itemFilter({index}).name"] = name
+            params[f"itemFilter({index}).value"] = value
+
+        return MappingProxyType(params)
+
+    @cached_property
+    def query_string(self) -> str:
+        """The URL-encoded query-specific params."""
+        return urlencode(self.params)
+
+    @cached_property
+    def _cache_key(self) -> str:
+        return f"finding?{urlencode({**self.params, 'keywords': normalize_keyword(self.keywords)})}"
+
+    def cache_key(self) -> str:
+        """Canonical key for this query: its encoded params, keywords case- and whitespace-folded."""
+        return self._cache_key
+
+
+@dataclass(slots=True)
 class EbayItem:
     """Parsed eBay item."""
 
@@ -37,6 +112,29 @@ class EbayItem:
     condition: str
     listing_type: str
     sold_date: str | None = None
+    shipping_cost: float | None = None  # None when eBay gives no flat cost (e.g. calculated shipping)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the response dictionary (sold_date only when set; shipping_cost omitted)."""
+        d = {
+            "title": self.title,
+            "price": self.price,
+            "currency": self.currency,
+            "item_id": self.item_id,
+            "url": self.url,
+            "condition": self.condition,
+            "listing_type": self.listing_type,
+        }
+        if self.sold_date:
+            d["sold_date"] = self.sold_date
+        return d
+
+
+# Shared read-only defaults for the Finding API's array-wrapped fields, so
+# parsing a missing field does not allocate a fresh [{}] or [""] each time.
+_NO_OBJECT = ({},)
+_NO_STRING = ("",)
+_UNKNOWN = ("Unknown",)
 
 
 class EbayApiError(Exception):
@@ -48,35 +146,260 @@ class EbayApiError(Exception):
 class EbayFindingService:
     """Service for interacting with eBay Finding API."""
 
-    def __init__(self, config: Config):
+    # Finding API limit on paginationInput.pageNumber
+    MAX_PAGES = 100
+    # Bound on remembered totalPages/totalEntries (cleared when full)
+    MAX_TRACKED_QUERIES = 4096
+
+    def __init__(
+        self,
+        config: Config,
+        cache: SearchCache | None = None,
+        executor: FanOutExecutor | None = None,
+        transport: HttpTransport | None = None,
+        guard: UpstreamGuard | None = None,
+        quota: QuotaAccountant | None = None,
+    ):
         self.config = config
-        self._session = requests.Session()
-
-    def search(self, query: SearchQuery) -> list[EbayItem]:
+        self._cache = cache
+        self._executor = executor or FanOutExecutor(config.fanout_workers)
+        self._flight = SingleFlight()
+        self._transport = transport or HttpTransport.from_config(config)
+        self._session = self._transport.session
+        self._service_query = urlencode(self._service_params(config))
+        self._guard = guard or UpstreamGuard.from_config("finding", config)
+        self._quota = quota
+        self._total_pages: dict[str, int] = {}
+        self._total_entries: dict[str, int] = {}
+
+    @property
+    def cache(self) -> SearchCache | None:
+        """The response cache, if one is configured."""
+        return self._cache
+
+    @property
+    def guard(self) -> UpstreamGuard:
+        """Retry, hedging and circuit-breaker state for the Finding API."""
+        return self._guard
+
+    def search(self, query: SearchQuery, use_cache: bool = True) -> list[EbayItem]:
         """
         Search eBay using the Finding API.
 
+        Concurrent identical queries share a single upstream request. A stale
+        cached result is returned immediately while a background refresh runs.
+        While the circuit is open or the daily quota is nearly used up, a
+        cached result is returned even if use_cache is False and is not
+        refreshed; without one the search goes upstream (or fails fast).
+
         Args:
             query: Search parameters
+            use_cache: Whether a cached result may be returned
 
         Returns:
             List of parsed eBay items
 
         Raises:
-            EbayApiError: If the API request fails
+            EbayApiError: If the API request fails or the circuit is open
         """
         if not self.config.is_ebay_configured:
             raise EbayApiError("eBay API is not configured")
 
+        key = query.cache_key()
+
+        cache_only = self._cache_only()
+        if self._cache is not None and (use_cache or cache_only):
+            cached = self._cache.lookup(key)
+            if cached is not None:
+                items, fresh = cached
+                if not fresh and not cache_only:
+                    self._revalidate(key, query)
+                return items
+
+        return self._flight.do(key, lambda: self._fetch_and_store(key, query))
+
+    def _cache_only(self) -> bool:
+        """Check whether cached results should be served without going upstream."""
+        return self._guard.is_open() or (self._quota is not None and self._quota.cache_only("finding"))
+
+    def _spend_quota(self) -> None:
+        """Count one upstream call against the daily quota, if one is tracked."""
+        if self._quota is not None:
+            self._quota.spend("finding")
+
+    def _fetch_and_store(self, key: str, query: SearchQuery) -> list[EbayItem]:
+        """Fetch results and store them in the cache, if one is configured."""
+        items = self._fetch(query)
+        if self._cache is not None:
+            self._cache.set(key, items)
+        return items
+
+    def _revalidate(self, key: str, query: SearchQuery) -> None:
+        """Refresh a stale cache entry in the background unless already refreshing."""
+        if self._flight.in_flight(key):
+            return
+
+        def refresh():
+            try:
+                self._flight.do(key, lambda: self._fetch_and_store(key, query))
+            except EbayApiError as e:
+                logger.warning("Background refresh failed for %s: %s", query.keywords, e)
+
+        self._executor.submit(refresh)
+
+    def _fetch(self, query: SearchQuery) -> list[EbayItem]:
+        """Fetch and parse results from the Finding API, noting totalPages for page 1."""
         try:
-            data = self._make_api_request(query)
+            def request() -> dict[str, Any]:
+                self._spend_quota()
+                return self._make_api_request(query)
+
+            data = self._guard.call(request)
+            if query.page == 1:
+                self._note_totals(query, data)
             return self._parse_results(data, query.sold)
+        except (CircuitOpenError, QuotaExhaustedError) as e:
+            raise EbayApiError(f"eBay API is unavailable: {e}") from e
         except requests.RequestException as e:
             logger.error("eBay API request failed: %s", str(e))
             raise EbayApiError("Failed to communicate with eBay API") from e
 
+    def search_many(
+        self,
+        queries: list[SearchQuery],
+        use_cache: bool = True,
+        timeout: float | None = None,
+        pages: int | Sequence[int] = 1,
+    ) -> list[list[EbayItem]]:
+        """
+        Execute any number of searches concurrently on the shared executor.
+
+        With a page budget above 1, every query's first page is fetched
+        concurrently, then the further pages of all queries whose first
+        page was full are fetched together in one second fan-out, up to
+        eBay's totalPages. A short or empty page ends that query early.
+        Two flat rounds keep latency near two requests whatever the
+        budget, and never block a worker on its own sub-requests.
+
+        Args:
+            queries: Search parameters (first page each)
+            use_cache: Whether cached results may be returned
+            timeout: Seconds for the whole fan-out (default: fanout_deadline)
+            pages: Page budget, for every query or one per query (max MAX_PAGES)
+
+        Returns:
+            Items for each query, in input order; multi-page results are
+            merged in page order and deduplicated by item_id
+
+        Raises:
+            EbayApiError: If any API request fails (remaining searches are cancelled)
+            DeadlineExceeded: If the searches do not finish in time
+        """
+        timeout = timeout or self.config.fanout_deadline
+        deadline = time.monotonic() + timeout
+        budgets = [pages] * len(queries) if isinstance(pages, int) else list(pages)
+
+        first_pages = self._executor.gather(
+            lambda query: self.search(query, use_cache),
+            queries,
+            timeout=timeout,
+        )
+
+        follow_ups = [
+            (index, replace(query, page=page))
+            for index, query in enumerate(queries)
+            for page in range(2, self._last_page(query, first_pages[index], budgets[index]) + 1)
+        ]
+        if not follow_ups:
+            return first_pages
+
+        fetched = self._fetch_follow_ups(follow_ups, use_cache, max(deadline - time.monotonic(), 0.001))
+
+        results = []
+        for index, items in enumerate(first_pages):
+            query_pages = [items] + [page for (i, _), page in sorted(fetched.items()) if i == index]
+            results.append(self._merge_pages(query_pages) if len(query_pages) > 1 else items)
+        return results
+
+    def _last_page(self, query: SearchQuery, first_page: list[EbayItem], budget: int) -> int:
+        """Last page worth requesting for a query, given its first page and budget."""
+        budget = min(budget, self.MAX_PAGES)
+        if budget <= 1 or len(first_page) < self.config.max_results_per_page:
+            return 1
+        return min(budget, self._total_pages.get(query.cache_key(), budget))
+
+    def _fetch_follow_ups(
+        self, follow_ups: list[tuple[int, SearchQuery]], use_cache: bool, timeout: float
+    ) -> dict[tuple[int, int], list[EbayItem]]:
+        """
+        Fetch pages after the first, stopping once every query has hit a short page.
+
+        Returns:
+            Items keyed by (query index, page number), for pages up to each
+            query's last full page plus the short page that ended it
+        """
+        last = {}
+        outstanding = {(index, query.page) for index, query in follow_ups}
+        fetched = {}
+
+        results = self._executor.as_completed(
+            lambda follow_up: self.search(follow_up[1], use_cache), follow_ups, timeout=timeout
+        )
+        try:
+            for position, items in results:
+                index, query = follow_ups[position]
+                outstanding.discard((index, query.page))
+                fetched[(index, query.page)] = items
+                if len(items) < self.config.max_results_per_page:
+                    last[index] = min(last.get(index, query.page), query.page)
+                if not any(page <= last.get(i, self.MAX_PAGES) for i, page in outstanding):
+                    break
+        finally:
+            results.close()
+
+        return {key: items for key, items in fetched.items() if key[1] <= last.get(key[0], self.MAX_PAGES)}
+
+    @staticmethod
+    def _merge_pages(pages: list[list[EbayItem]]) -> list[EbayItem]:
+        """Concatenate pages in order, dropping item_ids already seen (listings shift between pages)."""
+        seen: set[str] = set()
+        merged = []
+        for page in pages:
+            for item in page:
+                if item.item_id not in seen:
+                    seen.add(item.item_id)
+                    merged.append(item)
+        return merged
+
+    def total_matches(self, query: SearchQuery) -> int | None:
+        """
+        Listings eBay reported matching a query (its totalEntries) when page 1
+        was last fetched upstream by this process, or None if unknown.
+        """
+        return self._total_entries.get(replace(query, page=1).cache_key())
+
+    def _note_totals(self, query: SearchQuery, data: dict[str, Any]) -> None:
+        """
+        Remember eBay's totalPages for a query so later page budgets stop
+        there, and its totalEntries for total_matches().
+        """
+        response_key = "findCompletedItemsResponse" if query.sold else "findItemsByKeywordsResponse"
+        try:
+            pagination = data[response_key][0]["paginationOutput"][0]
+        except (KeyError, IndexError, TypeError):
+            return
+
+        for name, totals in (("totalPages", self._total_pages), ("totalEntries", self._total_entries)):
+            try:
+                total = int(pagination[name][0])
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+            if len(totals) >= self.MAX_TRACKED_QUERIES:
+                totals.clear()
+            totals[query.cache_key()] = total
+
     def search_concurrent(
-        self, sold_query: SearchQuery, active_query: SearchQuery
+        self, sold_query: SearchQuery, active_query: SearchQuery, use_cache: bool = True
     ) -> tuple[list[EbayItem], list[EbayItem]]:
         """
         Execute sold and active searches concurrently.
@@ -84,6 +407,7 @@ class EbayFindingService:
         Args:
             sold_query: Query for sold items
             active_query: Query for active items
+            use_cache: Whether cached results may be returned
 
         Returns:
             Tuple of (sold_items, active_items)
@@ -91,72 +415,39 @@ class EbayFindingService:
         Raises:
             EbayApiError: If either API request fails
         """
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {
-                executor.submit(self.search, sold_query): "sold",
-                executor.submit(self.search, active_query): "active",
-            }
-
-            results = {}
-            for future in as_completed(futures):
-                key = futures[future]
-                results[key] = future.result()
-
-        return results["sold"], results["active"]
+        sold_items, active_items = self.search_many([sold_query, active_query], use_cache=use_cache)
+        return sold_items, active_items
 
     def _make_api_request(self, query: SearchQuery) -> dict[str, Any]:
         """Make the actual API request to eBay."""
-        operation = "findCompletedItems" if query.sold else "findItemsByKeywords"
+        logger.debug("Making eBay API request: operation=%s, keywords=%s", query.operation, query.keywords)
 
-        params = {
-            "OPERATION-NAME": operation,
+        with UPSTREAM_SECONDS.labels("finding", query.operation).time():
+            response = self._session.get(self._request_url(query), timeout=self._transport.timeout)
+            response.raise_for_status()
+        try:
+            return json_codec.loads(response.content)
+        except ValueError as e:
+            logger.error("eBay API returned invalid JSON: %s", e)
+            raise EbayApiError("eBay API returned an invalid response") from e
+
+    @staticmethod
+    def _service_params(config: Config) -> dict[str, str]:
+        """Params shared by every Finding API request."""
+        return {
             "SERVICE-VERSION": "1.0.0",
-            "SECURITY-APPNAME": self.config.ebay_app_id,
+            "SECURITY-APPNAME": config.ebay_app_id,
             "RESPONSE-DATA-FORMAT": "JSON",
             "REST-PAYLOAD": "",
-            "keywords": query.keywords,
-            "paginationInput.entriesPerPage": str(self.config.max_results_per_page),
+            "paginationInput.entriesPerPage": str(config.max_results_per_page),
         }
 
-        # Sort order
-        if query.sort and query.sort.lower() in SORT_MAP:
-            params["sortOrder"] = SORT_MAP[query.sort.lower()]
-
-        filter_index = 0
-
-        if query.sold:
-            params[f"itemFilter({filter_index}).name"] = "SoldItemsOnly"
-            params[f"itemFilter({filter_index}).value"] = "true"
-            filter_index += 1
-
-        if query.condition and query.condition.lower() in CONDITION_MAP:
-            params[f"itemFilter({filter_index}).name"] = "Condition"
-            params[f"itemFilter({filter_index}).value"] = CONDITION_MAP[
-                query.condition.lower()
-            ]
-            filter_index += 1
-
-        if query.min_price is not None:
-            params[f"itemFilter({filter_index}).name"] = "MinPrice"
-            params[f"itemFilter({filter_index}).value"] = str(query.min_price)
-            filter_index += 1
-
-        if query.max_price is not None:
-            params[f"itemFilter({filter_index}).name"] = "MaxPrice"
-            params[f"itemFilter({filter_index}).value"] = str(query.max_price)
-            filter_index += 1
-
-        logger.debug("Making eBay API request: operation=%s, keywords=%s", operation, query.keywords)
-
-        response = self._session.get(
-            self.config.ebay_finding_api,
-            params=params,
-            timeout=self.config.request_timeout,
-        )
-        response.raise_for_status()
-        return response.json()
+    def _request_url(self, query: SearchQuery) -> str:
+        """Full request URL: the service params encoded at startup plus the query's own."""
+        return f"{self.config.ebay_finding_api}?{self._service_query}&{query.query_string}"
 
-    def _parse_results(self, data: dict[str, Any], sold: bool) -> list[EbayItem]:
+    @classmethod
+    def _parse_results(cls, data: dict[str, Any], sold: bool) -> list[EbayItem]:
         """Parse results from the Finding API response."""
         results = []
         response_key = "findCompletedItemsResponse" if sold else "findItemsByKeywordsResponse"
@@ -176,49 +467,62 @@ class EbayFindingService:
             logger.warning("eBay API returned non-success ack: %s", ack)
             return results
 
-        search_result = response.get("searchResult", [{}])[0]
+        search_result = response.get("searchResult", _NO_OBJECT)[0]
         items = search_result.get("item", [])
-        parse_errors = 0
+        parse = cls._parse_item
 
-        for item in items:
+        with _parse_seconds.time():
             try:
-                parsed = self._parse_item(item, sold)
-                results.append(parsed)
-            except (KeyError, IndexError, ValueError, TypeError) as e:
-                parse_errors += 1
-                logger.debug("Failed to parse item: %s", e)
-                continue
-
-        if parse_errors > 0:
-            logger.warning(
-                "Failed to parse %d of %d items", parse_errors, len(items)
-            )
-
+                return [parse(item, sold) for item in items]
+            except (KeyError, IndexError, ValueError, TypeError, AttributeError):
+                pass
+
+            parse_errors = 0
+            for item in items:
+                try:
+                    results.append(parse(item, sold))
+                except (KeyError, IndexError, ValueError, TypeError, AttributeError) as e:
+                    parse_errors += 1
+                    logger.debug("Failed to parse item: %s", e)
+
+        _parse_errors.inc(parse_errors)
+        logger.warning(
+            "Failed to parse %d of %d items", parse_errors, len(items)
+        )
         return results
 
-    def _parse_item(self, item: dict[str, Any], sold: bool) -> EbayItem:
-        """Parse a single item from the API response."""
-        price_info = item.get("sellingStatus", [{}])[0]
-        current_price = price_info.get("currentPrice", [{}])[0]
+    @staticmethod
+    def _parse_item(item: dict[str, Any], sold: bool) -> EbayItem:
+        """
+        Parse a single item from the API response.
+
+        Each array-wrapped field is looked up once and unwrapped in place;
+        prices go straight from eBay's strings to floats.
+        """
+        get = item.get
+        current_price = get("sellingStatus", _NO_OBJECT)[0].get("currentPrice", _NO_OBJECT)[0]
+        listing_info = get("listingInfo", _NO_OBJECT)[0]
 
-        condition_data = item.get("condition", [{}])
+        condition_data = get("condition", _NO_OBJECT)
         if condition_data:
-            condition_name = condition_data[0].get("conditionDisplayName", ["Unknown"])
-            condition = condition_name[0] if isinstance(condition_name, list) else condition_name
+            condition_name = condition_data[0].get("conditionDisplayName", _UNKNOWN)
+            condition = condition_name[0] if isinstance(condition_name, (list, tuple)) else condition_name
         else:
             condition = "Unknown"
 
-        sold_date = None
-        if sold:
-            sold_date = item.get("listingInfo", [{}])[0].get("endTime", [""])[0]
+        shipping_cost = None
+        shipping_data = get("shippingInfo", _NO_OBJECT)[0].get("shippingServiceCost")
+        if shipping_data:
+            shipping_cost = float(shipping_data[0].get("__value__", 0))
 
         return EbayItem(
-            title=item.get("title", [""])[0],
-            price=float(current_price.get("__value__", 0)),
-            currency=current_price.get("@currencyId", "USD"),
-            item_id=item.get("itemId", [""])[0],
-            url=item.get("viewItemURL", [""])[0],
-            condition=condition,
-            listing_type=item.get("listingInfo", [{}])[0].get("listingType", ["Unknown"])[0],
-            sold_date=sold_date,
+            get("title", _NO_STRING)[0],
+            float(current_price.get("__value__", 0)),
+            current_price.get("@currencyId", "USD"),
+            get("itemId", _NO_STRING)[0],
+            get("viewItemURL", _NO_STRING)[0],
+            condition,
+            listing_info.get("listingType", _UNKNOWN)[0],
+            listing_info.get("endTime", _NO_STRING)[0] if sold else None,
+            shipping_cost,
         )
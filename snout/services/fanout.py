@@ -0,0 +1,161 @@
+"""
+Shared bounded executor for fanning out eBay searches.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator
+
+logger = logging.getLogger("snout.fanout")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a fan-out does not finish before its deadline."""
+
+    pass
+
+
+class FanOutExecutor:
+    """
+    Long-lived thread pool shared by the eBay services.
+
+    One pool bounds upstream concurrency for the whole process and avoids
+    starting threads per request. Fan-outs run a function over many inputs
+    with an optional per-call window and deadline; when one call fails or
+    the deadline passes, siblings that have not started are cancelled
+    (running ones finish, but their results are discarded).
+
+    Tasks must not wait on other fan-out tasks, or a full pool deadlocks.
+    """
+
+    def __init__(self, max_workers: int = 16, name: str = "snout-fanout"):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._peak_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """Schedule one call, tracking queue depth."""
+
+        def run():
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        with self._lock:
+            self._queued += 1
+            self._submitted += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        future = self._executor.submit(run)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def as_completed(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        limit: int | None = None,
+        timeout: float | None = None,
+    ) -> Iterator[tuple[int, Any]]:
+        """
+        Run fn over items, yielding (index, result) as each call finishes.
+
+        Args:
+            fn: Function called with each item
+            items: Inputs
+            limit: Most calls from this fan-out in flight at once (default: all)
+            timeout: Seconds until the whole fan-out must finish
+
+        Raises:
+            DeadlineExceeded: If the deadline passes first
+            Exception: The first failure raised by fn
+
+        Closing the iterator early, a failure or a missed deadline cancels
+        the calls not yet started.
+        """
+        items = list(items)
+        limit = limit or len(items)
+        deadline = time.monotonic() + timeout if timeout else None
+        pending: dict[Future, int] = {}
+        next_index = 0
+
+        try:
+            while next_index < len(items) or pending:
+                while next_index < len(items) and len(pending) < limit:
+                    pending[self.submit(fn, items[next_index])] = next_index
+                    next_index += 1
+
+                remaining = max(deadline - time.monotonic(), 0) if deadline else None
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    raise DeadlineExceeded(
+                        f"{len(items) - next_index + len(pending)} of {len(items)} calls "
+                        f"did not finish within {timeout}s"
+                    )
+
+                for future in sorted(done, key=pending.get):
+                    index = pending.pop(future)
+                    yield index, future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def gather(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        limit: int | None = None,
+        timeout: float | None = None,
+    ) -> list[Any]:
+        """
+        Run fn over items and return the results in input order.
+
+        Same arguments and failure behaviour as as_completed().
+        """
+        items = list(items)
+        results: list[Any] = [None] * len(items)
+        for index, result in self.as_completed(fn, items, limit, timeout):
+            results[index] = result
+        return results
+
+    def metrics(self) -> dict:
+        """Return pool size, queue depth and task counters for monitoring."""
+        with self._lock:
+            return {
+                "max_workers": self._max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "peak_queued": self._peak_queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and cancel queued calls."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, future: Future) -> None:
+        """Update counters when a call finishes or is cancelled."""
+        with self._lock:
+            if future.cancelled():
+                self._queued -= 1
+                self._cancelled += 1
+            elif future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
@@ -0,0 +1,119 @@
+"""
+Shared HTTP transport for the eBay clients.
+
+One ``requests.Session`` with a right-sized keep-alive pool is shared by the
+OAuth, Browse and Finding services, so concurrent searches reuse warm TLS
+connections to api.ebay.com instead of opening new ones when a service's
+default 10-connection pool overflows. The async clients get the same
+settings through ``build_async_client``.
+"""
+import logging
+from typing import Any
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import Config
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # optional: HTTP/2 for the async clients
+    h2 = None
+
+try:
+    import brotli  # noqa: F401
+except ImportError:  # optional: brotli-compressed responses
+    brotli = None
+
+logger = logging.getLogger("snout.http")
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+class HttpTransport:
+    """
+    Pooled HTTP session plus the timeouts to use with it.
+
+    Only failures to connect are retried here: they happen before a request
+    is sent, so retrying is always safe.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 32,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        connect_retries: int = 2,
+    ):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        retry = Retry(total=connect_retries, connect=connect_retries, read=0, status=0, other=0,
+                      backoff_factor=0.1, raise_on_status=False)
+        self._adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+        self.session.headers.update({"Accept-Encoding": ACCEPT_ENCODING, "Connection": "keep-alive"})
+
+    @classmethod
+    def from_config(cls, config: Config) -> "HttpTransport":
+        """Build the transport described by the configuration."""
+        return cls(
+            pool_size=config.http_pool_size,
+            connect_timeout=config.http_connect_timeout,
+            read_timeout=config.request_timeout,
+            connect_retries=config.http_connect_retries,
+        )
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        """(connect, read) timeout for requests calls."""
+        return self.connect_timeout, self.read_timeout
+
+    def metrics(self) -> dict[str, Any]:
+        """Return pool size and connection reuse counters for monitoring."""
+        opened = requests_sent = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            "pool_size": self.pool_size,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "connections_opened": opened,
+            "requests": requests_sent,
+        }
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+
+
+def async_timeout(config: Config) -> httpx.Timeout:
+    """Timeout for httpx calls, with connect split from read."""
+    return httpx.Timeout(config.request_timeout, connect=config.http_connect_timeout)
+
+
+def build_async_client(config: Config) -> httpx.AsyncClient:
+    """
+    Build the shared async client: same pool size and timeouts, HTTP/2 when
+    the ``h2`` package is installed.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=h2 is not None,
+        limits=httpx.Limits(max_connections=config.http_pool_size, max_keepalive_connections=config.http_pool_size),
+        retries=config.http_connect_retries,
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=async_timeout(config),
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+    )
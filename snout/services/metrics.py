@@ -0,0 +1,305 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain Python objects guarded by one lock per
+labelled series; recording a sample is a bisect plus a few additions, so the
+instrumentation stays on under full load. Values are per process: with
+several workers, scrape each one (or aggregate in Prometheus).
+"""
+import bisect
+import math
+import threading
+import time
+from typing import Iterable
+
+# Seconds; covers sub-millisecond parsing up to slow upstream calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Render a label set, e.g. '{api="browse"}', or '' without labels."""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def render_family(name: str, kind: str, help_text: str, samples: Iterable[tuple[dict, float]]) -> str:
+    """
+    Render one metric family from precomputed samples.
+
+    Used for values that already live elsewhere (cache counters, executor
+    queue depth) and are read at scrape time rather than recorded twice.
+
+    Args:
+        name: Metric name
+        kind: "counter" or "gauge"
+        help_text: HELP line text
+        samples: (labels, value) pairs
+
+    Returns:
+        Exposition text for the family
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        names = tuple(labels)
+        lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _CounterChild:
+    """One labelled counter series."""
+
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter."""
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    """One labelled histogram series."""
+
+    __slots__ = ("_bounds", "_lock", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._bounds = bounds
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one sample."""
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self)
+
+
+class _Timer:
+    """Observes elapsed seconds into a histogram series on exit."""
+
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._child.observe(time.perf_counter() - self._started)
+
+
+class _Metric:
+    """Base for labelled metric families."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            self._default = self.labels()
+
+    def labels(self, *values: str):
+        """Return the series for these label values, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def series(self) -> list[tuple[tuple[str, ...], object]]:
+        """Snapshot of (label values, series), sorted by label values."""
+        with self._lock:
+            return sorted(self._children.items())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally labelled."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase an unlabelled counter."""
+        self._default.inc(amount)
+
+    def value(self, *labels: str) -> float:
+        """Current value of a series (0 if never incremented)."""
+        child = self._children.get(labels)
+        return child.value if child is not None else 0.0
+
+    def render(self) -> str:
+        """Exposition text for this counter."""
+        return render_family(
+            self.name, self.kind, self.help,
+            ((dict(zip(self.label_names, values)), child.value) for values, child in self.series()),
+        )
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a sample on an unlabelled histogram."""
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        """Time a block on an unlabelled histogram."""
+        return self._default.time()
+
+    def count(self, *labels: str) -> int:
+        """Number of samples recorded for a series (0 if none)."""
+        child = self._children.get(labels)
+        return child.count if child is not None else 0
+
+    def render(self) -> str:
+        """Exposition text for this histogram, with cumulative buckets."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        bucket_names = self.label_names + ("le",)
+        for values, child in self.series():
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_names, values + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labels: tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter."""
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def _register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Exposition text for every registered metric."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "snout_upstream_request_seconds",
+    "eBay API request latency, including reading the response body.",
+    ("api", "operation"),
+)
+TOKEN_REFRESH_SECONDS = REGISTRY.histogram(
+    "snout_token_refresh_seconds",
+    "OAuth client_credentials token refresh latency.",
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "snout_parse_seconds",
+    "Time to parse an eBay response into items.",
+    ("api",),
+)
+PARSE_ERRORS = REGISTRY.counter(
+    "snout_parse_errors_total",
+    "eBay items skipped because they could not be parsed.",
+    ("api",),
+)
+STATS_SECONDS = REGISTRY.histogram(
+    "snout_stats_seconds",
+    "Time to compute price statistics.",
+    ("kind",),
+)
+SERIALIZE_SECONDS = REGISTRY.histogram(
+    "snout_serialize_seconds",
+    "Time to encode a response body (or stream frame) as JSON.",
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "snout_request_seconds",
+    "Request handling time until the response is returned (first byte for streams).",
+    ("endpoint", "method", "status"),
+)
+RATE_LIMITED = REGISTRY.counter(
+    "snout_rate_limited_total",
+    "Requests rejected by the rate limiter.",
+    ("endpoint",),
+)
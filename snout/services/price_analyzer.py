@@ -1,11 +1,23 @@
 """
 Price analysis and statistics.
 """
-import statistics
+import bisect
+import math
 from dataclasses import dataclass, asdict
-from typing import Any
+from typing import Any, Iterable
 
-from .ebay_service import EbayItem
+from .metrics import STATS_SECONDS
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorised extended stats
+    np = None
+
+_basic_stats_seconds = STATS_SECONDS.labels("basic")
+_extended_stats_seconds = STATS_SECONDS.labels("extended")
+
+DEFAULT_PERCENTILES = (10, 25, 75, 90)
+TRIM_METHODS = ("iqr", "mad")
 
 
 @dataclass
@@ -37,31 +49,329 @@ class PriceComparison:
         return asdict(self)
 
 
-def calculate_price_stats(items: list[EbayItem]) -> PriceStats | None:
+class PriceAccumulator:
+    """
+    Single-pass, mergeable and serialisable price statistics.
+
+    Count, min and max are tracked directly and mean/variance with Welford's
+    algorithm, so no price list is needed. Quantiles are exact until
+    EXACT_LIMIT prices have been seen; beyond that they come from a
+    log-bucketed sketch whose estimates are within ``relative_accuracy`` of
+    the true value. Non-positive prices are ignored, as in all Snout stats.
+    """
+
+    EXACT_LIMIT = 1024
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0
+        self._relative_accuracy = relative_accuracy
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._values: list[float] | None = []
+        self._buckets: dict[int, int] = {}
+
+    @classmethod
+    def from_prices(cls, prices: Iterable[float]) -> "PriceAccumulator":
+        """Build an accumulator over prices."""
+        accumulator = cls()
+        for price in prices:
+            accumulator.add(price)
+        return accumulator
+
+    def add(self, price: float) -> None:
+        """Add one price."""
+        if price <= 0:
+            return
+
+        self.count += 1
+        delta = price - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (price - self.mean)
+        if price < self.min:
+            self.min = price
+        if price > self.max:
+            self.max = price
+
+        if self._values is not None:
+            self._values.append(price)
+            if len(self._values) > self.EXACT_LIMIT:
+                self._to_sketch()
+        else:
+            self._add_to_sketch(price, 1)
+
+    def merge(self, other: "PriceAccumulator") -> None:
+        """Fold another accumulator (e.g. another page or shard) into this one."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self._copy_from(other)
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        if self._values is not None and other._values is not None and count <= self.EXACT_LIMIT:
+            self._values.extend(other._values)
+            return
+
+        if self._values is not None:
+            self._to_sketch()
+        if other._values is not None:
+            for price in other._values:
+                self._add_to_sketch(price, 1)
+        else:
+            for index, n in other._buckets.items():
+                self._buckets[index] = self._buckets.get(index, 0) + n
+
+    @property
+    def std_dev(self) -> float:
+        """Sample standard deviation (0 for fewer than two prices)."""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate the q-quantile (0 <= q <= 1) with linear interpolation.
+
+        Returns:
+            The quantile, exact while in exact mode
+        """
+        if self.count == 0:
+            raise ValueError("quantile of empty accumulator")
+
+        rank = q * (self.count - 1)
+
+        if self._values is not None:
+            values = sorted(self._values)
+            lower = int(math.floor(rank))
+            upper = min(lower + 1, self.count - 1)
+            return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                estimate = 2 * math.exp(index * self._log_gamma) / (1 + math.exp(self._log_gamma))
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def median(self) -> float:
+        """Median price."""
+        return self.quantile(0.5)
+
+    def to_stats(self) -> "PriceStats | None":
+        """Build PriceStats, or None if no prices were added."""
+        if self.count == 0:
+            return None
+
+        return PriceStats(
+            count=self.count,
+            average=round(self.mean, 2),
+            median=round(self.median, 2),
+            min=round(self.min, 2),
+            max=round(self.max, 2),
+            std_dev=round(self.std_dev, 2),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialise to a JSON-compatible dictionary."""
+        data: dict[str, Any] = {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self._m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "relative_accuracy": self._relative_accuracy,
+        }
+        if self._values is not None:
+            data["values"] = list(self._values)
+        else:
+            data["buckets"] = {str(index): n for index, n in self._buckets.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PriceAccumulator":
+        """Rebuild an accumulator serialised with to_dict."""
+        accumulator = cls(relative_accuracy=data["relative_accuracy"])
+        accumulator.count = data["count"]
+        accumulator.mean = data["mean"]
+        accumulator._m2 = data["m2"]
+        if accumulator.count:
+            accumulator.min = data["min"]
+            accumulator.max = data["max"]
+        if "values" in data:
+            accumulator._values = list(data["values"])
+        else:
+            accumulator._values = None
+            accumulator._buckets = {int(index): n for index, n in data["buckets"].items()}
+        return accumulator
+
+    def _to_sketch(self) -> None:
+        """Switch from exact values to the bucketed sketch."""
+        values, self._values = self._values, None
+        for price in values:
+            self._add_to_sketch(price, 1)
+
+    def _add_to_sketch(self, price: float, n: int) -> None:
+        index = math.ceil(math.log(price) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + n
+
+    def _copy_from(self, other: "PriceAccumulator") -> None:
+        self.__dict__.update(PriceAccumulator.from_dict(other.to_dict()).__dict__)
+
+
+def calculate_price_stats(items: Iterable[Any], attr: str = "price") -> PriceStats | None:
     """
-    Calculate price statistics from a list of items.
+    Calculate price statistics from a list of items in a single pass.
 
     Args:
-        items: List of eBay items
+        items: eBay items (EbayItem, or BrowseItem with attr="total_price")
+        attr: Name of the price attribute to summarise
 
     Returns:
         PriceStats object or None if no valid prices
     """
-    if not items:
+    with _basic_stats_seconds.time():
+        return PriceAccumulator.from_prices(getattr(item, attr) for item in items).to_stats()
+
+
+@dataclass
+class ExtendedPriceStats:
+    """Percentiles, histogram and outlier-trimmed centre for a set of prices."""
+
+    percentiles: dict[str, float]
+    histogram: dict[str, list]
+    trim_method: str
+    lower_fence: float
+    upper_fence: float
+    outliers_removed: int
+    trimmed_mean: float
+    trimmed_median: float
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
+def calculate_extended_stats(
+    prices: Iterable[float],
+    percentiles: Iterable[float] = DEFAULT_PERCENTILES,
+    bins: int = 10,
+    trim: str = "iqr",
+) -> ExtendedPriceStats | None:
+    """
+    Calculate percentiles, a histogram and trimmed mean/median in one pass.
+
+    Outliers are those outside Tukey's fences (1.5 x IQR beyond the
+    quartiles) for "iqr", or more than 3 scaled MADs from the median for
+    "mad". When most prices are identical the MAD is 0 and would drop every
+    other price, so "mad" then trims nothing. The histogram spans the trimmed range, so a single placeholder
+    listing does not flatten it. Uses NumPy when installed.
+
+    Args:
+        prices: Prices to summarise (non-positive prices are ignored)
+        percentiles: Percentiles to report, each 0-100
+        bins: Number of equal-width histogram bins
+        trim: Outlier rule, "iqr" or "mad"
+
+    Returns:
+        ExtendedPriceStats, or None if there are no valid prices
+    """
+    if trim not in TRIM_METHODS:
+        raise ValueError(f"Unknown trim method: {trim}")
+
+    percentiles = list(percentiles)
+    with _extended_stats_seconds.time():
+        if np is not None:
+            return _extended_stats_numpy(prices, percentiles, bins, trim)
+        return _extended_stats_python(prices, percentiles, bins, trim)
+
+
+def _percentile_key(p: float) -> str:
+    return f"p{p:g}"
+
+
+def _extended_stats_numpy(prices, percentiles, bins, trim) -> ExtendedPriceStats | None:
+    values = np.fromiter(prices, dtype=float)
+    values = np.sort(values[values > 0])
+    if values.size == 0:
         return None
 
-    prices = [item.price for item in items if item.price > 0]
+    q1, median, q3, *points = np.percentile(values, [25, 50, 75, *percentiles])
+    if trim == "iqr":
+        spread = 1.5 * (q3 - q1)
+        lower, upper = q1 - spread, q3 + spread
+    else:
+        spread = 3 * 1.4826 * np.median(np.abs(values - median))
+        lower, upper = (median - spread, median + spread) if spread > 0 else (values[0], values[-1])
+
+    kept = values[np.searchsorted(values, lower, side="left"):np.searchsorted(values, upper, side="right")]
+    if kept.size == 0:
+        kept = values
+    counts, edges = np.histogram(kept, bins=bins)
 
-    if not prices:
+    return ExtendedPriceStats(
+        percentiles={_percentile_key(p): round(float(v), 2) for p, v in zip(percentiles, points)},
+        histogram={"bin_edges": [round(float(e), 2) for e in edges], "counts": counts.tolist()},
+        trim_method=trim,
+        lower_fence=round(float(lower), 2),
+        upper_fence=round(float(upper), 2),
+        outliers_removed=int(values.size - kept.size),
+        trimmed_mean=round(float(kept.mean()), 2),
+        trimmed_median=round(float(np.median(kept)), 2),
+    )
+
+
+def _extended_stats_python(prices, percentiles, bins, trim) -> ExtendedPriceStats | None:
+    values = sorted(p for p in prices if p > 0)
+    if not values:
         return None
 
-    return PriceStats(
-        count=len(prices),
-        average=round(statistics.mean(prices), 2),
-        median=round(statistics.median(prices), 2),
-        min=round(min(prices), 2),
-        max=round(max(prices), 2),
-        std_dev=round(statistics.stdev(prices), 2) if len(prices) > 1 else 0,
+    def percentile(sorted_values: list[float], p: float) -> float:
+        rank = p / 100 * (len(sorted_values) - 1)
+        lower = int(rank)
+        upper = min(lower + 1, len(sorted_values) - 1)
+        return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+    q1, median, q3 = (percentile(values, p) for p in (25, 50, 75))
+    if trim == "iqr":
+        spread = 1.5 * (q3 - q1)
+        lower, upper = q1 - spread, q3 + spread
+    else:
+        deviations = sorted(abs(v - median) for v in values)
+        spread = 3 * 1.4826 * percentile(deviations, 50)
+        lower, upper = (median - spread, median + spread) if spread > 0 else (values[0], values[-1])
+
+    kept = values[bisect.bisect_left(values, lower):bisect.bisect_right(values, upper)] or values
+
+    low, high = kept[0], kept[-1]
+    if high == low:
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / bins
+    edges = [low + i * width for i in range(bins)] + [high]
+    counts = [0] * bins
+    for v in kept:
+        counts[min(int((v - low) / width), bins - 1)] += 1
+
+    return ExtendedPriceStats(
+        percentiles={_percentile_key(p): round(percentile(values, p), 2) for p in percentiles},
+        histogram={"bin_edges": [round(e, 2) for e in edges], "counts": counts},
+        trim_method=trim,
+        lower_fence=round(lower, 2),
+        upper_fence=round(upper, 2),
+        outliers_removed=len(values) - len(kept),
+        trimmed_mean=round(math.fsum(kept) / len(kept), 2),
+        trimmed_median=round(percentile(kept, 50), 2),
     )
 
 
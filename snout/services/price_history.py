@@ -0,0 +1,345 @@
+"""
+Local price history of observed eBay listings.
+"""
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+from ..utils.validators import normalize_keyword
+from .price_analyzer import PriceAccumulator, PriceStats
+
+logger = logging.getLogger("snout.history")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    item_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    condition TEXT NOT NULL,
+    url TEXT NOT NULL,
+    event_at REAL NOT NULL,
+    first_seen_at REAL NOT NULL,
+    last_seen_at REAL NOT NULL,
+    PRIMARY KEY (item_id, kind)
+);
+CREATE TABLE IF NOT EXISTS query_items (
+    keyword TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    PRIMARY KEY (keyword, kind, item_id)
+);
+CREATE TABLE IF NOT EXISTS sold_rollups (
+    keyword TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    accumulator TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (keyword, interval, bucket)
+);
+"""
+
+TREND_INTERVALS = ("day", "week")
+
+
+def _parse_timestamp(value: str | None) -> float | None:
+    """Parse an eBay ISO 8601 timestamp (e.g. 2024-01-15T10:30:00.000Z) to epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _format_timestamp(value: float) -> str:
+    """Format epoch seconds as an ISO 8601 UTC timestamp."""
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def bucket_start(day: date, interval: str) -> date:
+    """Return the first day of the day/week bucket containing a date (weeks start Monday)."""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+class PriceHistoryStore:
+    """
+    SQLite (WAL mode) store of sold and active listings seen by Snout.
+
+    Listings are deduplicated by (item_id, kind); a repeat sighting updates
+    the price and last-seen time. ``event_at`` is the sale time for sold
+    listings and the first sighting for active ones. Writes are queued and
+    inserted in batches by a background thread, so recording never blocks a
+    request.
+
+    Sold prices are also rolled up per keyword into day and week buckets,
+    each a serialised PriceAccumulator plus its precomputed PriceStats. A
+    rollup is updated only when a listing is first linked to a keyword, so
+    trend queries read one small row per bucket instead of scanning
+    observations.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        self._path = path
+        self._batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._local = threading.local()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if conn.execute("SELECT 1 FROM sold_rollups LIMIT 1").fetchone() is None:
+            self._rebuild_rollups(conn)
+
+        self._writer = threading.Thread(target=self._write_loop, name="price-history-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, kind: str, keywords: str, items: Iterable[Any]) -> None:
+        """
+        Queue observed listings for insertion.
+
+        Args:
+            kind: "sold" or "active"
+            keywords: Search keywords the listings were returned for
+            items: EbayItem or BrowseItem objects
+        """
+        items = list(items)
+        if items:
+            self._queue.put((kind, normalize_keyword(keywords), time.time(), items))
+
+    def flush(self) -> None:
+        """Block until every queued observation has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        self._queue.put(None)
+        self._writer.join()
+
+    def query(
+        self,
+        keywords: str,
+        kind: str = "sold",
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 200,
+    ) -> list[dict[str, Any]]:
+        """
+        Return recorded listings for a keyword, newest first.
+
+        Args:
+            keywords: Search keywords (normalised before lookup)
+            kind: "sold" or "active"
+            since: Earliest event time (epoch seconds), inclusive
+            until: Latest event time (epoch seconds), exclusive
+            limit: Maximum rows to return
+
+        Returns:
+            List of observation dictionaries
+        """
+        sql, params = self._select(
+            "o.item_id, o.title, o.price, o.currency, o.condition, o.url, o.event_at, o.last_seen_at",
+            keywords, kind, since, until,
+        )
+        rows = self._connection().execute(
+            sql + " ORDER BY o.event_at DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+
+        return [
+            {
+                "item_id": item_id,
+                "title": title,
+                "price": price,
+                "currency": currency,
+                "condition": condition,
+                "url": url,
+                "event_at": _format_timestamp(event_at),
+                "last_seen_at": _format_timestamp(last_seen_at),
+            }
+            for item_id, title, price, currency, condition, url, event_at, last_seen_at in rows
+        ]
+
+    def stats(
+        self,
+        keywords: str,
+        kind: str = "sold",
+        since: float | None = None,
+        until: float | None = None,
+    ) -> PriceStats | None:
+        """Calculate price stats over every recorded listing matching the filters."""
+        sql, params = self._select("o.price", keywords, kind, since, until)
+        accumulator = PriceAccumulator()
+        for (price,) in self._connection().execute(sql, params):
+            accumulator.add(price)
+        return accumulator.to_stats()
+
+    def trend(
+        self, keywords: str, interval: str = "day", since: date | None = None, until: date | None = None
+    ) -> list[tuple[date, PriceStats]]:
+        """
+        Return sold price stats per day or week, oldest first.
+
+        Args:
+            keywords: Search keywords (normalised before lookup)
+            interval: "day" or "week"
+            since: First day to include (UTC)
+            until: Last day to include (UTC)
+
+        Returns:
+            (bucket start, stats) for every bucket with sales; buckets only
+            partly inside the range are returned whole
+        """
+        sql = "SELECT bucket, stats FROM sold_rollups WHERE keyword = ? AND interval = ?"
+        params: list = [normalize_keyword(keywords), interval]
+        if since is not None:
+            sql += " AND bucket >= ?"
+            params.append(bucket_start(since, interval).isoformat())
+        if until is not None:
+            sql += " AND bucket <= ?"
+            params.append(until.isoformat())
+
+        return [
+            (date.fromisoformat(bucket), PriceStats(**json.loads(stats)))
+            for bucket, stats in self._connection().execute(sql + " ORDER BY bucket", params)
+        ]
+
+    def _select(
+        self, columns: str, keywords: str, kind: str, since: float | None, until: float | None
+    ) -> tuple[str, list]:
+        """Build the SELECT shared by query() and stats()."""
+        sql = (
+            f"SELECT {columns} FROM query_items q "
+            "JOIN observations o ON o.item_id = q.item_id AND o.kind = q.kind "
+            "WHERE q.keyword = ? AND q.kind = ?"
+        )
+        params: list = [normalize_keyword(keywords), kind]
+        if since is not None:
+            sql += " AND o.event_at >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND o.event_at < ?"
+            params.append(until)
+        return sql, params
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection (SQLite connections are per-thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self._path, timeout=30)
+        return conn
+
+    def _write_loop(self) -> None:
+        """Drain the queue in batches until close() is called."""
+        conn = self._connection()
+        while True:
+            batch = [self._queue.get()]
+            observed = len(batch[0][3]) if batch[0] else 0
+            while observed < self._batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(entry)
+                if entry:
+                    observed += len(entry[3])
+
+            try:
+                self._write_batch(conn, [entry for entry in batch if entry])
+            except sqlite3.Error as e:
+                logger.error("Failed to write price history batch: %s", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if any(entry is None for entry in batch):
+                return
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list[tuple]) -> None:
+        """Insert one batch of observations and update rollups in a single transaction."""
+        observations = []
+        links = []
+        for kind, keyword, seen_at, items in batch:
+            for item in items:
+                price = getattr(item, "total_price", None)
+                if price is None:
+                    price = item.price
+                event_at = _parse_timestamp(getattr(item, "sold_date", None)) or seen_at
+                observations.append((
+                    item.item_id, kind, item.title, price, item.currency,
+                    item.condition, item.url, event_at, seen_at, seen_at,
+                ))
+                links.append((keyword, kind, item.item_id, price, event_at))
+
+        rollups: dict[tuple, PriceAccumulator] = defaultdict(PriceAccumulator)
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(item_id, kind) DO UPDATE SET
+                    price = excluded.price,
+                    title = excluded.title,
+                    last_seen_at = excluded.last_seen_at
+                """,
+                observations,
+            )
+            for keyword, kind, item_id, price, event_at in links:
+                cursor = conn.execute("INSERT OR IGNORE INTO query_items VALUES (?, ?, ?)", (keyword, kind, item_id))
+                if kind == "sold" and cursor.rowcount:
+                    self._add_to_rollups(rollups, keyword, price, event_at)
+            self._merge_rollups(conn, rollups)
+
+        logger.debug("Wrote %d price history observations", len(observations))
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection) -> None:
+        """Build rollups from existing sold observations (databases created before rollups)."""
+        rollups: dict[tuple, PriceAccumulator] = defaultdict(PriceAccumulator)
+        rows = conn.execute(
+            "SELECT q.keyword, o.price, o.event_at FROM query_items q "
+            "JOIN observations o ON o.item_id = q.item_id AND o.kind = q.kind "
+            "WHERE q.kind = 'sold'"
+        )
+        for keyword, price, event_at in rows:
+            self._add_to_rollups(rollups, keyword, price, event_at)
+
+        if rollups:
+            with conn:
+                self._merge_rollups(conn, rollups)
+            logger.info("Rebuilt price history rollups (%d buckets)", len(rollups))
+
+    @staticmethod
+    def _add_to_rollups(rollups: dict, keyword: str, price: float, event_at: float) -> None:
+        """Add one sale to the in-memory day and week accumulators."""
+        day = datetime.fromtimestamp(event_at, tz=timezone.utc).date()
+        for interval in TREND_INTERVALS:
+            rollups[(keyword, interval, bucket_start(day, interval).isoformat())].add(price)
+
+    @staticmethod
+    def _merge_rollups(conn: sqlite3.Connection, rollups: dict) -> None:
+        """Merge in-memory accumulators into the stored rollups."""
+        for (keyword, interval, bucket), accumulator in rollups.items():
+            row = conn.execute(
+                "SELECT accumulator FROM sold_rollups WHERE keyword = ? AND interval = ? AND bucket = ?",
+                (keyword, interval, bucket),
+            ).fetchone()
+            if row is not None:
+                stored = PriceAccumulator.from_dict(json.loads(row[0]))
+                stored.merge(accumulator)
+                accumulator = stored
+            stats = accumulator.to_stats()
+            if stats is None:
+                continue
+            conn.execute(
+                "INSERT OR REPLACE INTO sold_rollups VALUES (?, ?, ?, ?, ?)",
+                (keyword, interval, bucket, json.dumps(accumulator.to_dict()), json.dumps(stats.to_dict())),
+            )
@@ -0,0 +1,224 @@
+"""
+Shared rate-limit storage and the daily eBay call quota.
+
+``SqliteLimitStorage`` registers a ``sqlite://`` scheme with the ``limits``
+library, so Flask-Limiter counters live in one SQLite file that every worker
+process on the host updates atomically, instead of per-process memory that
+makes the effective limit N times looser with N workers::
+
+    RATE_LIMIT_STORAGE_URI=sqlite:///var/lib/snout/ratelimit.sqlite3
+
+``QuotaAccountant`` budgets upstream eBay calls per API per UTC day in the
+same kind of storage. As the quota nears exhaustion the services answer from
+their caches only, keeping what is left for searches nothing is cached for.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from limits.storage import Storage, storage_from_string
+
+from ..config import Config
+
+logger = logging.getLogger("snout.ratelimit")
+
+
+class SqliteLimitStorage(Storage):
+    """
+    Fixed-window rate-limit counters in a SQLite file shared across processes.
+
+    Increments run in ``BEGIN IMMEDIATE`` transactions, which take SQLite's
+    write lock up front, so concurrent workers never lose an update.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    # Expired rows are purged every this many increments
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options: Any):
+        path = uri.split("://", 1)[1]
+        self.path = path
+        self._lock = threading.Lock()
+        self._increments = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        """Increment a counter, starting a new window of expiry seconds if it has expired."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or row[1] <= now:
+                    value = amount
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?)", (key, value, now + expiry)
+                    )
+                else:
+                    value = row[0] + amount
+                    self._conn.execute("UPDATE rate_limits SET value = ? WHERE key = ?", (value, key))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._increments += 1
+            if self._increments % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return value
+
+    def get(self, key: str) -> int:
+        """Current counter value, or 0 if absent or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM rate_limits WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        """When the counter's window ends (now if absent)."""
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        """Check the database is reachable."""
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int | None:
+        """Remove all counters, returning how many there were."""
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key: str) -> None:
+        """Remove one counter."""
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+
+class QuotaExhaustedError(Exception):
+    """Raised when an eBay API's daily call quota has been used up."""
+
+    def __init__(self, api: str, retry_after: float):
+        super().__init__(f"Daily {api} quota exhausted (resets in {retry_after:.0f}s)")
+        self.api = api
+        self.retry_after = retry_after
+
+
+def seconds_until_reset(now: datetime | None = None) -> float:
+    """Seconds until the quota day ends at the next UTC midnight."""
+    now = now or datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class QuotaAccountant:
+    """
+    Daily budgets of upstream eBay calls per API, counted in a shared
+    ``limits`` storage so all workers draw on one allowance.
+    """
+
+    def __init__(self, storage: Storage, budgets: dict[str, int], cache_only_fraction: float = 0.9):
+        """
+        Args:
+            storage: Counter storage shared by all workers
+            budgets: Calls allowed per UTC day by API name; 0 means unlimited
+            cache_only_fraction: Share of a budget after which searches are
+                answered from cache whenever possible
+        """
+        self._storage = storage
+        self._budgets = budgets
+        self._cache_only_fraction = cache_only_fraction
+
+    @classmethod
+    def from_config(cls, config: Config, storage: Storage | None = None) -> "QuotaAccountant":
+        """
+        Build the accountant with the configured budgets and storage.
+
+        Warns when a budget is set but counted in per-process memory, where
+        every worker spends its own copy of the quota.
+        """
+        budgets = {"browse": config.ebay_daily_quota_browse, "finding": config.ebay_daily_quota_finding}
+        if storage is None:
+            if config.rate_limit_storage_uri.startswith("memory://") and any(budgets.values()):
+                logger.warning(
+                    "Daily eBay quotas are counted per process with RATE_LIMIT_STORAGE_URI=%s; "
+                    "each worker can spend the full budget. Use sqlite:// or redis:// storage to share it.",
+                    config.rate_limit_storage_uri,
+                )
+            storage = storage_from_string(config.rate_limit_storage_uri)
+        return cls(storage, budgets, config.quota_cache_only_fraction)
+
+    @staticmethod
+    def _key(api: str) -> str:
+        """Storage key for today's count of calls to api."""
+        return f"snout/quota/{api}/{datetime.now(timezone.utc).date().isoformat()}"
+
+    def spend(self, api: str) -> None:
+        """
+        Count one upstream call against api's budget.
+
+        Raises:
+            QuotaExhaustedError: If the day's budget is already used up
+        """
+        budget = self._budgets.get(api, 0)
+        if budget <= 0:
+            return
+        remaining = seconds_until_reset()
+        # Keep the counter a little past midnight so clock skew between workers cannot reset it early
+        used = self._storage.incr(self._key(api), int(remaining) + 60)
+        if used > budget:
+            raise QuotaExhaustedError(api, remaining)
+
+    def used(self, api: str) -> int:
+        """Calls made to api today, capped at its budget."""
+        used = self._storage.get(self._key(api))
+        budget = self._budgets.get(api, 0)
+        return min(used, budget) if budget > 0 else used
+
+    def cache_only(self, api: str) -> bool:
+        """Check whether api's remaining budget is low enough to serve from cache only."""
+        budget = self._budgets.get(api, 0)
+        return budget > 0 and self._storage.get(self._key(api)) >= budget * self._cache_only_fraction
+
+    def metrics(self) -> dict[str, Any]:
+        """Return per-API budget, usage and cache-only state for monitoring."""
+        result = {}
+        for api, budget in self._budgets.items():
+            used = self.used(api)
+            result[api] = {
+                "budget": budget or None,
+                "used": used,
+                "remaining": max(budget - used, 0) if budget > 0 else None,
+                "cache_only": self.cache_only(api),
+            }
+        return result
@@ -0,0 +1,373 @@
+"""
+Retries, hedged requests and a circuit breaker for upstream eBay calls.
+
+``UpstreamGuard`` wraps one endpoint's request function:
+
+- transient failures (timeouts, connection errors, 429 and 5xx responses)
+  are retried with full-jitter exponential backoff;
+- optionally, a second identical request is sent once the first has taken
+  longer than the endpoint's recent p95 latency, and whichever answers
+  first wins;
+- consecutive failed calls open a circuit breaker, after which calls fail
+  fast with ``CircuitOpenError`` until a probe is allowed through.
+
+``call`` guards blocking request functions and ``acall`` coroutine ones; both
+share the guard's breaker and latency window, so the sync and async clients
+for an endpoint trip (and recover) together.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures import wait
+from typing import Any, Awaitable, Callable, TypeVar
+
+import httpx
+import requests
+
+from ..config import Config
+
+logger = logging.getLogger("snout.resilience")
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the endpoint's circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open (retry in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether a failed request is worth retrying (and counts against the circuit)."""
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, httpx.TimeoutException, httpx.NetworkError)):
+        return True
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Closed: calls pass. After ``failure_threshold`` consecutive failures it
+    opens and refuses calls for ``reset_timeout`` seconds, then half-opens
+    and lets one probe through: success closes it, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.trips = 0
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout has passed."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+            return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through."""
+        with self._lock:
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def allow(self) -> bool:
+        """Check whether a call may proceed; in half-open state only one probe at a time may."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+        with self._lock:
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Circuit %s closed", self.name)
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit at the threshold or after a failed probe."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                logger.warning("Circuit %s opened after %d consecutive failures", self.name, self._failures)
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without a verdict (e.g. a 4xx response)."""
+        with self._lock:
+            self._probing = False
+
+    def metrics(self) -> dict[str, Any]:
+        """Return state and trip counts for monitoring."""
+        state = self.state
+        return {
+            "state": state,
+            "trips": self.trips,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_after(), 1) if state == self.OPEN else None,
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call durations."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+        self._cached: float | None = None
+        self._since_cached = 0
+
+    def add(self, seconds: float) -> None:
+        """Record one duration."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._since_cached += 1
+
+    def percentile(self, q: float = 95) -> float | None:
+        """Nearest-rank percentile of the window, or None with too few samples."""
+        with self._lock:
+            if len(self._samples) < self._min_samples:
+                return None
+            # Re-sorting the window every call would dominate fast paths
+            if self._cached is None or self._since_cached >= 10:
+                ordered = sorted(self._samples)
+                self._cached = ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+                self._since_cached = 0
+            return self._cached
+
+
+class UpstreamGuard:
+    """Retry, hedging and circuit breaking around one upstream endpoint."""
+
+    def __init__(
+        self,
+        name: str,
+        attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.05,
+        hedge_workers: int = 8,
+        retryable: Callable[[Exception], bool] = is_retryable,
+    ):
+        self.name = name
+        self.attempts = max(attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.latency = LatencyTracker()
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self._retryable = retryable
+        self._hedge_pool = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix=f"hedge-{name}") if hedge else None
+
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_config(cls, name: str, config: Config) -> "UpstreamGuard":
+        """Build a guard with the configured retry, breaker and hedging settings."""
+        return cls(
+            name,
+            attempts=config.upstream_retry_attempts,
+            base_delay=config.upstream_retry_base_delay,
+            max_delay=config.upstream_retry_max_delay,
+            failure_threshold=config.circuit_failure_threshold,
+            reset_timeout=config.circuit_reset_timeout,
+            hedge=config.hedge_requests,
+            hedge_min_delay=config.hedge_min_delay,
+        )
+
+    def is_open(self) -> bool:
+        """Check whether calls are currently refused."""
+        return self.breaker.state == CircuitBreaker.OPEN
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Run fn with retries, hedging and circuit breaking.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (fn is not called)
+            Exception: fn's last error, once it is not retryable or
+                attempts are used up
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+        for attempt in range(self.attempts):
+            started = time.perf_counter()
+            try:
+                result = self._hedged(fn) if self.hedge else fn()
+            except Exception as e:
+                if not self._retryable(e):
+                    self.breaker.release()
+                    raise
+                if attempt + 1 >= self.attempts:
+                    self.breaker.record_failure()
+                    raise
+                self.retries += 1
+                delay = self.backoff(attempt)
+                logger.warning("%s call failed (%s); retry %d in %.2fs", self.name, e, attempt + 1, delay)
+                time.sleep(delay)
+                continue
+
+            self.latency.add(time.perf_counter() - started)
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await fn with retries, hedging and circuit breaking, like call.
+
+        Backoff sleeps and hedges run on the event loop instead of blocking
+        a thread.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (fn is not called)
+            Exception: fn's last error, once it is not retryable or
+                attempts are used up
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+        for attempt in range(self.attempts):
+            started = time.perf_counter()
+            try:
+                result = await (self._ahedged(fn) if self.hedge else fn())
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not self._retryable(e):
+                    self.breaker.release()
+                    raise
+                if attempt + 1 >= self.attempts:
+                    self.breaker.record_failure()
+                    raise
+                self.retries += 1
+                delay = self.backoff(attempt)
+                logger.warning("%s call failed (%s); retry %d in %.2fs", self.name, e, attempt + 1, delay)
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    self.breaker.release()
+                    raise
+                continue
+
+            self.latency.add(time.perf_counter() - started)
+            self.breaker.record_success()
+            return result
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt + 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def hedge_delay(self) -> float | None:
+        """How long to wait before hedging, or None until enough latencies are known."""
+        p95 = self.latency.percentile(95)
+        return None if p95 is None else max(p95, self.hedge_min_delay)
+
+    def _hedged(self, fn: Callable[[], T]) -> T:
+        """Run fn, sending a duplicate if it outlasts the p95 delay; the first success wins."""
+        delay = self.hedge_delay()
+        if delay is None:
+            return fn()
+
+        first = self._hedge_pool.submit(fn)
+        try:
+            return first.result(timeout=delay)
+        except FutureTimeout:
+            pass
+
+        self.hedges += 1
+        second = self._hedge_pool.submit(fn)
+        done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        other = second if winner is first else first
+        if winner.exception() is not None:
+            winner, other = other, winner
+            winner.result()  # wait for the other; raises if both failed
+        if winner is second:
+            self.hedge_wins += 1
+        return winner.result()
+
+    async def _ahedged(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async _hedged: the slower request is cancelled once one succeeds."""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await fn()
+
+        first = asyncio.ensure_future(fn())
+        tasks = [first]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(fn()))
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            winner = done.pop()
+            if winner.exception() is not None and len(tasks) == 2:
+                winner = tasks[1] if winner is first else first
+                await asyncio.wait([winner])  # result() raises if both failed
+            if winner is not first:
+                self.hedge_wins += 1
+            return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def metrics(self) -> dict[str, Any]:
+        """Return circuit state, trip count and retry/hedge counters for monitoring."""
+        p95 = self.latency.percentile(95)
+        return {
+            **self.breaker.metrics(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the hedging pool, if any."""
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
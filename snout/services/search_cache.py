@@ -0,0 +1,297 @@
+"""
+TTL response cache for eBay searches.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from ..config import Config
+
+logger = logging.getLogger("snout.cache")
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its storage and expiry timestamps."""
+
+    value: Any
+    stored_at: float
+    expires_at: float
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache backend."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key and mark it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used beyond the size bound."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend:
+    """SQLite-backed LRU cache backend that survives restarts."""
+
+    name = "disk"
+
+    def __init__(
+        self,
+        path: str,
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+        max_entries: int = 1024,
+    ):
+        self._max_entries = max_entries
+        self._encode = encode
+        self._decode = decode
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry for key and mark it most recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at, expires_at FROM search_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE search_cache SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+
+        value, stored_at, expires_at = row
+        try:
+            return CacheEntry(self._decode(value), stored_at, expires_at)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning("Discarding undecodable cache entry: %s", e)
+            self.delete(key)
+            return None
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used beyond the size bound."""
+        value = self._encode(entry.value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, entry.stored_at, entry.expires_at, time.time()),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM search_cache WHERE key IN (
+                    SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self._max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+
+class SearchCache:
+    """
+    TTL cache with hit/miss accounting over a pluggable backend.
+
+    Entries are fresh for ``ttl`` seconds. With a non-zero ``stale_ttl`` they
+    remain servable as stale for that much longer, so callers can answer
+    immediately and revalidate in the background.
+    """
+
+    def __init__(
+        self,
+        backend: MemoryCacheBackend | DiskCacheBackend,
+        ttl: float = 300,
+        stale_ttl: float = 0,
+    ):
+        self._backend = backend
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any | None:
+        """
+        Look up a fresh cached value.
+
+        Args:
+            key: Canonical cache key
+
+        Returns:
+            The cached value, or None on a miss or expired entry
+        """
+        found = self.lookup(key, allow_stale=False)
+        return found[0] if found else None
+
+    def lookup(self, key: str, allow_stale: bool = True) -> tuple[Any, bool] | None:
+        """
+        Look up a cached value that may be stale.
+
+        Args:
+            key: Canonical cache key
+            allow_stale: Whether entries inside the stale window count as hits
+
+        Returns:
+            Tuple of (value, is_fresh), or None on a miss
+        """
+        now = time.time()
+        entry = self._backend.get(key)
+        fresh = False
+
+        if entry is not None:
+            fresh = now < entry.expires_at
+            if now >= entry.expires_at + self._stale_ttl:
+                self._backend.delete(key)
+                entry = None
+            elif not fresh and not allow_stale:
+                entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            elif fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+
+        return (entry.value, fresh) if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Canonical cache key
+            value: Value to cache
+            ttl: Per-entry time to live in seconds (defaults to the cache TTL)
+        """
+        now = time.time()
+        ttl = self._ttl if ttl is None else ttl
+        self._backend.set(key, CacheEntry(value, now, now + ttl))
+
+    def clear(self) -> None:
+        """Remove all entries and reset counters."""
+        self._backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.stale_hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and occupancy for monitoring."""
+        served = self.hits + self.stale_hits
+        lookups = served + self.misses
+        return {
+            "backend": self._backend.name,
+            "entries": len(self._backend),
+            "ttl": self._ttl,
+            "stale_ttl": self._stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round(served / lookups, 3) if lookups else 0.0,
+        }
+
+
+def build_search_cache(config: Config, item_type: type) -> SearchCache | None:
+    """
+    Build the search cache described by the configuration.
+
+    Args:
+        config: Application configuration
+        item_type: Dataclass used to rebuild cached items from disk. Disk
+            caches for different item types share one file; their keys are
+            namespaced by the query type.
+
+    Returns:
+        SearchCache instance, or None if caching is disabled
+    """
+    backend_name = config.search_cache_backend.lower()
+
+    if backend_name == "none":
+        return None
+
+    if backend_name == "disk":
+        backend = DiskCacheBackend(
+            config.search_cache_path,
+            encode=lambda items: json.dumps([asdict(item) for item in items]),
+            decode=lambda value: [item_type(**d) for d in json.loads(value)],
+            max_entries=config.search_cache_max_entries,
+        )
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries=config.search_cache_max_entries)
+    else:
+        raise ValueError(f"Unknown search cache backend: {config.search_cache_backend}")
+
+    logger.info(
+        "Search cache enabled (backend=%s, ttl=%ds, stale_ttl=%ds, max_entries=%d)",
+        backend.name, config.search_cache_ttl, config.search_cache_stale_ttl,
+        config.search_cache_max_entries,
+    )
+    return SearchCache(
+        backend, ttl=config.search_cache_ttl, stale_ttl=config.search_cache_stale_ttl
+    )
@@ -0,0 +1,687 @@
+"""
+Watchlist of Browse searches kept warm by a background refresher.
+
+Registered queries are re-run on a per-entry cadence and their latest items
+and price stats are kept in memory, so /api/search can answer a watched
+query from the snapshot instead of going upstream. Each entry's interval
+adapts to how fast its prices move: a refresh that moves the median price
+by more than the change threshold halves the interval, a quiet one
+lengthens it by half, within the configured bounds.
+
+Refreshes run on the shared fan-out executor, at most ``workers`` at a time
+per process, and are postponed while the Browse quota is in cache-only mode.
+A snapshot is served for no longer than its refresh interval or the search
+cache TTL, whichever is shorter.
+
+Entries live in a ``MemoryWatchlistStore`` (one worker process) or a
+``SqliteWatchlistStore`` shared by every worker. In the shared store a
+refresh is claimed under a lease, so each due query is fetched once across
+all workers rather than once per worker, and every worker answers from the
+same snapshots.
+"""
+import dataclasses
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from ..config import Config
+from ..utils import json_codec
+from .ebay_browse_service import BrowseItem, BrowseSearchQuery
+from .fanout import FanOutExecutor
+from .price_analyzer import PriceStats, calculate_price_stats
+from .rate_limit import QuotaAccountant
+
+logger = logging.getLogger("snout.watchlist")
+
+
+class WatchlistFullError(Exception):
+    """Raised when registering queries would exceed the watchlist's capacity."""
+
+    pass
+
+
+def watch_id(query: BrowseSearchQuery) -> str:
+    """Stable short identifier for a watched query."""
+    return hashlib.blake2b(query.cache_key().encode(), digest_size=6).hexdigest()
+
+
+@dataclass
+class WatchEntry:
+    """One watched query with its latest snapshot and refresh schedule."""
+
+    id: str
+    query: BrowseSearchQuery
+    interval: float
+    next_due: float
+    items: list[BrowseItem] | None = None
+    stats: PriceStats | None = None
+    refreshed_at: float | None = None
+    refreshes: int = 0
+    failures: int = 0
+    last_error: str | None = None
+    refreshing: bool = field(default=False, repr=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization (without items)."""
+        return {
+            "id": self.id,
+            "query": dataclasses.asdict(self.query),
+            "interval": round(self.interval, 1),
+            "refreshed_at": self.refreshed_at,
+            "next_refresh_at": self.next_due,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "count": len(self.items) if self.items is not None else None,
+            "stats": self.stats.to_dict() if self.stats else None,
+        }
+
+
+class MemoryWatchlistStore:
+    """Watch entries in process memory, for a single worker process."""
+
+    shared = False
+
+    def __init__(self):
+        self._entries: dict[str, WatchEntry] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entries: list[WatchEntry], max_entries: int) -> tuple[list[WatchEntry], int]:
+        """
+        Store entries whose id is not stored yet.
+
+        Returns:
+            Tuple of (the stored entry for each given one, number added)
+
+        Raises:
+            WatchlistFullError: If the new entries do not fit; none are added
+        """
+        with self._lock:
+            new = {entry.id: entry for entry in entries if entry.id not in self._entries}
+            if len(self._entries) + len(new) > max_entries:
+                raise WatchlistFullError(f"Watchlist is limited to {max_entries} queries")
+            self._entries.update(new)
+            return [self._entries[entry.id] for entry in entries], len(new)
+
+    def remove(self, entry_id: str) -> bool:
+        """Delete an entry, returning whether it existed."""
+        with self._lock:
+            return self._entries.pop(entry_id, None) is not None
+
+    def entries(self) -> list[WatchEntry]:
+        """All entries, soonest due first."""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda entry: entry.next_due)
+
+    def intervals(self) -> list[float]:
+        """Refresh interval of every entry."""
+        with self._lock:
+            return [entry.interval for entry in self._entries.values()]
+
+    def snapshot(self, entry_id: str, now: float, max_age: float | None) -> list[BrowseItem] | None:
+        """Items of an entry refreshed within min(its interval, max_age) seconds, else None."""
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None or entry.items is None:
+                return None
+            limit = entry.interval if max_age is None else min(entry.interval, max_age)
+            return entry.items if now - entry.refreshed_at <= limit else None
+
+    def claim(self, now: float, limit: int) -> list[WatchEntry]:
+        """Mark up to limit due entries as refreshing, oldest first, and return them."""
+        with self._lock:
+            due = sorted(
+                (e for e in self._entries.values() if not e.refreshing and e.next_due <= now),
+                key=lambda entry: entry.next_due,
+            )[:limit]
+            for entry in due:
+                entry.refreshing = True
+            return due
+
+    def postpone(self, now: float) -> int:
+        """Push every due entry back by its interval, returning how many were due."""
+        with self._lock:
+            due = [e for e in self._entries.values() if not e.refreshing and e.next_due <= now]
+            for entry in due:
+                entry.next_due = now + entry.interval
+            return len(due)
+
+    def finish(self, entry: WatchEntry, changes: dict[str, Any]) -> None:
+        """Apply a claimed entry's refresh outcome and release it."""
+        with self._lock:
+            for name, value in changes.items():
+                setattr(entry, name, value)
+            entry.refreshing = False
+
+    def next_due(self, now: float) -> float | None:
+        """Earliest next_due among entries not being refreshed."""
+        with self._lock:
+            pending = [entry.next_due for entry in self._entries.values() if not entry.refreshing]
+            return min(pending) if pending else None
+
+
+class SqliteWatchlistStore:
+    """
+    Watch entries in a SQLite (WAL mode) file shared by worker processes.
+
+    Claims run in ``BEGIN IMMEDIATE`` transactions and set a lease on each
+    claimed entry, so concurrent workers never refresh the same entry; a
+    lease left by a worker that died mid-refresh expires after ``lease``
+    seconds. Snapshot items are decoded once per refresh and kept per
+    process.
+    """
+
+    shared = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS watchlist (
+        id TEXT PRIMARY KEY,
+        query TEXT NOT NULL,
+        interval REAL NOT NULL,
+        next_due REAL NOT NULL,
+        items TEXT,
+        stats TEXT,
+        refreshed_at REAL,
+        refreshes INTEGER NOT NULL DEFAULT 0,
+        failures INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        lease_until REAL
+    )
+    """
+    COLUMNS = "id, query, interval, next_due, items, stats, refreshed_at, refreshes, failures, last_error, lease_until"
+
+    # Bound on decoded snapshots kept per process (cleared when full)
+    MAX_DECODED = 1024
+
+    def __init__(self, path: str, lease: float = 600.0):
+        """
+        Args:
+            path: SQLite file, usually the shared rate-limit storage
+            lease: Seconds a claimed refresh is reserved for its worker
+        """
+        self.path = path
+        self._lease = lease
+        self._lock = threading.Lock()
+        self._decoded: dict[str, tuple[float, list[BrowseItem]]] = {}
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self.SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM watchlist").fetchone()[0]
+
+    def add(self, entries: list[WatchEntry], max_entries: int) -> tuple[list[WatchEntry], int]:
+        """Same contract as MemoryWatchlistStore.add, atomic across processes."""
+        if not entries:
+            return [], 0
+        ids = list(dict.fromkeys(entry.id for entry in entries))
+        marks = ",".join("?" * len(ids))
+        with self._lock, self._transaction():
+            existing = {row[0] for row in self._conn.execute(f"SELECT id FROM watchlist WHERE id IN ({marks})", ids)}
+            new = {entry.id: entry for entry in entries if entry.id not in existing}
+            count = self._conn.execute("SELECT COUNT(*) FROM watchlist").fetchone()[0]
+            if count + len(new) > max_entries:
+                raise WatchlistFullError(f"Watchlist is limited to {max_entries} queries")
+            self._conn.executemany(
+                "INSERT INTO watchlist (id, query, interval, next_due) VALUES (?, ?, ?, ?)",
+                [
+                    (entry.id, json_codec.dumps(dataclasses.asdict(entry.query)).decode(), entry.interval, entry.next_due)
+                    for entry in new.values()
+                ],
+            )
+            rows = self._conn.execute(f"SELECT {self.COLUMNS} FROM watchlist WHERE id IN ({marks})", ids)
+            stored = {row[0]: self._entry(row) for row in rows}
+        return [stored[entry.id] for entry in entries], len(new)
+
+    def remove(self, entry_id: str) -> bool:
+        """Delete an entry, returning whether it existed."""
+        with self._lock:
+            self._decoded.pop(entry_id, None)
+            return self._conn.execute("DELETE FROM watchlist WHERE id = ?", (entry_id,)).rowcount > 0
+
+    def entries(self) -> list[WatchEntry]:
+        """All entries, soonest due first."""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {self.COLUMNS} FROM watchlist ORDER BY next_due").fetchall()
+        return [self._entry(row) for row in rows]
+
+    def intervals(self) -> list[float]:
+        """Refresh interval of every entry."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT interval FROM watchlist")]
+
+    def snapshot(self, entry_id: str, now: float, max_age: float | None) -> list[BrowseItem] | None:
+        """Same contract as MemoryWatchlistStore.snapshot."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT interval, refreshed_at FROM watchlist WHERE id = ? AND items IS NOT NULL", (entry_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            interval, refreshed_at = row
+            limit = interval if max_age is None else min(interval, max_age)
+            if now - refreshed_at > limit:
+                return None
+
+            decoded = self._decoded.get(entry_id)
+            if decoded is not None and decoded[0] == refreshed_at:
+                return decoded[1]
+            row = self._conn.execute(
+                "SELECT items, refreshed_at FROM watchlist WHERE id = ?", (entry_id,)
+            ).fetchone()
+            if row is None or row[0] is None:
+                return None
+            items = self._items(row[0])
+            if len(self._decoded) >= self.MAX_DECODED:
+                self._decoded.clear()
+            self._decoded[entry_id] = (row[1], items)
+            return items
+
+    def claim(self, now: float, limit: int) -> list[WatchEntry]:
+        """Lease up to limit due entries to this process, oldest first, and return them."""
+        if limit <= 0:
+            return []
+        with self._lock, self._transaction():
+            rows = self._conn.execute(
+                f"SELECT {self.COLUMNS} FROM watchlist"
+                " WHERE next_due <= ? AND (lease_until IS NULL OR lease_until <= ?)"
+                " ORDER BY next_due LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE watchlist SET lease_until = ? WHERE id = ?", [(now + self._lease, row[0]) for row in rows]
+            )
+        entries = [self._entry(row) for row in rows]
+        for entry in entries:
+            entry.refreshing = True
+        return entries
+
+    def postpone(self, now: float) -> int:
+        """Push every due, unclaimed entry back by its interval, returning how many were due."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE watchlist SET next_due = ? + interval"
+                " WHERE next_due <= ? AND (lease_until IS NULL OR lease_until <= ?)",
+                (now, now, now),
+            ).rowcount
+
+    def finish(self, entry: WatchEntry, changes: dict[str, Any]) -> None:
+        """Write a claimed entry's refresh outcome and release its lease (a removed entry stays removed)."""
+        for name, value in changes.items():
+            setattr(entry, name, value)
+        entry.refreshing = False
+        items = None
+        if entry.items is not None:
+            items = json_codec.dumps([item.to_dict() for item in entry.items]).decode()
+        stats = json_codec.dumps(entry.stats.to_dict()).decode() if entry.stats else None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE watchlist SET interval = ?, next_due = ?, items = ?, stats = ?, refreshed_at = ?,"
+                " refreshes = ?, failures = ?, last_error = ?, lease_until = NULL WHERE id = ?",
+                (
+                    entry.interval, entry.next_due, items, stats, entry.refreshed_at,
+                    entry.refreshes, entry.failures, entry.last_error, entry.id,
+                ),
+            )
+
+    def next_due(self, now: float) -> float | None:
+        """Earliest next_due among entries not leased to a refresh."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT MIN(next_due) FROM watchlist WHERE lease_until IS NULL OR lease_until <= ?", (now,)
+            ).fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run the block in a BEGIN IMMEDIATE transaction, rolled back if it raises (lock held)."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _items(data: str) -> list[BrowseItem]:
+        """Decode stored snapshot items."""
+        return [BrowseItem(**item) for item in json_codec.loads(data)]
+
+    @classmethod
+    def _entry(cls, row: tuple) -> WatchEntry:
+        """Build a WatchEntry from a watchlist row."""
+        entry_id, query, interval, next_due, items, stats, refreshed_at, refreshes, failures, last_error, lease = row
+        return WatchEntry(
+            entry_id,
+            BrowseSearchQuery(**json_codec.loads(query)),
+            interval,
+            next_due,
+            items=cls._items(items) if items is not None else None,
+            stats=PriceStats(**json_codec.loads(stats)) if stats else None,
+            refreshed_at=refreshed_at,
+            refreshes=refreshes,
+            failures=failures,
+            last_error=last_error,
+            refreshing=lease is not None,
+        )
+
+
+class Watchlist:
+    """
+    Registered Browse queries refreshed on an adaptive schedule.
+
+    A daemon scheduler thread starts with the first registration (or, with
+    a shared store that already has entries, on construction). It sleeps
+    until the earliest entry is due (or a refresh finishes and frees a
+    worker slot), then submits due entries to the executor, oldest first.
+    With a shared store it also wakes at least every ``min_interval``
+    seconds to pick up entries registered through other workers.
+    """
+
+    def __init__(
+        self,
+        search: Callable[[BrowseSearchQuery], list[BrowseItem]],
+        executor: FanOutExecutor,
+        quota: QuotaAccountant | None = None,
+        workers: int = 4,
+        min_interval: float = 60.0,
+        max_interval: float = 3600.0,
+        initial_interval: float = 300.0,
+        max_entries: int = 500,
+        change_threshold: float = 0.02,
+        max_snapshot_age: float | None = None,
+        store: MemoryWatchlistStore | SqliteWatchlistStore | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            search: Runs one query upstream, returning its items
+            executor: Executor refreshes run on
+            quota: Daily call budgets; refreshes wait while Browse is cache-only
+            workers: Most refreshes in flight at once
+            min_interval: Shortest refresh interval (seconds)
+            max_interval: Longest refresh interval (seconds)
+            initial_interval: Interval for newly registered queries (seconds)
+            max_entries: Most queries that can be watched
+            change_threshold: Relative median price change that counts as movement
+            max_snapshot_age: Longest a snapshot is served (seconds), whatever
+                its interval; None for no cap beyond the interval
+            store: Where entries are kept; in process memory if omitted
+            clock: Time source (epoch seconds)
+        """
+        self._search = search
+        self._executor = executor
+        self._quota = quota
+        self._workers = workers
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._initial_interval = min(max(initial_interval, min_interval), max_interval)
+        self._max_entries = max_entries
+        self._change_threshold = change_threshold
+        self._max_snapshot_age = max_snapshot_age
+        self._store = store if store is not None else MemoryWatchlistStore()
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._woken = False  # set by _wake; tells the scheduler its store read may be stale
+        self._in_flight = 0
+        self._refreshes = 0
+        self._failures = 0
+        self._quota_deferrals = 0
+        self._snapshot_hits = 0
+
+        if self._store.shared and len(self._store):
+            with self._lock:
+                self._start()
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Config,
+        search: Callable[[BrowseSearchQuery], list[BrowseItem]],
+        executor: FanOutExecutor,
+        quota: QuotaAccountant | None = None,
+    ) -> "Watchlist":
+        """
+        Build a watchlist with the configured cadence and limits.
+
+        Entries are shared by all workers when the rate-limit storage is a
+        SQLite file, and kept per process otherwise.
+        """
+        path = config.shared_state_path
+        return cls(
+            search,
+            executor,
+            quota=quota,
+            workers=config.watchlist_workers,
+            min_interval=config.watchlist_min_interval,
+            max_interval=config.watchlist_max_interval,
+            initial_interval=config.watchlist_initial_interval,
+            max_entries=config.watchlist_max_entries,
+            change_threshold=config.watchlist_change_threshold,
+            max_snapshot_age=config.search_cache_ttl,
+            store=SqliteWatchlistStore(path) if path else None,
+        )
+
+    def add(self, queries: list[BrowseSearchQuery]) -> list[WatchEntry]:
+        """
+        Watch queries, refreshing new ones as soon as a worker is free.
+
+        Already watched queries keep their entry and schedule.
+
+        Returns:
+            The entry for each query, in order
+
+        Raises:
+            WatchlistFullError: If the new queries do not fit; none are added
+        """
+        now = self._clock()
+        candidates = [WatchEntry(watch_id(query), query, self._initial_interval, now) for query in queries]
+        entries, added = self._store.add(candidates, self._max_entries)
+        if added:
+            with self._lock:
+                self._start()
+                self._wake()
+        return entries
+
+    def remove(self, entry_id: str) -> bool:
+        """Stop watching a query, returning whether it was watched."""
+        return self._store.remove(entry_id)
+
+    def entries(self) -> list[WatchEntry]:
+        """Watched entries, soonest due first."""
+        return self._store.entries()
+
+    def snapshot(self, query: BrowseSearchQuery) -> list[BrowseItem] | None:
+        """
+        Return the watched items for a query if its snapshot is fresh.
+
+        Returns:
+            The latest items, or None if the query is not watched or its
+            snapshot is missing or older than its refresh interval or the
+            maximum snapshot age
+        """
+        items = self._store.snapshot(watch_id(query), self._clock(), self._max_snapshot_age)
+        if items is not None:
+            with self._lock:
+                self._snapshot_hits += 1
+        return items
+
+    def run_due(self) -> int:
+        """
+        Submit refreshes for due entries, up to the free worker slots.
+
+        While the Browse quota is in cache-only mode, due entries are
+        postponed by their interval instead.
+
+        Returns:
+            Number of refreshes submitted
+        """
+        cache_only = self._quota is not None and self._quota.cache_only("browse")
+        now = self._clock()
+        if cache_only:
+            postponed = self._store.postpone(now)
+            with self._lock:
+                self._quota_deferrals += postponed
+            if postponed:
+                logger.info("Watchlist: quota low, postponed %d refreshes", postponed)
+            return 0
+
+        # Reserve the free slots first, so concurrent callers cannot overfill them
+        with self._lock:
+            slots = max(self._workers - self._in_flight, 0)
+            self._in_flight += slots
+        due = []
+        try:
+            due = self._store.claim(now, slots)
+        finally:
+            with self._lock:
+                self._in_flight -= slots - len(due)
+
+        for entry in due:
+            self._executor.submit(self._refresh, entry)
+        return len(due)
+
+    def metrics(self) -> dict[str, Any]:
+        """Return entry count and refresh counters for monitoring."""
+        intervals = self._store.intervals()
+        with self._lock:
+            return {
+                "entries": len(intervals),
+                "shared": self._store.shared,
+                "max_entries": self._max_entries,
+                "in_flight": self._in_flight,
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "quota_deferrals": self._quota_deferrals,
+                "snapshot_hits": self._snapshot_hits,
+                "min_interval": round(min(intervals), 1) if intervals else None,
+                "max_interval": round(max(intervals), 1) if intervals else None,
+            }
+
+    def close(self) -> None:
+        """
+        Stop the scheduler thread; refreshes already running finish.
+
+        Entries are kept, and the next registration starts the thread again.
+        """
+        with self._lock:
+            self._closed = True
+            self._wake()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._lock:
+            self._thread = None
+            self._closed = False
+
+    def _start(self) -> None:
+        """Start the scheduler thread if it is not running (lock held)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="watchlist-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        """Scheduler loop: submit due refreshes, then sleep until the next is due."""
+        while True:
+            try:
+                self.run_due()
+            except Exception:
+                logger.exception("Watchlist scheduling failed")
+            with self._lock:
+                self._woken = False
+            # Read the store (a SQLite query when shared) without holding the lock
+            now = self._clock()
+            next_due = self._store.next_due(now)
+            with self._lock:
+                if self._closed:
+                    return
+                # A wake-up since the read means it may already be stale; look again instead of sleeping
+                if not self._woken:
+                    self._wakeup.wait(self._seconds_until_due(now, next_due))
+                if self._closed:
+                    return
+
+    def _wake(self) -> None:
+        """Wake the scheduler to look for due entries again (lock held)."""
+        self._woken = True
+        self._wakeup.notify()
+
+    def _seconds_until_due(self, now: float, next_due: float | None) -> float | None:
+        """Seconds to sleep for next_due read at now, or None to wait for a wake-up (lock held)."""
+        # Other workers add entries to a shared store without waking this one
+        poll = self._min_interval if self._store.shared else None
+        if self._in_flight >= self._workers:
+            return poll
+        if next_due is None:
+            return poll
+        # A failed run_due must not spin; retry no sooner than a second later
+        return min(max(next_due - now, 0.0), poll or self._max_interval) or 1.0
+
+    def _refresh(self, entry: WatchEntry) -> None:
+        """Re-run one entry's query and store its snapshot."""
+        try:
+            items = self._search(entry.query)
+            error = None
+        except Exception as e:
+            items = None
+            error = e
+
+        now = self._clock()
+        interval = entry.interval
+        if error is None:
+            stats = calculate_price_stats(items, attr="total_price")
+            if entry.refreshed_at is not None:
+                interval = self._adapted_interval(interval, entry.stats, stats)
+            changes = {
+                "items": items,
+                "stats": stats,
+                "refreshed_at": now,
+                "refreshes": entry.refreshes + 1,
+                "last_error": None,
+            }
+        else:
+            changes = {"failures": entry.failures + 1, "last_error": str(error)}
+            logger.warning("Watchlist refresh failed: keywords=%s, error=%s", entry.query.keywords, error)
+        changes["interval"] = interval
+        changes["next_due"] = now + interval
+
+        try:
+            self._store.finish(entry, changes)
+        except Exception:
+            logger.exception("Watchlist: failed to store refresh of %s", entry.query.keywords)
+        with self._lock:
+            self._in_flight -= 1
+            if error is None:
+                self._refreshes += 1
+            else:
+                self._failures += 1
+            self._wake()
+
+    def _adapted_interval(self, interval: float, old: PriceStats | None, new: PriceStats | None) -> float:
+        """Shorten the interval when the median price moved, lengthen it when it did not."""
+        if old is None and new is None:
+            moved = False
+        elif old is None or new is None or old.median == 0:
+            moved = True
+        else:
+            moved = abs(new.median - old.median) / old.median > self._change_threshold
+
+        if moved:
+            return max(interval / 2, self._min_interval)
+        return min(interval * 1.5, self._max_interval)
@@ -129,3 +129,29 @@ def mock_ebay_empty_response():
             }]
         }]
     }
+
+
+@pytest.fixture
+def mock_browse_response():
+    """Mock response for eBay Browse API item_summary/search."""
+    return {
+        "total": 2,
+        "itemSummaries": [
+            {
+                "itemId": "v1|111|0",
+                "title": "Nintendo Switch OLED",
+                "price": {"value": "250.00", "currency": "GBP"},
+                "shippingOptions": [{"shippingCost": {"value": "4.99", "currency": "GBP"}}],
+                "image": {"imageUrl": "https://i.ebayimg.com/111.jpg"},
+                "itemWebUrl": "https://www.ebay.co.uk/itm/111",
+                "condition": "Used",
+            },
+            {
+                "itemId": "v1|222|0",
+                "title": "Nintendo Switch Lite",
+                "price": {"value": "150.00", "currency": "GBP"},
+                "itemWebUrl": "https://www.ebay.co.uk/itm/222",
+                "condition": "New",
+            },
+        ],
+    }
@@ -0,0 +1,164 @@
+"""Tests for the cross-API /api/compare endpoint."""
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.ebay_service import EbayApiError, EbayFindingService, EbayItem, SearchQuery
+
+
+def _active(item_id: str, price: float, shipping: float = 0.0) -> BrowseItem:
+    """Helper to create a BrowseItem."""
+    return BrowseItem("Switch", price, shipping, price + shipping, "GBP", item_id, "https://ebay.co.uk", "Used")
+
+
+def _sold(item_id: str, price: float, shipping: float | None = None) -> EbayItem:
+    """Helper to create a sold EbayItem."""
+    return EbayItem("Switch", price, "GBP", item_id, "https://ebay.co.uk", "Used", "FixedPrice",
+                    "2024-01-15T10:30:00.000Z", shipping)
+
+
+class TestFindingShipping:
+    """Tests for parsing Finding API shipping costs."""
+
+    def test_shipping_cost_parsed(self):
+        """Test a flat shipping cost is read from shippingInfo."""
+        item = EbayFindingService._parse_item({
+            "itemId": ["1"],
+            "sellingStatus": [{"currentPrice": [{"@currencyId": "GBP", "__value__": "100.00"}]}],
+            "shippingInfo": [{"shippingServiceCost": [{"@currencyId": "GBP", "__value__": "4.50"}]}],
+        }, sold=True)
+
+        assert item.shipping_cost == 4.5
+
+    def test_shipping_cost_missing(self):
+        """Test shipping is None when eBay gives no flat cost."""
+        item = EbayFindingService._parse_item({
+            "itemId": ["1"],
+            "sellingStatus": [{"currentPrice": [{"@currencyId": "GBP", "__value__": "100.00"}]}],
+        }, sold=True)
+
+        assert item.shipping_cost is None
+
+
+class TestTotalMatches:
+    """Tests for remembering eBay's total match counts."""
+
+    def test_browse_total(self, mock_browse_response):
+        """Test the Browse total is remembered per query."""
+        config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+        service = EbayBrowseService(config, auth, executor=MagicMock())
+        service._make_request = MagicMock(return_value={**mock_browse_response, "total": 1234})
+        query = BrowseSearchQuery(keywords="switch")
+
+        assert service.total_matches(query) is None
+        service.search(query)
+
+        assert service.total_matches(query) == 1234
+        assert service.total_matches(BrowseSearchQuery(keywords="ps5")) is None
+
+    def test_finding_total_entries(self, mock_ebay_sold_response):
+        """Test the Finding totalEntries of page 1 is remembered per query."""
+        config = Config(ebay_app_id="app", ebay_cert_id=None, ebay_oauth_token=None)
+        service = EbayFindingService(config, executor=MagicMock())
+        data = {"findCompletedItemsResponse": [{
+            **mock_ebay_sold_response["findCompletedItemsResponse"][0],
+            "paginationOutput": [{"totalPages": ["9"], "totalEntries": ["850"]}],
+        }]}
+        service._make_api_request = MagicMock(return_value=data)
+        query = SearchQuery(keywords="switch", sold=True)
+
+        service.search(query)
+
+        assert service.total_matches(query) == 850
+        assert service.total_matches(SearchQuery(keywords="switch", sold=True, page=3)) == 850
+
+
+class TestApiCompare:
+    """Tests for /api/compare."""
+
+    @patch("app.ebay_service")
+    @patch("app.browse_service")
+    def test_compare_success(self, mock_browse, mock_finding, client):
+        """Test active and sold totals are compared and the market summarised."""
+        mock_browse.search.return_value = [_active("a1", 100.0, 10.0), _active("a2", 130.0)]
+        mock_finding.search.return_value = [_sold("s1", 90.0, 5.0), _sold("s2", 100.0), _sold("s3", 95.0, 10.0)]
+        mock_browse.total_matches.return_value = 600
+        mock_finding.total_matches.return_value = 400
+
+        response = client.get("/api/compare?q=switch&condition=used&max_price=500")
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert len(data["items"]) == 2
+        assert data["stats"]["average"] == 120.0
+        assert data["sold"]["stats"]["average"] == 100.0
+        assert data["sold"]["sample_count"] == 3
+        assert data["comparison"]["avg_price_difference"] == 20.0
+        assert data["comparison"]["recommendation"] == "overpriced"
+        assert data["market"] == {"active_count": 600, "sold_count": 400, "sell_through": 0.4}
+
+        sold_query = mock_finding.search.call_args.args[0]
+        assert sold_query.sold is True
+        assert sold_query.condition == "used"
+        assert sold_query.max_price == 500.0
+
+    @patch("app.ebay_service")
+    @patch("app.browse_service")
+    def test_sold_failure_degrades(self, mock_browse, mock_finding, client):
+        """Test a Finding API failure still returns active results."""
+        mock_browse.search.return_value = [_active("a1", 100.0)]
+        mock_browse.total_matches.return_value = 250
+        mock_finding.search.side_effect = EbayApiError("decommissioned")
+
+        response = client.get("/api/compare?q=switch")
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert len(data["items"]) == 1
+        assert data["sold"] is None
+        assert data["comparison"] is None
+        assert data["market"] == {"active_count": 250, "sold_count": None, "sell_through": None}
+
+    @patch("app.ebay_service")
+    @patch("app.browse_service")
+    def test_browse_failure(self, mock_browse, mock_finding, client):
+        """Test a Browse API failure returns 502."""
+        mock_browse.search.side_effect = BrowseApiError("boom")
+        mock_finding.search.return_value = []
+
+        response = client.get("/api/compare?q=switch")
+
+        assert response.status_code == 502
+
+    @patch("app.ebay_service")
+    @patch("app.browse_service")
+    def test_unknown_totals_drop_ratio(self, mock_browse, mock_finding, client):
+        """Test sell-through is null when an upstream total is unknown."""
+        mock_browse.search.return_value = [_active("a1", 100.0)]
+        mock_browse.total_matches.return_value = None
+        mock_finding.search.return_value = [_sold("s1", 90.0)]
+        mock_finding.total_matches.return_value = 40
+
+        data = client.get("/api/compare?q=switch").get_json()
+
+        assert data["market"] == {"active_count": None, "sold_count": 40, "sell_through": None}
+
+    @patch("app.browse_service", None)
+    def test_not_configured(self, client):
+        """Test 500 when the Browse API is not configured."""
+        response = client.get("/api/compare?q=switch")
+
+        assert response.status_code == 500
+
+    @patch("app.browse_service")
+    def test_missing_query(self, mock_browse, client):
+        """Test q is required."""
+        response = client.get("/api/compare")
+
+        assert response.status_code == 400
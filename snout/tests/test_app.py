@@ -66,6 +66,43 @@ class TestParseResults:
         results = service._parse_results(data, sold=False)
         assert results == []
 
+    def test_parse_missing_fields_default(self, service):
+        """Test missing wrapped fields fall back to their defaults."""
+        data = {
+            "findItemsByKeywordsResponse": [{
+                "ack": ["Success"],
+                "searchResult": [{"item": [
+                    {"itemId": ["1"], "sellingStatus": [{"currentPrice": [{"__value__": "10.5"}]}]},
+                ]}],
+            }]
+        }
+        item = service._parse_results(data, sold=False)[0]
+
+        assert (item.title, item.price, item.currency) == ("", 10.5, "USD")
+        assert (item.condition, item.listing_type, item.shipping_cost) == ("Unknown", "Unknown", None)
+
+    def test_malformed_item_skipped(self, service, mock_ebay_sold_response):
+        """Test a malformed item is skipped and the rest of the page kept."""
+        items = mock_ebay_sold_response["findCompletedItemsResponse"][0]["searchResult"][0]["item"]
+        items.insert(1, {"itemId": ["bad"], "sellingStatus": []})
+
+        results = service._parse_results(mock_ebay_sold_response, sold=True)
+
+        assert [r.item_id for r in results] == ["123456789", "987654321", "555555555"]
+
+    def test_item_to_dict(self):
+        """Test to_dict gives the response shape, with sold_date only when set."""
+        item = EbayItem("Switch", 100.0, "GBP", "1", "https://ebay.co.uk/1", "Used", "FixedPrice",
+                        shipping_cost=4.5)
+
+        assert item.to_dict() == {
+            "title": "Switch", "price": 100.0, "currency": "GBP", "item_id": "1",
+            "url": "https://ebay.co.uk/1", "condition": "Used", "listing_type": "FixedPrice",
+        }
+        item.sold_date = "2024-01-15T10:30:00.000Z"
+        assert item.to_dict()["sold_date"] == "2024-01-15T10:30:00.000Z"
+        assert not hasattr(item, "__dict__")
+
 
 class TestCalculatePriceStats:
     """Tests for calculate_price_stats function."""
@@ -393,6 +430,20 @@ class TestCompareEndpoint:
             "fair",
         ]
 
+    @patch("app.ebay_service")
+    @patch("app.config")
+    def test_compare_cache_bypass(self, mock_config, mock_service, client):
+        """Test cache=false reaches the sold/active search as use_cache=False."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_service.search_concurrent.return_value = ([], [])
+
+        client.get("/search/compare?q=switch")
+        client.get("/search/compare?q=switch&cache=false")
+
+        calls = mock_service.search_concurrent.call_args_list
+        assert [call.kwargs["use_cache"] for call in calls] == [True, False]
+
     def test_compare_missing_query(self, client):
         """Test compare returns error when query is missing."""
         response = client.get("/search/compare")
@@ -0,0 +1,413 @@
+"""Tests for the async eBay clients and ASGI entry point."""
+import asyncio
+import json
+import threading
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgi import SnoutASGI
+from config import Config
+from services.async_services import AsyncEbayAuthService, AsyncEbayBrowseService
+from services.auth_service import FileTokenStore, MemoryTokenStore, TokenRecord
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery
+from services.fanout import DeadlineExceeded
+from services.resilience import CircuitOpenError, UpstreamGuard
+from services.search_cache import MemoryCacheBackend, SearchCache
+
+
+def _make_config(**overrides) -> Config:
+    """Helper to create a Config with test credentials."""
+    return Config(ebay_app_id="test_app_id", ebay_cert_id="test_cert_id", ebay_oauth_token=None, **overrides)
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    """Helper to create an AsyncClient backed by a request handler."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAsyncBrowseService:
+    """Tests for AsyncEbayBrowseService.search."""
+
+    def test_search_parses_items(self, mock_browse_response):
+        """Test results are parsed into BrowseItem objects."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok", "expires_in": 7200})
+            return httpx.Response(200, json=mock_browse_response)
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            service = AsyncEbayBrowseService(_make_config(), auth, client=client)
+            return await service.search(BrowseSearchQuery(keywords="switch", condition="used"))
+
+        items = asyncio.run(run())
+
+        assert len(items) == 2
+        assert isinstance(items[0], BrowseItem)
+        assert items[0].total_price == 254.99
+        assert calls[-1].headers["Authorization"] == "Bearer tok"
+        assert "conditionIds" in calls[-1].url.params["filter"]
+
+    def test_concurrent_identical_searches_coalesce(self, mock_browse_response):
+        """Test concurrent identical searches share one upstream request and one token fetch."""
+        counts = {"token": 0, "search": 0}
+
+        async def handler(request):
+            if "oauth2" in request.url.path:
+                counts["token"] += 1
+                return httpx.Response(200, json={"access_token": "tok", "expires_in": 7200})
+            counts["search"] += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=mock_browse_response)
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            service = AsyncEbayBrowseService(_make_config(), auth, client=client)
+            query = BrowseSearchQuery(keywords="switch")
+            return await asyncio.gather(*(service.search(query) for _ in range(10)))
+
+        results = asyncio.run(run())
+
+        assert all(len(items) == 2 for items in results)
+        assert counts == {"token": 1, "search": 1}
+
+    def test_http_error_raises_browse_error(self):
+        """Test upstream failures surface as BrowseApiError."""
+
+        def handler(request):
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok"})
+            return httpx.Response(503)
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            service = AsyncEbayBrowseService(_make_config(), auth, client=client)
+            await service.search(BrowseSearchQuery(keywords="switch"))
+
+        with pytest.raises(BrowseApiError):
+            asyncio.run(run())
+
+    def _deep_search(self, handler, **config):
+        """Helper to run a 600-item deep search against a handler, returning (error, seconds)."""
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            guard = UpstreamGuard("browse", attempts=1)
+            service = AsyncEbayBrowseService(_make_config(**config), auth, client=client, guard=guard)
+            await service.search_deep(BrowseSearchQuery(keywords="switch"), 600)
+
+        started = time.perf_counter()
+        try:
+            asyncio.run(run())
+        except Exception as e:
+            return e, time.perf_counter() - started
+        return None, time.perf_counter() - started
+
+    def test_deep_failure_cancels_other_pages(self):
+        """Test a failed page fails the deep search at once and cancels the pages still running."""
+        cancelled = []
+
+        async def handler(request):
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok"})
+            if request.url.params["offset"] == "0":
+                return httpx.Response(400)
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(request.url.params["offset"])
+                raise
+            return httpx.Response(200, json={"itemSummaries": []})
+
+        error, seconds = self._deep_search(handler)
+
+        assert isinstance(error, BrowseApiError)
+        assert seconds < 2
+        assert sorted(cancelled) == ["200", "400"]
+
+    def test_deep_deadline(self):
+        """Test pages still running at fanout_deadline raise DeadlineExceeded."""
+
+        async def handler(request):
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok"})
+            await asyncio.sleep(5)
+            return httpx.Response(200, json={"itemSummaries": []})
+
+        error, seconds = self._deep_search(handler, fanout_deadline=0.05)
+
+        assert isinstance(error, DeadlineExceeded)
+        assert seconds < 2
+
+    def test_cache_and_quota_off_event_loop(self, mock_browse_response):
+        """Test cache and quota reads and writes do not run on the event loop thread."""
+        threads = []
+
+        def recorded(fn):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return fn(*args)
+            return wrapper
+
+        cache = SearchCache(MemoryCacheBackend(), ttl=300)
+        cache.lookup = recorded(cache.lookup)
+        cache.set = recorded(cache.set)
+        quota = MagicMock()
+        quota.cache_only.side_effect = recorded(lambda api: False)
+        quota.spend.side_effect = recorded(lambda api: None)
+
+        def handler(request):
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok"})
+            return httpx.Response(200, json=mock_browse_response)
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            service = AsyncEbayBrowseService(_make_config(), auth, cache=cache, client=client, quota=quota)
+            await service.search(BrowseSearchQuery(keywords="switch"))
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        # cache_only, lookup, spend, set
+        assert len(threads) == 4
+        assert loop_thread not in threads
+
+    def test_transient_failure_retried(self, mock_browse_response):
+        """Test a 503 is retried through the guard before succeeding."""
+        statuses = [503, 200]
+
+        def handler(request):
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok"})
+            status = statuses.pop(0)
+            return httpx.Response(status, json=mock_browse_response if status == 200 else {})
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            guard = UpstreamGuard("browse", base_delay=0, max_delay=0)
+            service = AsyncEbayBrowseService(_make_config(), auth, client=client, guard=guard)
+            return await service.search(BrowseSearchQuery(keywords="switch")), guard
+
+        items, guard = asyncio.run(run())
+
+        assert len(items) == 2
+        assert guard.retries == 1
+
+    def test_shared_circuit_fails_fast(self):
+        """Test a circuit opened by the sync service stops async calls before they reach eBay."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"access_token": "tok"})
+
+        guard = UpstreamGuard("browse", failure_threshold=1, reset_timeout=60)
+        guard.breaker.record_failure()
+
+        async def run():
+            client = _mock_client(handler)
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            service = AsyncEbayBrowseService(_make_config(), auth, client=client, guard=guard)
+            await service.search(BrowseSearchQuery(keywords="switch"))
+
+        with pytest.raises(BrowseApiError) as exc_info:
+            asyncio.run(run())
+
+        assert isinstance(exc_info.value.__cause__, CircuitOpenError)
+        assert all("oauth2" in request.url.path for request in calls)
+
+
+class RecordingStore(MemoryTokenStore):
+    """Token store recording which threads load and save run on."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def load(self):
+        self.threads.append(threading.get_ident())
+        return super().load()
+
+    def save(self, record):
+        self.threads.append(threading.get_ident())
+        super().save(record)
+
+
+class TestAsyncAuthService:
+    """Tests for AsyncEbayAuthService."""
+
+    def test_store_io_off_event_loop(self):
+        """Test token store reads and writes do not run on the event loop thread."""
+        store = RecordingStore()
+
+        def handler(request):
+            return httpx.Response(200, json={"access_token": "tok", "expires_in": 7200})
+
+        async def run():
+            auth = AsyncEbayAuthService("app", "cert", client=_mock_client(handler), store=store)
+            return await auth.get_token(), threading.get_ident()
+
+        token, loop_thread = asyncio.run(run())
+
+        assert token == "tok"
+        assert len(store.threads) == 2
+        assert loop_thread not in store.threads
+
+    def test_processes_share_one_refresh(self, tmp_path):
+        """Test services sharing a file store refresh once, like separate workers."""
+        path = str(tmp_path / "token.json")
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"access_token": f"tok-{len(calls)}", "expires_in": 7200})
+
+        async def run():
+            services = [
+                AsyncEbayAuthService("app", "cert", client=_mock_client(handler), store=FileTokenStore(path))
+                for _ in range(3)
+            ]
+            return await asyncio.gather(*(service.get_token() for service in services))
+
+        tokens = asyncio.run(run())
+
+        assert tokens == ["tok-1"] * 3
+        assert len(calls) == 1
+
+    def test_early_refresh_in_background(self):
+        """Test a token past its refresh point is returned while a renewal runs."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"access_token": "new", "expires_in": 7200})
+
+        async def run():
+            auth = AsyncEbayAuthService("app", "cert", client=_mock_client(handler))
+            now = time.time()
+            auth._record = TokenRecord("old", expires_at=now + 600, refresh_at=now - 1)
+
+            first = await auth.get_token()
+            await auth._early_refresh
+            return first, await auth.get_token()
+
+        first, second = asyncio.run(run())
+
+        assert (first, second) == ("old", "new")
+        assert len(calls) == 1
+
+
+class TestAsgiApiSearch:
+    """Tests for the native /api/search route in the ASGI app."""
+
+    def _call(self, asgi_app, query_string: bytes) -> tuple[int, dict]:
+        """Helper to issue a GET /api/search and collect the response."""
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/search",
+            "query_string": query_string,
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+        }
+        asyncio.run(asgi_app(scope, receive, send))
+        self.headers = dict(messages[0]["headers"])
+        return messages[0]["status"], json.loads(messages[1]["body"])
+
+    def test_search_success(self, app):
+        """Test a search is served through the async Browse service."""
+        browse = AsyncMock()
+        browse.search.return_value = [
+            BrowseItem("Switch", 100.0, 5.0, 105.0, "GBP", "1", "https://ebay.co.uk/1", "Used"),
+        ]
+
+        status, body = self._call(SnoutASGI(app, browse), b"q=switch&limit=10")
+
+        assert status == 200
+        assert body["query"] == "switch"
+        assert body["stats"]["count"] == 1
+        assert body["pagination"]["limit"] == 10
+        assert browse.search.call_args.args[0].limit == 10
+
+    def test_missing_query(self, app):
+        """Test validation errors map to 400."""
+        status, body = self._call(SnoutASGI(app, AsyncMock()), b"")
+
+        assert status == 400
+        assert body["field"] == "q"
+
+    def test_open_circuit_returns_503(self, app):
+        """Test an open circuit maps to 503 with Retry-After, as in the Flask route."""
+        error = BrowseApiError("circuit open")
+        error.__cause__ = CircuitOpenError("browse", 12.3)
+        browse = AsyncMock()
+        browse.search.side_effect = error
+
+        status, body = self._call(SnoutASGI(app, browse), b"q=switch+oled")
+
+        assert status == 503
+        assert body == {"error": "eBay is temporarily unavailable", "retry_after": 13}
+        assert self.headers[b"retry-after"] == b"13"
+
+    def test_deadline_returns_504(self, app):
+        """Test a deep search past its deadline maps to 504, as in the Flask route."""
+        browse = AsyncMock()
+        browse.search_deep.side_effect = DeadlineExceeded("1 of 3 pages did not finish")
+
+        status, body = self._call(SnoutASGI(app, browse), b"q=switch&deep=600")
+
+        assert status == 504
+        assert body["error"] == "eBay searches timed out"
+
+    def test_rate_limit_off_event_loop(self, app):
+        """Test the limiter hit (a SQLite write with sqlite:// storage) does not run on the event loop thread."""
+        threads = []
+
+        def hit(*args):
+            threads.append(threading.get_ident())
+            return True
+
+        with patch("app.limiter.limiter.hit", side_effect=hit):
+            status, _ = self._call(SnoutASGI(app, None), b"q=switch")
+
+        assert status == 500
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_not_configured(self, app):
+        """Test a missing Browse service returns 500."""
+        status, body = self._call(SnoutASGI(app, None), b"q=switch")
+
+        assert status == 500
+        assert "not configured" in body["error"]
+
+    @patch("app.SNOUT_API_KEY", "secret")
+    def test_api_key_required(self, app):
+        """Test the API key check applies to the native route."""
+        status, _ = self._call(SnoutASGI(app, AsyncMock()), b"q=switch")
+        assert status == 401
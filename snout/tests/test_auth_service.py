@@ -0,0 +1,138 @@
+"""Tests for EbayAuthService token refresh."""
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.auth_service import (
+    AuthError,
+    EbayAuthService,
+    FileTokenStore,
+    MemoryTokenStore,
+    TokenRecord,
+)
+
+
+def _make_service(store=None, delay: float = 0, **kwargs) -> EbayAuthService:
+    """Helper to create an auth service whose token endpoint is mocked."""
+    service = EbayAuthService("app", "cert", store=store, proactive_refresh=False, **kwargs)
+    counter = {"n": 0}
+
+    def post(*args, **kw):
+        time.sleep(delay)
+        counter["n"] += 1
+        response = MagicMock()
+        response.json.return_value = {"access_token": f"token-{counter['n']}", "expires_in": 7200}
+        return response
+
+    service._session = MagicMock()
+    service._session.post.side_effect = post
+    return service
+
+
+class TestTokenRefresh:
+    """Tests for EbayAuthService.get_token."""
+
+    def test_token_cached(self):
+        """Test a valid token is reused without another refresh."""
+        service = _make_service()
+        assert service.get_token() == "token-1"
+        assert service.get_token() == "token-1"
+        assert service._session.post.call_count == 1
+
+    def test_concurrent_expiry_refreshes_once(self):
+        """Test many threads hitting an expired token trigger one refresh."""
+        service = _make_service(delay=0.05)
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(service.get_token())) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert service._session.post.call_count == 1
+        assert set(tokens) == {"token-1"}
+
+    def test_failure_raises_auth_error(self):
+        """Test endpoint failures surface as AuthError and are counted."""
+        service = _make_service()
+        service._session.post.side_effect = requests.ConnectionError("down")
+
+        with pytest.raises(AuthError):
+            service.get_token()
+        assert service.metrics()["refresh_failures"] == 1
+
+    def test_metrics(self):
+        """Test refresh count and latency are reported."""
+        service = _make_service()
+        service.get_token()
+
+        metrics = service.metrics()
+        assert metrics["refresh_count"] == 1
+        assert metrics["store"] == "memory"
+        assert metrics["token_expires_in"] > 7000
+
+
+class TestProactiveRefresh:
+    """Tests for background refresh before expiry."""
+
+    def test_refresh_fraction_sets_refresh_point(self):
+        """Test the refresh point lands at the configured share of the lifetime."""
+        record = EbayAuthService._read_token_response(
+            {"access_token": "t", "expires_in": 1000}, refresh_fraction=0.5
+        )
+        assert record.refresh_at == pytest.approx(record.expires_at - 500, abs=1)
+
+    def test_background_refresh_renews_due_token(self):
+        """Test a token past its refresh point is renewed while still valid."""
+        store = MemoryTokenStore()
+        now = time.time()
+        store.save(TokenRecord("old", expires_at=now + 600, refresh_at=now - 1))
+        service = _make_service(store=store)
+
+        assert service.get_token() == "old"
+        service._refresh_in_background()
+
+        assert service.get_token() == "token-1"
+        assert store.load().access_token == "token-1"
+
+    def test_timer_scheduled_on_refresh(self):
+        """Test a proactive refresh timer is armed after fetching a token."""
+        service = _make_service()
+        service._proactive_refresh = True
+        service.get_token()
+
+        assert service._timer is not None
+        service.close()
+
+
+class TestFileTokenStore:
+    """Tests for sharing tokens through FileTokenStore."""
+
+    def test_second_service_adopts_stored_token(self, tmp_path):
+        """Test a token refreshed by one worker is reused by another."""
+        path = str(tmp_path / "token.json")
+        first = _make_service(store=FileTokenStore(path))
+        second = _make_service(store=FileTokenStore(path))
+
+        assert first.get_token() == "token-1"
+        assert second.get_token() == "token-1"
+        assert second._session.post.call_count == 0
+
+    def test_file_permissions(self, tmp_path):
+        """Test the token file is readable by its owner only."""
+        path = tmp_path / "token.json"
+        FileTokenStore(str(path)).save(TokenRecord("t", 1.0, 1.0))
+        assert path.stat().st_mode & 0o777 == 0o600
+
+    def test_corrupt_file_ignored(self, tmp_path):
+        """Test an unreadable token file is treated as empty."""
+        path = tmp_path / "token.json"
+        path.write_text("not json")
+        assert FileTokenStore(str(path)).load() is None
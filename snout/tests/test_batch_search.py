@@ -0,0 +1,197 @@
+"""Tests for batch Browse searches."""
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.auth_service import AuthError
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.fanout import DeadlineExceeded, FanOutExecutor
+from services.rate_limit import QuotaExhaustedError
+from services.resilience import CircuitOpenError
+
+
+def _item(item_id: str, price: float = 10.0) -> BrowseItem:
+    """Helper to create a BrowseItem."""
+    return BrowseItem(f"Item {item_id}", price, 0.0, price, "GBP", item_id, f"https://ebay.co.uk/{item_id}", "Used")
+
+
+class TestSearchBatch:
+    """Tests for EbayBrowseService.search_batch."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a Browse service on a shared two-worker executor."""
+        config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None, batch_search_workers=2)
+        return EbayBrowseService(config, MagicMock(), executor=FanOutExecutor(max_workers=2))
+
+    def test_results_in_input_order(self, service):
+        """Test results line up with the queries."""
+        service.search = MagicMock(side_effect=lambda query, use_cache=True: [_item(query.keywords)])
+
+        results = service.search_batch([BrowseSearchQuery(keywords=k) for k in ("a", "b", "c")])
+
+        assert [r[0].item_id for r in results] == ["a", "b", "c"]
+
+    def test_failures_reported_per_query(self, service):
+        """Test a failed query returns its error without failing the others."""
+        def search(query, use_cache=True):
+            if query.keywords == "bad":
+                raise BrowseApiError("boom")
+            if query.keywords == "auth":
+                raise AuthError("denied")
+            return [_item(query.keywords)]
+
+        service.search = MagicMock(side_effect=search)
+
+        results = service.search_batch([BrowseSearchQuery(keywords=k) for k in ("ok", "bad", "auth")])
+
+        assert results[0][0].item_id == "ok"
+        assert isinstance(results[1], BrowseApiError)
+        assert isinstance(results[2], AuthError)
+
+    def test_concurrency_capped(self, service):
+        """Test concurrent batches together stay within the shared executor's workers."""
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def search(query, use_cache=True):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.01)
+            with lock:
+                running["now"] -= 1
+            return []
+
+        service.search = MagicMock(side_effect=search)
+
+        threads = [
+            threading.Thread(target=service.search_batch, args=([BrowseSearchQuery(keywords=str(i)) for i in range(6)],))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert service.search.call_count == 12
+        assert running["peak"] <= 2
+
+    def test_deadline_reports_unfinished_queries(self, service):
+        """Test queries still running at the deadline are reported as timed out."""
+        service._config.fanout_deadline = 0.05
+
+        def search(query, use_cache=True):
+            if query.keywords == "slow":
+                time.sleep(0.3)
+            return [_item(query.keywords)]
+
+        service.search = MagicMock(side_effect=search)
+
+        results = service.search_batch([BrowseSearchQuery(keywords=k) for k in ("fast", "slow")])
+
+        assert results[0][0].item_id == "fast"
+        assert isinstance(results[1], DeadlineExceeded)
+
+    def test_empty_batch(self, service):
+        """Test an empty batch returns no results."""
+        assert service.search_batch([]) == []
+
+
+class TestBatchEndpoint:
+    """Tests for POST /api/search/batch."""
+
+    @patch("app.browse_service")
+    def test_batch_success(self, mock_service, client):
+        """Test each query gets its own stats and items."""
+        mock_service.search_batch.return_value = [[_item("1", 100.0)], [_item("2", 50.0), _item("3", 70.0)]]
+
+        response = client.post("/api/search/batch", json={
+            "queries": [{"q": "switch", "condition": "used"}, {"q": "ps5", "max_price": 400, "uk_only": True}],
+        })
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["count"] == 2
+        assert data["succeeded"] == 2
+        assert data["results"][0]["query"] == "switch"
+        assert data["results"][1]["stats"]["count"] == 2
+        assert len(data["results"][1]["items"]) == 2
+
+        queries = mock_service.search_batch.call_args.args[0]
+        assert queries[0].condition == "used"
+        assert queries[1].max_price == 400.0
+        assert queries[1].uk_only is True
+
+    @patch("app.browse_service")
+    def test_batch_without_items(self, mock_service, client):
+        """Test include_items=false returns stats only."""
+        mock_service.search_batch.return_value = [[_item("1")]]
+
+        response = client.post("/api/search/batch", json={"queries": [{"q": "switch"}], "include_items": False})
+
+        result = response.get_json()["results"][0]
+        assert "items" not in result
+        assert result["stats"]["count"] == 1
+
+    @patch("app.browse_service")
+    def test_partial_failures(self, mock_service, client):
+        """Test invalid and failed queries are reported in place."""
+        mock_service.search_batch.return_value = [[_item("1")], BrowseApiError("boom")]
+
+        response = client.post("/api/search/batch", json={
+            "queries": [{"q": "switch"}, {"q": ""}, {"q": "ps5"}],
+        })
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["succeeded"] == 1
+        assert data["failed"] == 2
+        assert [r["status"] for r in data["results"]] == [200, 400, 502]
+        assert data["results"][1]["field"] == "q"
+        assert len(mock_service.search_batch.call_args.args[0]) == 2
+
+    @patch("app.browse_service")
+    def test_unavailable_reported_as_503(self, mock_service, client):
+        """Test open-circuit and exhausted-quota failures report 503 with retry_after."""
+        circuit = BrowseApiError("circuit")
+        circuit.__cause__ = CircuitOpenError("browse", 12.5)
+        quota = BrowseApiError("quota")
+        quota.__cause__ = QuotaExhaustedError("browse", 3600)
+        mock_service.search_batch.return_value = [circuit, quota]
+
+        response = client.post("/api/search/batch", json={"queries": [{"q": "switch"}, {"q": "ps5"}]})
+
+        results = response.get_json()["results"]
+        assert [r["status"] for r in results] == [503, 503]
+        assert [r["retry_after"] for r in results] == [13, 3600]
+        assert "quota" in results[1]["error"]
+
+    @patch("app.browse_service")
+    def test_missing_queries(self, mock_service, client):
+        """Test a body without queries is rejected."""
+        response = client.post("/api/search/batch", json={})
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "queries"
+
+    @patch("app.browse_service")
+    def test_too_many_queries(self, mock_service, client):
+        """Test batches over the configured maximum are rejected."""
+        response = client.post("/api/search/batch", json={"queries": [{"q": "x"}] * 101})
+
+        assert response.status_code == 400
+        mock_service.search_batch.assert_not_called()
+
+    @patch("app.browse_service", None)
+    def test_not_configured(self, client):
+        """Test 500 when the Browse API is not configured."""
+        response = client.post("/api/search/batch", json={"queries": [{"q": "switch"}]})
+
+        assert response.status_code == 500
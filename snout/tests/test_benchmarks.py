@@ -0,0 +1,73 @@
+"""Smoke tests for the offline benchmark suite."""
+import json
+from urllib.request import urlopen
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server
+from benchmarks.fixtures import browse_response, finding_response
+from benchmarks.run import compare_results, run_benchmarks
+from benchmarks.stub_server import BROWSE_PATH, StubEbayServer
+from services.ebay_browse_service import EbayBrowseService
+from services.ebay_service import EbayFindingService
+
+
+class TestFixtures:
+    """Tests for the generated eBay fixtures."""
+
+    def test_fixtures_parse(self):
+        """Test fixtures parse into the requested number of items."""
+        assert len(EbayBrowseService._parse_results(browse_response(50))) == 50
+        assert len(EbayFindingService._parse_results(finding_response(50, sold=True), True)) == 50
+        assert len(EbayFindingService._parse_results(finding_response(50, sold=False), False)) == 50
+
+    def test_fixtures_deterministic(self):
+        """Test the same seed produces identical fixtures."""
+        assert browse_response(20) == browse_response(20)
+        assert browse_response(20, seed=1) != browse_response(20)
+
+
+class TestStubServer:
+    """Tests for the local eBay stub."""
+
+    def test_browse_pages(self):
+        """Test Browse requests get the offset/limit slice of the fixture."""
+        stub = StubEbayServer().start()
+        try:
+            stub.size = 300
+            with urlopen(f"{stub.url}{BROWSE_PATH}?q=x&offset=200&limit=200") as response:
+                data = json.loads(response.read())
+        finally:
+            stub.stop()
+
+        assert data["total"] == 300
+        assert len(data["itemSummaries"]) == 100
+
+
+class TestRunBenchmarks:
+    """Tests for run_benchmarks."""
+
+    def test_suite_runs_offline(self):
+        """Test a tiny run covers every measurement and restores the app."""
+        browse_service = server.browse_service
+
+        results = run_benchmarks(sizes=(5,), iterations=2, concurrency=2)
+
+        size = results["sizes"]["5"]
+        assert set(size) == {"parse", "stats", "serialise", "page", "endpoints"}
+        assert set(size["endpoints"]) == {"/api/search", "/search/sold", "/api/compare"}
+        assert size["endpoints"]["/api/search"]["p99_ms"] >= size["endpoints"]["/api/search"]["p50_ms"]
+        assert size["endpoints"]["/api/search"]["throughput_rps"] > 0
+        assert server.browse_service is browse_service
+        assert server.limiter.enabled
+
+    def test_compare_results(self):
+        """Test p50 changes are reported against a baseline."""
+        baseline = {"sizes": {"50": {"parse": {"browse": {"p50_ms": 2.0}}}}}
+        current = {"sizes": {"50": {"parse": {"browse": {"p50_ms": 1.0}}}}}
+
+        (line,) = compare_results(baseline, current)
+
+        assert "-50.0%" in line
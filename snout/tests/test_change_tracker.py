@@ -0,0 +1,238 @@
+"""Tests for listing change detection between fetches."""
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.change_tracker import ChangeTracker, SnapshotDiff, SqliteChangeStore, diff_snapshots
+from services.ebay_browse_service import BrowseItem
+
+
+def _items(prices: dict[str, float]) -> list[BrowseItem]:
+    """Helper to create BrowseItems from item_id -> total price."""
+    return [
+        BrowseItem(f"Switch {item_id}", price, 0.0, price, "GBP", item_id, f"https://ebay.co.uk/itm/{item_id}", "Used")
+        for item_id, price in prices.items()
+    ]
+
+
+class TestDiffSnapshots:
+    """Tests for diff_snapshots."""
+
+    def test_added_removed_repriced(self):
+        """Test each kind of change is detected and unchanged items are not reported."""
+        diff = diff_snapshots({"a": 10.0, "b": 20.0, "c": 30.0}, {"a": 10.0, "b": 25.0, "d": 40.0})
+
+        assert diff.added == {"d": 40.0}
+        assert diff.removed == {"c": 30.0}
+        assert diff.repriced == {"b": (20.0, 25.0)}
+
+    def test_identical_is_empty(self):
+        """Test identical snapshots give a falsy diff."""
+        assert not diff_snapshots({"a": 1.0}, {"a": 1.0})
+        assert not SnapshotDiff()
+
+
+class TestChangeTracker:
+    """Tests for ChangeTracker."""
+
+    def test_first_fetch_resets(self):
+        """Test a fetch without a token asks the client to start from the full result."""
+        tracker = ChangeTracker()
+
+        diff, token = tracker.changes("k", _items({"a": 10.0}), None)
+
+        assert diff is None
+        assert token
+
+    def test_changes_since_token(self):
+        """Test a later fetch returns only what changed since the token."""
+        tracker = ChangeTracker()
+        _, token = tracker.changes("k", _items({"a": 10.0, "b": 20.0}), None)
+
+        diff, new_token = tracker.changes("k", _items({"a": 12.0, "c": 30.0}), token)
+
+        assert diff.added == {"c": 30.0}
+        assert diff.removed == {"b": 20.0}
+        assert diff.repriced == {"a": (10.0, 12.0)}
+        assert new_token != token
+
+    def test_unchanged_keeps_token(self):
+        """Test an identical fetch returns an empty diff and the same token."""
+        tracker = ChangeTracker()
+        _, token = tracker.changes("k", _items({"a": 10.0}), None)
+
+        diff, same = tracker.changes("k", _items({"a": 10.0}), token)
+
+        assert not diff
+        assert same == token
+
+    def test_changes_span_versions(self):
+        """Test a token several versions old gets the net change, not each step."""
+        tracker = ChangeTracker()
+        _, token = tracker.changes("k", _items({"a": 10.0, "b": 20.0}), None)
+        tracker.record("k", _items({"a": 11.0, "b": 20.0, "c": 5.0}))
+        tracker.record("k", _items({"a": 10.0, "c": 6.0}))
+        tracker.record("k", _items({"a": 10.0, "c": 6.0, "d": 7.0}))
+
+        diff, _ = tracker.changes("k", _items({"a": 10.0, "c": 6.0, "d": 7.0}), token)
+
+        assert diff.added == {"c": 6.0, "d": 7.0}
+        assert diff.removed == {"b": 20.0}
+        assert diff.repriced == {}
+
+    def test_token_beyond_history_resets(self):
+        """Test a token older than the retained diffs gets a reset."""
+        tracker = ChangeTracker(history=2)
+        _, token = tracker.changes("k", _items({"a": 1.0}), None)
+        for price in (2.0, 3.0, 4.0):
+            tracker.record("k", _items({"a": price}))
+
+        diff, _ = tracker.changes("k", _items({"a": 4.0}), token)
+
+        assert diff is None
+        assert tracker.metrics()["resets"] == 2
+
+    @pytest.mark.parametrize("since", ["garbage", "deadbeef-999", "-1", ""])
+    def test_unknown_tokens_reset(self, since):
+        """Test malformed, foreign and future tokens get a reset."""
+        tracker = ChangeTracker()
+        tracker.record("k", _items({"a": 1.0}))
+
+        diff, _ = tracker.changes("k", _items({"a": 1.0}), since)
+
+        assert diff is None
+
+    def test_tokens_scoped_to_query(self):
+        """Test a token from one query is not accepted for another."""
+        tracker = ChangeTracker()
+        _, token = tracker.changes("switch", _items({"a": 1.0}), None)
+
+        diff, _ = tracker.changes("ps5", _items({"b": 1.0}), token)
+
+        assert diff is None
+
+    def test_lru_bound(self):
+        """Test the least recently used query is dropped past the bound."""
+        tracker = ChangeTracker(max_queries=2)
+        _, token = tracker.changes("a", _items({"x": 1.0}), None)
+        tracker.record("b", _items({"x": 1.0}))
+        tracker.record("c", _items({"x": 1.0}))
+
+        diff, _ = tracker.changes("a", _items({"x": 1.0}), token)
+
+        assert diff is None
+        assert tracker.metrics()["queries"] == 2
+
+
+class TestSharedStore:
+    """Tests for change tracking shared by worker processes through SQLite."""
+
+    def _worker(self, path, max_queries: int = 1024, history: int = 32) -> ChangeTracker:
+        """Helper to build one worker's tracker on the shared file."""
+        return ChangeTracker(max_queries, history, store=SqliteChangeStore(str(path), max_queries, history))
+
+    def test_token_valid_on_other_worker(self, tmp_path):
+        """Test a token issued by one worker gets a delta from another."""
+        path = tmp_path / "shared.sqlite3"
+        first, second = self._worker(path), self._worker(path)
+        _, token = first.changes("k", _items({"a": 10.0, "b": 20.0}), None)
+
+        diff, new_token = second.changes("k", _items({"a": 12.0, "c": 30.0}), token)
+
+        assert diff.added == {"c": 30.0}
+        assert diff.removed == {"b": 20.0}
+        assert diff.repriced == {"a": (10.0, 12.0)}
+        assert first.changes("k", _items({"a": 12.0, "c": 30.0}), new_token) == (SnapshotDiff(), new_token)
+
+    def test_changes_survive_restart(self, tmp_path):
+        """Test versions recorded before a restart still answer since tokens after it."""
+        path = tmp_path / "shared.sqlite3"
+        before = self._worker(path)
+        _, token = before.changes("k", _items({"a": 10.0, "b": 20.0}), None)
+        before.record("k", _items({"a": 11.0, "b": 20.0, "c": 5.0}))
+        before.record("k", _items({"a": 10.0, "c": 6.0}))
+
+        diff, _ = self._worker(path).changes("k", _items({"a": 10.0, "c": 6.0}), token)
+
+        assert diff.added == {"c": 6.0}
+        assert diff.removed == {"b": 20.0}
+        assert diff.repriced == {}
+
+    def test_history_bound(self, tmp_path):
+        """Test diffs older than the history are dropped and their tokens reset."""
+        path = tmp_path / "shared.sqlite3"
+        tracker = self._worker(path, history=2)
+        _, token = tracker.changes("k", _items({"a": 1.0}), None)
+        for price in (2.0, 3.0, 4.0):
+            tracker.record("k", _items({"a": price}))
+
+        diff, _ = tracker.changes("k", _items({"a": 4.0}), token)
+
+        assert diff is None
+        assert tracker._store._conn.execute("SELECT COUNT(*) FROM change_diffs").fetchone()[0] == 2
+
+    def test_lru_bound(self, tmp_path):
+        """Test the least recently used query is dropped past the bound."""
+        tracker = self._worker(tmp_path / "shared.sqlite3", max_queries=2)
+        _, token = tracker.changes("a", _items({"x": 1.0}), None)
+        tracker.record("b", _items({"x": 1.0}))
+        tracker.record("c", _items({"x": 1.0}))
+
+        diff, _ = tracker.changes("a", _items({"x": 1.0}), token)
+
+        assert diff is None
+        assert tracker.metrics()["queries"] == 2
+
+    def test_from_config_uses_sqlite_rate_limit_storage(self, tmp_path):
+        """Test the tracker is shared when rate limits are stored in SQLite."""
+        path = tmp_path / "limits.sqlite3"
+
+        shared = ChangeTracker.from_config(Config("app", "cert", None, rate_limit_storage_uri=f"sqlite://{path}"))
+
+        assert shared.metrics()["shared"] is True
+        assert shared._store.path == str(path)
+        assert ChangeTracker.from_config(Config("app", "cert", None)).metrics()["shared"] is False
+
+
+class TestEndpoint:
+    """Tests for /api/search/changes."""
+
+    @pytest.fixture(autouse=True)
+    def tracker(self):
+        """Fresh tracker with rate limits off."""
+        tracker = ChangeTracker()
+        with patch("app.change_tracker", tracker), patch("app.limiter.enabled", False):
+            yield tracker
+
+    @patch("app.browse_service")
+    def test_reset_then_delta(self, mock_service, client):
+        """Test the first call lists everything and the next only the changes."""
+        mock_service.search.return_value = _items({"a": 10.0, "b": 20.0})
+        first = client.get("/api/search/changes?q=switch").get_json()
+
+        mock_service.search.return_value = _items({"a": 15.0, "c": 30.0})
+        second = client.get(f"/api/search/changes?q=switch&since={first['token']}").get_json()
+
+        assert first["reset"] is True
+        assert [item["item_id"] for item in first["added"]] == ["a", "b"]
+        assert second["reset"] is False
+        assert [item["item_id"] for item in second["added"]] == ["c"]
+        assert second["removed"] == ["b"]
+        assert second["price_changed"] == [
+            {"item_id": "a", "old_price": 10.0, "new_price": 15.0, "item": second["price_changed"][0]["item"]}
+        ]
+        assert second["price_changed"][0]["item"]["total_price"] == 15.0
+        assert second["count"] == 2
+
+    @patch("app.browse_service")
+    def test_requires_keywords(self, mock_service, client):
+        """Test the search params are validated like /api/search."""
+        assert client.get("/api/search/changes").status_code == 400
+
+    def test_index_lists_changes(self, client):
+        """Test the API index lists the changes endpoint."""
+        assert "/api/search/changes" in client.get("/").get_json()["endpoints"]
@@ -0,0 +1,124 @@
+"""Tests for deep (multi-page) Browse searches."""
+import pytest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+
+
+def _item(item_id: str, price: float = 10.0) -> BrowseItem:
+    """Helper to create a BrowseItem."""
+    return BrowseItem(f"Item {item_id}", price, 0.0, price, "GBP", item_id, f"https://ebay.co.uk/{item_id}", "Used")
+
+
+class TestPageQueries:
+    """Tests for splitting a deep request into pages."""
+
+    def test_pages_cover_target(self):
+        """Test a 1,000 item target becomes five 200-item pages."""
+        pages = EbayBrowseService._page_queries(BrowseSearchQuery(keywords="switch"), 1000)
+
+        assert [q.offset for q in pages] == [0, 200, 400, 600, 800]
+        assert all(q.limit == 200 for q in pages)
+
+    def test_last_page_trimmed(self):
+        """Test the final page only asks for the remainder."""
+        pages = EbayBrowseService._page_queries(BrowseSearchQuery(keywords="switch", offset=50), 250)
+
+        assert [(q.offset, q.limit) for q in pages] == [(50, 200), (250, 50)]
+
+    def test_result_window_respected(self):
+        """Test pages never extend past the Browse API result window."""
+        pages = EbayBrowseService._page_queries(BrowseSearchQuery(keywords="switch", offset=9900), 1000)
+
+        assert [(q.offset, q.limit) for q in pages] == [(9900, 100)]
+
+
+class TestSearchDeep:
+    """Tests for EbayBrowseService.search_deep."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a Browse service whose search() returns numbered pages."""
+        config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+        service = EbayBrowseService(config, MagicMock())
+        return service
+
+    def test_merges_and_deduplicates(self, service):
+        """Test pages are merged in order with repeated item_ids dropped."""
+        def search(query, use_cache=True):
+            # Each page repeats the last item of the previous page
+            start = max(query.offset - 1, 0)
+            return [_item(str(i)) for i in range(start, query.offset + query.limit)]
+
+        service.search = MagicMock(side_effect=search)
+        items = service.search_deep(BrowseSearchQuery(keywords="switch"), 600)
+
+        assert len(items) == 600
+        assert [i.item_id for i in items] == [str(i) for i in range(600)]
+        assert service.search.call_count == 3
+
+    def test_page_failure_raises(self, service):
+        """Test a failed page fails the deep search."""
+        def search(query, use_cache=True):
+            if query.offset == 200:
+                raise BrowseApiError("boom")
+            return [_item(str(query.offset))]
+
+        service.search = MagicMock(side_effect=search)
+
+        with pytest.raises(BrowseApiError):
+            service.search_deep(BrowseSearchQuery(keywords="switch"), 600)
+
+
+class TestIterPages:
+    """Tests for EbayBrowseService.iter_pages."""
+
+    def test_yields_every_page(self):
+        """Test each offset page is yielded once."""
+        config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+        service = EbayBrowseService(config, MagicMock())
+        service.search = MagicMock(side_effect=lambda q, use_cache=True: [_item(str(q.offset))])
+
+        pages = list(service.iter_pages(BrowseSearchQuery(keywords="switch"), 1000))
+
+        assert sorted(int(p[0].item_id) for p in pages) == [0, 200, 400, 600, 800]
+
+    def test_single_page_without_target(self):
+        """Test no target means one plain search."""
+        config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+        service = EbayBrowseService(config, MagicMock())
+        service.search = MagicMock(return_value=[_item("1")])
+
+        assert list(service.iter_pages(BrowseSearchQuery(keywords="switch"))) == [[_item("1")]]
+
+
+class TestApiSearchDeep:
+    """Tests for the deep parameter on /api/search."""
+
+    @patch("app.browse_service")
+    def test_deep_mode(self, mock_service, client):
+        """Test deep requests use search_deep and compute stats over all items."""
+        mock_service.search_deep.return_value = [_item(str(i), price=i + 1) for i in range(400)]
+
+        response = client.get("/api/search?q=switch&deep=400")
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["stats"]["count"] == 400
+        assert data["pagination"]["deep"] is True
+        assert data["pagination"]["returned"] == 400
+        mock_service.search.assert_not_called()
+
+    @patch("app.browse_service")
+    def test_deep_clamped(self, mock_service, client):
+        """Test the target is clamped to the configured maximum."""
+        mock_service.search_deep.return_value = []
+
+        client.get("/api/search?q=switch&deep=999999")
+
+        assert mock_service.search_deep.call_args.args[1] == 2000
@@ -0,0 +1,139 @@
+"""Tests for extended price statistics."""
+import random
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.price_analyzer as price_analyzer
+from services.ebay_browse_service import BrowseItem
+from services.ebay_service import EbayItem
+from services.price_analyzer import calculate_extended_stats
+
+numpy_available = price_analyzer.np is not None
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Run each test with the NumPy and pure-Python implementations."""
+    if request.param == "numpy" and not numpy_available:
+        pytest.skip("numpy not installed")
+    if request.param == "python":
+        monkeypatch.setattr(price_analyzer, "np", None)
+    return request.param
+
+
+class TestCalculateExtendedStats:
+    """Tests for calculate_extended_stats."""
+
+    def test_outliers_trimmed(self, backend):
+        """Test a spares listing and a placeholder price are trimmed."""
+        prices = [1.0, 95, 100, 100, 105, 110, 9999]
+        stats = calculate_extended_stats(prices)
+
+        assert stats.outliers_removed == 2
+        assert stats.trimmed_mean == 102.0
+        assert stats.trimmed_median == 100.0
+        assert sum(stats.histogram["counts"]) == 5
+        assert stats.histogram["bin_edges"][-1] == 110.0
+
+    def test_mad_trim(self, backend):
+        """Test the MAD rule also drops the extremes."""
+        stats = calculate_extended_stats([1.0, 95, 100, 100, 105, 110, 9999], trim="mad")
+
+        assert stats.trim_method == "mad"
+        assert stats.outliers_removed == 2
+
+    def test_mad_zero_keeps_all(self, backend):
+        """Test a mostly-constant list (MAD of 0) is not trimmed down to the constant."""
+        stats = calculate_extended_stats([100.0] * 6 + [95, 120], trim="mad")
+
+        assert stats.outliers_removed == 0
+        assert (stats.lower_fence, stats.upper_fence) == (95.0, 120.0)
+        assert stats.trimmed_mean == 101.88
+
+    def test_percentiles(self, backend):
+        """Test requested percentiles use linear interpolation."""
+        stats = calculate_extended_stats([10, 20, 30, 40, 50], percentiles=[10, 50, 90])
+
+        assert stats.percentiles == {"p10": 14.0, "p50": 30.0, "p90": 46.0}
+
+    def test_single_price(self, backend):
+        """Test a single price gives a one-value histogram."""
+        stats = calculate_extended_stats([42.0], bins=4)
+
+        assert stats.outliers_removed == 0
+        assert sum(stats.histogram["counts"]) == 1
+        assert len(stats.histogram["bin_edges"]) == 5
+
+    def test_empty(self, backend):
+        """Test no valid prices gives None."""
+        assert calculate_extended_stats([0, -1]) is None
+
+    def test_unknown_trim(self):
+        """Test an unknown trim method is rejected."""
+        with pytest.raises(ValueError):
+            calculate_extended_stats([1.0], trim="zscore")
+
+
+@pytest.mark.skipif(not numpy_available, reason="numpy not installed")
+def test_implementations_agree(monkeypatch):
+    """Test the NumPy and pure-Python paths agree on a large sample."""
+    rng = random.Random(7)
+    prices = [round(rng.lognormvariate(4, 0.8), 2) for _ in range(10000)]
+
+    fast = calculate_extended_stats(prices, bins=20)
+    monkeypatch.setattr(price_analyzer, "np", None)
+    slow = calculate_extended_stats(prices, bins=20)
+
+    assert fast.to_dict() == slow.to_dict()
+
+
+class TestExtendedStatsEndpoints:
+    """Tests for stats=extended on the API."""
+
+    @patch("app.browse_service")
+    def test_api_search_extended(self, mock_service, client):
+        """Test /api/search adds extended_stats when asked."""
+        mock_service.search.return_value = [
+            BrowseItem(f"Item {i}", p, 0.0, p, "GBP", str(i), "https://ebay.co.uk", "Used")
+            for i, p in enumerate([100.0, 110.0, 120.0])
+        ]
+
+        data = client.get("/api/search?q=switch&stats=extended&percentiles=50&bins=2").get_json()
+
+        assert data["extended_stats"]["percentiles"] == {"p50": 110.0}
+        assert len(data["extended_stats"]["histogram"]["counts"]) == 2
+
+    @patch("app.browse_service")
+    def test_api_search_default_has_no_extended(self, mock_service, client):
+        """Test extended stats are opt-in."""
+        mock_service.search.return_value = []
+
+        data = client.get("/api/search?q=switch").get_json()
+
+        assert "extended_stats" not in data
+
+    @patch("app.browse_service")
+    def test_invalid_percentiles(self, mock_service, client):
+        """Test out-of-range percentiles are rejected."""
+        response = client.get("/api/search?q=switch&stats=extended&percentiles=150")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "percentiles"
+
+    @patch("app.ebay_service")
+    @patch("app.config")
+    def test_compare_extended(self, mock_config, mock_service, client):
+        """Test /search/compare adds extended stats to both sides."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        item = EbayItem("Switch", 100.0, "GBP", "1", "https://ebay.co.uk/1", "Used", "FixedPrice")
+        mock_service.search_concurrent.return_value = ([item], [item])
+
+        data = client.get("/search/compare?q=switch&stats=extended").get_json()
+
+        assert data["sold"]["extended_stats"]["trimmed_mean"] == 100.0
+        assert data["active"]["extended_stats"]["trimmed_mean"] == 100.0
@@ -0,0 +1,187 @@
+"""Tests for the shared fan-out executor."""
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_service import EbayApiError, EbayFindingService, EbayItem, SearchQuery
+from services.fanout import DeadlineExceeded, FanOutExecutor
+
+
+@pytest.fixture
+def executor():
+    """Create a small executor and shut it down afterwards."""
+    pool = FanOutExecutor(max_workers=4)
+    yield pool
+    pool.shutdown()
+
+
+class TestFanOutExecutor:
+    """Tests for FanOutExecutor."""
+
+    def test_gather_preserves_order(self, executor):
+        """Test results come back in input order regardless of finish order."""
+        def work(n):
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        assert executor.gather(work, range(5)) == [0, 10, 20, 30, 40]
+
+    def test_limit_bounds_in_flight_calls(self, executor):
+        """Test a fan-out never has more than limit calls in flight."""
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def work(n):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.01)
+            with lock:
+                running["now"] -= 1
+            return n
+
+        executor.gather(work, range(8), limit=2)
+
+        assert running["peak"] == 2
+
+    def test_failure_cancels_siblings(self, executor):
+        """Test the first failure is raised and unstarted siblings never run."""
+        started = []
+
+        def work(n):
+            started.append(n)
+            if n == 0:
+                raise ValueError("boom")
+            time.sleep(0.01)
+            return n
+
+        with pytest.raises(ValueError):
+            executor.gather(work, range(10), limit=1)
+
+        assert started == [0]
+        assert executor.metrics()["failed"] == 1
+
+    def test_deadline(self, executor):
+        """Test a fan-out that runs past its deadline raises DeadlineExceeded."""
+        with pytest.raises(DeadlineExceeded):
+            executor.gather(lambda n: time.sleep(0.2), range(2), timeout=0.02)
+
+    def test_closing_as_completed_cancels_pending(self, executor):
+        """Test abandoning the iterator cancels calls not yet started."""
+        results = executor.as_completed(lambda n: time.sleep(0.01) or n, range(10), limit=2)
+        next(results)
+        results.close()
+
+        time.sleep(0.05)
+        metrics = executor.metrics()
+        assert metrics["submitted"] < 10
+        assert metrics["queued"] == 0
+
+    def test_metrics(self, executor):
+        """Test counters track submitted and completed calls."""
+        executor.gather(lambda n: n, range(3))
+
+        metrics = executor.metrics()
+        assert metrics["max_workers"] == 4
+        assert metrics["submitted"] == 3
+        assert metrics["completed"] == 3
+        assert metrics["active"] == 0
+        assert metrics["queued"] == 0
+
+    def test_queue_depth_tracked(self):
+        """Test calls waiting for a worker are counted as queued."""
+        pool = FanOutExecutor(max_workers=1)
+        release = threading.Event()
+        try:
+            pool.submit(release.wait)
+            pool.submit(lambda: None)
+            pool.submit(lambda: None)
+            time.sleep(0.02)
+
+            metrics = pool.metrics()
+            assert metrics["active"] == 1
+            assert metrics["queued"] == 2
+            assert metrics["peak_queued"] >= 2
+        finally:
+            release.set()
+            pool.shutdown()
+
+
+class TestSearchMany:
+    """Tests for EbayFindingService.search_many."""
+
+    def _item(self, item_id: str) -> EbayItem:
+        """Helper to create an EbayItem."""
+        return EbayItem("Switch", 100.0, "GBP", item_id, "https://ebay.co.uk", "Used", "FixedPrice")
+
+    def test_results_in_query_order(self, executor):
+        """Test each query's items are returned in order."""
+        service = EbayFindingService(Config(ebay_app_id="app", ebay_cert_id=None, ebay_oauth_token=None), executor=executor)
+        service.search = MagicMock(side_effect=lambda query, use_cache=True: [self._item(query.keywords)])
+
+        results = service.search_many([SearchQuery(keywords=k) for k in ("a", "b", "c")])
+
+        assert [items[0].item_id for items in results] == ["a", "b", "c"]
+
+    def test_failure_raises(self, executor):
+        """Test one failed search fails the fan-out."""
+        service = EbayFindingService(Config(ebay_app_id="app", ebay_cert_id=None, ebay_oauth_token=None), executor=executor)
+
+        def search(query, use_cache=True):
+            if query.sold:
+                raise EbayApiError("boom")
+            return []
+
+        service.search = MagicMock(side_effect=search)
+
+        with pytest.raises(EbayApiError):
+            service.search_concurrent(SearchQuery(keywords="a", sold=True), SearchQuery(keywords="a"))
+
+
+class TestCompareConditions:
+    """Tests for /search/compare with several conditions."""
+
+    @patch("app.config")
+    @patch("app.ebay_service")
+    def test_by_condition(self, mock_service, mock_config, client):
+        """Test every condition is compared in one concurrent fan-out."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+
+        def item(price):
+            return EbayItem("Switch", price, "GBP", str(price), "https://ebay.co.uk", "Used", "FixedPrice")
+
+        mock_service.search_many.return_value = [
+            [item(200.0)], [item(220.0)],  # all conditions
+            [item(150.0)], [item(180.0)],  # used
+            [item(300.0)], [item(290.0)],  # new
+        ]
+
+        response = client.get("/search/compare?q=switch&conditions=used,new")
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["sold"]["stats"]["average"] == 200.0
+        assert data["by_condition"]["used"]["active"]["stats"]["average"] == 180.0
+        assert data["by_condition"]["new"]["sold"]["stats"]["average"] == 300.0
+
+        queries = mock_service.search_many.call_args.args[0]
+        assert [(q.sold, q.condition) for q in queries] == [
+            (True, None), (False, None), (True, "used"), (False, "used"), (True, "new"), (False, "new"),
+        ]
+
+    def test_unknown_condition(self, client):
+        """Test an unknown condition is rejected."""
+        with patch("app.config") as mock_config:
+            mock_config.is_ebay_configured = True
+            mock_config.max_keyword_length = 1000
+            response = client.get("/search/compare?q=switch&conditions=used,mint")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "conditions"
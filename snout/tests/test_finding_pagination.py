@@ -0,0 +1,203 @@
+"""Tests for multi-page Finding API searches."""
+import threading
+import pytest
+from unittest.mock import patch
+from urllib.parse import parse_qs
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_service import EbayFindingService, EbayItem, SearchQuery
+from services.fanout import FanOutExecutor
+
+
+def _page(item_ids: list[str], total_pages: int | None) -> dict:
+    """Build a findCompletedItems response holding these items."""
+    response = {
+        "ack": ["Success"],
+        "searchResult": [{"item": [
+            {
+                "itemId": [item_id],
+                "title": [f"Switch {item_id}"],
+                "sellingStatus": [{"currentPrice": [{"@currencyId": "GBP", "__value__": "100.00"}]}],
+                "listingInfo": [{"listingType": ["FixedPrice"], "endTime": ["2024-01-15T10:30:00.000Z"]}],
+            }
+            for item_id in item_ids
+        ]}],
+    }
+    if total_pages is not None:
+        response["paginationOutput"] = [{"totalPages": [str(total_pages)]}]
+    return {"findCompletedItemsResponse": [response]}
+
+
+@pytest.fixture
+def service():
+    """Create a Finding service with two items per page and no cache."""
+    config = Config(ebay_app_id="app", ebay_cert_id=None, ebay_oauth_token=None, max_results_per_page=2)
+    pool = FanOutExecutor(max_workers=4)
+    yield EbayFindingService(config, executor=pool)
+    pool.shutdown()
+
+
+def _serve(service: EbayFindingService, pages: dict[int, dict]) -> list[int]:
+    """Answer API requests from canned pages, returning the list of requested page numbers."""
+    requested = []
+    lock = threading.Lock()
+
+    def make_request(query: SearchQuery) -> dict:
+        with lock:
+            requested.append(query.page)
+        return pages[query.page]
+
+    service._make_api_request = make_request
+    return requested
+
+
+class TestFindingPagination:
+    """Tests for EbayFindingService.search_many with a page budget."""
+
+    def test_single_page_by_default(self, service):
+        """Test one request is made without a page budget."""
+        requested = _serve(service, {1: _page(["a", "b"], total_pages=5)})
+
+        results = service.search_many([SearchQuery(keywords="switch", sold=True)])
+
+        assert [i.item_id for i in results[0]] == ["a", "b"]
+        assert requested == [1]
+
+    def test_stops_at_total_pages(self, service):
+        """Test pages beyond eBay's totalPages are never requested."""
+        requested = _serve(service, {
+            1: _page(["a", "b"], total_pages=3),
+            2: _page(["c", "d"], total_pages=3),
+            3: _page(["e", "f"], total_pages=3),
+        })
+
+        results = service.search_many([SearchQuery(keywords="switch", sold=True)], pages=10)
+
+        assert [i.item_id for i in results[0]] == ["a", "b", "c", "d", "e", "f"]
+        assert sorted(requested) == [1, 2, 3]
+
+    def test_respects_budget(self, service):
+        """Test no more pages than the budget are requested."""
+        requested = _serve(service, {p: _page([f"{p}a", f"{p}b"], total_pages=50) for p in range(1, 51)})
+
+        results = service.search_many([SearchQuery(keywords="switch", sold=True)], pages=4)
+
+        assert len(results[0]) == 8
+        assert sorted(requested) == [1, 2, 3, 4]
+
+    def test_short_first_page_fetches_nothing_more(self, service):
+        """Test a first page with fewer items than a full page ends the search."""
+        requested = _serve(service, {1: _page(["a"], total_pages=None)})
+
+        service.search_many([SearchQuery(keywords="switch", sold=True)], pages=5)
+
+        assert requested == [1]
+
+    def test_short_page_ends_search_without_total(self, service):
+        """Test pages after a short page are dropped when totalPages is unknown."""
+        requested = _serve(service, {
+            1: _page(["a", "b"], total_pages=None),
+            2: _page(["c"], total_pages=None),
+            3: _page([], total_pages=None),
+            4: _page([], total_pages=None),
+        })
+
+        results = service.search_many([SearchQuery(keywords="switch", sold=True)], pages=4)
+
+        assert [i.item_id for i in results[0]] == ["a", "b", "c"]
+        assert 1 in requested and 2 in requested
+
+    def test_duplicates_across_pages_removed(self, service):
+        """Test a listing that shifts onto the next page is counted once."""
+        _serve(service, {
+            1: _page(["a", "b"], total_pages=2),
+            2: _page(["b", "c"], total_pages=2),
+        })
+
+        results = service.search_many([SearchQuery(keywords="switch", sold=True)], pages=2)
+
+        assert [i.item_id for i in results[0]] == ["a", "b", "c"]
+
+    def test_per_query_budgets(self, service):
+        """Test each query gets its own budget, in one fan-out."""
+        requested = _serve(service, {
+            1: _page(["a", "b"], total_pages=3),
+            2: _page(["c", "d"], total_pages=3),
+            3: _page(["e", "f"], total_pages=3),
+        })
+
+        results = service.search_many(
+            [SearchQuery(keywords="switch", sold=True), SearchQuery(keywords="switch lite", sold=True)],
+            pages=[3, 1],
+        )
+
+        assert len(results[0]) == 6
+        assert len(results[1]) == 2
+        assert sorted(requested) == [1, 1, 2, 3]
+
+    def test_page_number_param(self):
+        """Test later pages send paginationInput.pageNumber."""
+        first = parse_qs(SearchQuery(keywords="switch").query_string)
+        third = parse_qs(SearchQuery(keywords="switch", page=3).query_string)
+
+        assert "paginationInput.pageNumber" not in first
+        assert third["paginationInput.pageNumber"] == ["3"]
+
+    def test_pages_cached_separately(self):
+        """Test each page has its own cache key."""
+        assert SearchQuery(keywords="switch").cache_key() != SearchQuery(keywords="switch", page=2).cache_key()
+
+
+class TestPagesParam:
+    """Tests for the pages param on the legacy Finding endpoints."""
+
+    def _item(self, item_id: str) -> EbayItem:
+        """Helper to create a sold EbayItem."""
+        return EbayItem("Switch", 100.0, "GBP", item_id, "https://ebay.co.uk", "Used", "FixedPrice",
+                        "2024-01-15T10:30:00.000Z")
+
+    @patch("app.config")
+    @patch("app.ebay_service")
+    def test_sold_pages(self, mock_service, mock_config, client):
+        """Test /search/sold passes the clamped page budget."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_config.finding_max_pages = 5
+        mock_service.search_many.return_value = [[self._item("a"), self._item("b")]]
+
+        response = client.get("/search/sold?q=switch&pages=20")
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["pages"] == 5
+        assert data["stats"]["count"] == 2
+        assert mock_service.search_many.call_args.kwargs["pages"] == 5
+
+    @patch("app.config")
+    def test_invalid_pages(self, mock_config, client):
+        """Test a non-positive page budget is rejected."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+
+        response = client.get("/search/sold?q=switch&pages=0")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "pages"
+
+    @patch("app.config")
+    @patch("app.ebay_service")
+    def test_compare_pages_sold_only(self, mock_service, mock_config, client):
+        """Test /search/compare applies the budget to sold searches only."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_config.finding_max_pages = 10
+        mock_service.search_many.return_value = [[self._item("a")], [self._item("b")]]
+
+        response = client.get("/search/compare?q=switch&pages=3")
+
+        assert response.status_code == 200
+        assert mock_service.search_many.call_args.kwargs["pages"] == [3, 1]
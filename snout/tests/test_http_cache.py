@@ -0,0 +1,243 @@
+"""Tests for ETags, Cache-Control and compression on search responses."""
+import asyncio
+import gzip
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgi import SnoutASGI
+from services.ebay_browse_service import BrowseItem
+from services.ebay_service import EbayItem
+from utils.http_cache import CachePolicy, cacheable_response, etag_matches, negotiate_encoding, strong_etag
+
+
+def _browse_items(count: int) -> list[BrowseItem]:
+    """Helper to create BrowseItems."""
+    return [
+        BrowseItem(f"Nintendo Switch {i}", 100.0 + i, 5.0, 105.0 + i, "GBP", f"v1|{i}|0",
+                   f"https://ebay.co.uk/itm/{i}", "Used")
+        for i in range(count)
+    ]
+
+
+class TestValidators:
+    """Tests for ETag generation and matching."""
+
+    def test_etag_is_stable_and_strong(self):
+        """Test identical bodies get identical quoted strong ETags."""
+        assert strong_etag(b'{"a":1}') == strong_etag(b'{"a":1}')
+        assert strong_etag(b'{"a":1}') != strong_etag(b'{"a":2}')
+        assert strong_etag(b"x").startswith('"') and not strong_etag(b"x").startswith("W/")
+
+    def test_if_none_match(self):
+        """Test list, weak, wildcard and content-coded validators match."""
+        etag = strong_etag(b"body")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches("*", etag)
+        assert etag_matches(etag, f'{etag[:-1]}-gzip"')
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+
+class TestNegotiation:
+    """Tests for Accept-Encoding negotiation."""
+
+    def test_gzip_accepted(self):
+        """Test gzip is chosen when offered and brotli is unavailable or not offered."""
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+
+    def test_refused_codings(self):
+        """Test q=0 and missing headers mean identity."""
+        assert negotiate_encoding("gzip;q=0") is None
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding(None) is None
+
+    @patch("utils.http_cache.brotli", None)
+    def test_no_brotli_falls_back_to_gzip(self):
+        """Test br is never chosen without the brotli package."""
+        assert negotiate_encoding("br, gzip") == "gzip"
+        assert negotiate_encoding("br") is None
+
+
+class TestCacheableResponse:
+    """Tests for cacheable_response."""
+
+    def test_headers(self):
+        """Test ETag, Cache-Control and Vary are set on a 200."""
+        status, body, headers = cacheable_response(b"{}", CachePolicy(60, 30), None, None)
+
+        assert status == 200
+        assert body == b"{}"
+        assert headers["ETag"] == strong_etag(b"{}")
+        assert headers["Cache-Control"] == "public, max-age=60, stale-while-revalidate=30"
+        assert headers["Vary"] == "Accept-Encoding"
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match gives an empty 304 with the same validators."""
+        status, body, headers = cacheable_response(b"{}", CachePolicy(60), strong_etag(b"{}"), None)
+
+        assert status == 304
+        assert body == b""
+        assert headers["ETag"] == strong_etag(b"{}")
+
+    def test_large_body_compressed(self):
+        """Test bodies above the threshold are gzipped with a coding-specific ETag."""
+        payload = json.dumps({"items": ["switch"] * 500}).encode()
+
+        status, body, headers = cacheable_response(payload, CachePolicy(60), None, "gzip", min_compress_size=1024)
+
+        assert status == 200
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["ETag"].endswith('-gzip"')
+        assert gzip.decompress(body) == payload
+        assert len(body) < len(payload)
+
+    def test_small_body_not_compressed(self):
+        """Test bodies below the threshold are sent as-is."""
+        _, body, headers = cacheable_response(b"{}", CachePolicy(60), None, "gzip", min_compress_size=1024)
+
+        assert body == b"{}"
+        assert "Content-Encoding" not in headers
+
+    def test_zero_max_age(self):
+        """Test a zero max-age asks caches to revalidate every time."""
+        assert CachePolicy(0).header() == "no-cache"
+
+
+class TestEndpoints:
+    """Tests for HTTP caching on the Flask search endpoints."""
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_api_search_etag_and_304(self, mock_service, mock_config, client):
+        """Test /api/search sends an ETag and answers a revalidation with 304."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_service.search.return_value = _browse_items(2)
+
+        first = client.get("/api/search?q=switch")
+        second = client.get("/api/search?q=switch", headers={"If-None-Match": first.headers["ETag"]})
+
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"].startswith("public, max-age=60")
+        assert "Accept-Encoding" in first.headers["Vary"]
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_api_search_gzip(self, mock_service, mock_config, client):
+        """Test a large /api/search body is gzipped when the client accepts it."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_service.search.return_value = _browse_items(50)
+
+        response = client.get("/api/search?q=switch", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.data))["stats"]["count"] == 50
+
+    @patch("app.config")
+    @patch("app.ebay_service")
+    def test_sold_has_longer_max_age(self, mock_service, mock_config, client):
+        """Test sold results may be cached longer than active ones."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_service.search.return_value = [
+            EbayItem("Switch", 100.0, "GBP", "1", "https://ebay.co.uk", "Used", "FixedPrice", "2024-01-15T10:30:00.000Z"),
+        ]
+
+        response = client.get("/search/sold?q=switch")
+
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"].startswith("public, max-age=900")
+
+    @patch("app.SNOUT_API_KEY", "secret")
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_varies_on_api_key(self, mock_service, mock_config, client):
+        """Test responses vary on the API key header when one is required."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_service.search.return_value = _browse_items(1)
+
+        response = client.get("/api/search?q=switch", headers={"X-Snout-Key": "secret"})
+
+        assert "X-Snout-Key" in response.headers["Vary"]
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_errors_not_cached(self, mock_service, mock_config, client):
+        """Test error responses carry no validators."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+
+        response = client.get("/api/search")
+
+        assert response.status_code == 400
+        assert "ETag" not in response.headers
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_streams_pass_through(self, mock_service, mock_config, client):
+        """Test streamed responses are not buffered for an ETag."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_service.search_pages.return_value = iter([_browse_items(1)])
+
+        response = client.get("/api/search?q=switch&stream=ndjson")
+
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+
+class TestAsgi:
+    """Tests for HTTP caching on the native ASGI /api/search route."""
+
+    def _call(self, asgi_app, headers: list[tuple[bytes, bytes]]) -> tuple[int, dict, bytes]:
+        """Helper to issue a GET /api/search, returning status, headers and body."""
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/search",
+            "query_string": b"q=switch",
+            "headers": headers,
+            "client": ("127.0.0.1", 1234),
+        }
+        asyncio.run(asgi_app(scope, receive, send))
+        return messages[0]["status"], dict(messages[0]["headers"]), messages[1]["body"]
+
+    @pytest.fixture
+    def asgi_app(self, app):
+        """ASGI app with a mocked async Browse service."""
+        browse = AsyncMock()
+        browse.search.return_value = _browse_items(2)
+        return SnoutASGI(app, browse)
+
+    def test_etag_and_304(self, asgi_app):
+        """Test the native route sends an ETag and honours If-None-Match."""
+        status, headers, _ = self._call(asgi_app, [])
+        etag = headers[b"etag"]
+
+        revalidated, _, body = self._call(asgi_app, [(b"if-none-match", etag)])
+
+        assert status == 200
+        assert headers[b"cache-control"].startswith(b"public, max-age=60")
+        assert revalidated == 304
+        assert body == b""
@@ -0,0 +1,120 @@
+"""Tests for the shared HTTP transport."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from unittest.mock import MagicMock
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from benchmarks.stub_server import FINDING_PATH, StubEbayServer
+from services.auth_service import EbayAuthService
+from services.ebay_browse_service import BrowseSearchQuery, EbayBrowseService
+from services.ebay_service import EbayFindingService
+from services.http_transport import HttpTransport, build_async_client
+
+
+def _config(**overrides) -> Config:
+    """Build a config with test credentials."""
+    return Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None, **overrides)
+
+
+@pytest.fixture
+def stub():
+    """Run a local stub eBay server."""
+    server = StubEbayServer().start()
+    yield server
+    server.stop()
+
+
+class TestHttpTransport:
+    """Tests for HttpTransport."""
+
+    def test_from_config(self):
+        """Test pool size, split timeouts and retries come from the config."""
+        transport = HttpTransport.from_config(
+            _config(http_pool_size=48, http_connect_timeout=2.5, request_timeout=20, http_connect_retries=3)
+        )
+        adapter = transport.session.get_adapter("https://api.ebay.com")
+
+        assert transport.timeout == (2.5, 20)
+        assert adapter._pool_maxsize == 48
+        assert adapter.max_retries.connect == 3
+        assert adapter.max_retries.read == 0
+        assert "gzip" in transport.session.headers["Accept-Encoding"]
+
+    def test_services_share_one_session(self):
+        """Test all three services use the injected transport's session."""
+        config = _config()
+        transport = HttpTransport.from_config(config)
+        auth = EbayAuthService("app", "cert", proactive_refresh=False, transport=transport)
+        browse = EbayBrowseService(config, auth, executor=MagicMock(), transport=transport)
+        finding = EbayFindingService(config, executor=MagicMock(), transport=transport)
+
+        assert auth._session is browse._session is finding._session is transport.session
+
+    def test_split_timeout_passed(self, mock_browse_response):
+        """Test requests get the (connect, read) timeout."""
+        import json
+
+        config = _config(http_connect_timeout=1.5, request_timeout=12)
+        service = EbayBrowseService(config, MagicMock(), executor=MagicMock())
+        service._session = MagicMock()
+        service._session.get.return_value.content = json.dumps(mock_browse_response).encode()
+
+        service._make_request(BrowseSearchQuery(keywords="switch"), "token")
+
+        assert service._session.get.call_args.kwargs["timeout"] == (1.5, 12)
+
+    def test_connections_reused(self, stub):
+        """Test sequential requests share one keep-alive connection."""
+        transport = HttpTransport()
+
+        for _ in range(10):
+            transport.session.get(stub.url + FINDING_PATH, timeout=transport.timeout).raise_for_status()
+
+        metrics = transport.metrics()
+        assert metrics["requests"] == 10
+        assert metrics["connections_opened"] == 1
+
+    def test_concurrent_requests_bounded_by_pool(self, stub):
+        """Test concurrent requests open no more connections than threads."""
+        transport = HttpTransport(pool_size=8)
+
+        def call(_):
+            transport.session.get(stub.url + FINDING_PATH, timeout=transport.timeout).raise_for_status()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(call, range(64)))
+
+        metrics = transport.metrics()
+        assert metrics["requests"] == 64
+        assert metrics["connections_opened"] <= 8
+
+
+class TestAsyncClient:
+    """Tests for build_async_client."""
+
+    def test_limits_and_timeouts(self):
+        """Test the async client uses the configured pool size and split timeouts."""
+        client = build_async_client(_config(http_pool_size=40, http_connect_timeout=2.0, request_timeout=25))
+        try:
+            pool = client._transport._pool
+            assert pool._max_connections == 40
+            assert client.timeout.connect == 2.0
+            assert client.timeout.read == 25
+        finally:
+            asyncio.run(client.aclose())
+
+
+class TestHealth:
+    """Tests for transport metrics on /health."""
+
+    def test_health_reports_transport(self, client):
+        """Test /health includes pool settings and connection counters."""
+        data = client.get("/health").get_json()
+
+        assert data["http"]["pool_size"] == 32
+        assert "connections_opened" in data["http"]
@@ -0,0 +1,193 @@
+"""Tests for JSON encoding: the codec, item dictionaries and response bodies."""
+import asyncio
+import dataclasses
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgi import SnoutASGI
+from config import Config
+from services.async_services import AsyncEbayAuthService, AsyncEbayBrowseService
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.ebay_service import EbayApiError, EbayFindingService, SearchQuery
+from services.resilience import UpstreamGuard
+from utils import json_codec
+
+DOC = {"b": [1, 2.5, None], "a": {"title": "Switch £200", "ok": True}}
+
+
+def _item(item_id: str = "v1|1|0", title: str = "Switch £200") -> BrowseItem:
+    """Helper to create a BrowseItem."""
+    return BrowseItem(title, 200.0, 4.99, 204.99, "GBP", item_id, f"https://ebay.co.uk/itm/{item_id}", "Used", None)
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def codec(request):
+    """json_codec on the orjson path and on the stdlib fallback."""
+    if request.param == "stdlib":
+        with patch("utils.json_codec.orjson", None):
+            yield request.param
+    elif json_codec.orjson is None:
+        pytest.skip("orjson not installed")
+    else:
+        yield request.param
+
+
+class TestCodec:
+    """Tests for json_codec on both encoders."""
+
+    def test_round_trip(self, codec):
+        """Test encoded documents decode to the original value."""
+        encoded = json_codec.dumps(DOC)
+
+        assert isinstance(encoded, bytes)
+        assert json_codec.loads(encoded) == DOC
+        assert json_codec.loads(encoded.decode()) == DOC
+
+    def test_compact_sorted_utf8(self, codec):
+        """Test output is compact, key-sorted and carries non-ASCII as UTF-8."""
+        encoded = json_codec.dumps(DOC, sort_keys=True)
+
+        assert encoded == '{"a":{"ok":true,"title":"Switch £200"},"b":[1,2.5,null]}'.encode()
+
+    def test_encoders_agree(self):
+        """Test the orjson and stdlib paths produce identical bytes."""
+        if json_codec.orjson is None:
+            pytest.skip("orjson not installed")
+        fast = json_codec.dumps(DOC, sort_keys=True)
+        with patch("utils.json_codec.orjson", None):
+            slow = json_codec.dumps(DOC, sort_keys=True)
+
+        assert fast == slow
+
+    def test_default_hook(self, codec):
+        """Test unsupported objects are passed to default."""
+        encoded = json_codec.dumps({"when": object()}, default=lambda obj: "custom")
+
+        assert json_codec.loads(encoded) == {"when": "custom"}
+
+
+class TestBrowseItemDict:
+    """Tests for BrowseItem.to_dict and parsing."""
+
+    @pytest.mark.parametrize("item", [_item(), dataclasses.replace(_item(), image_url="https://i.ebayimg.com/1.jpg")])
+    def test_to_dict_matches_asdict(self, item):
+        """Test the hand-written to_dict has the same keys, order and values as asdict."""
+        assert list(item.to_dict().items()) == list(dataclasses.asdict(item).items())
+
+    def test_malformed_item_skipped(self):
+        """Test a malformed item is dropped and the rest of the page still parses."""
+        data = {
+            "itemSummaries": [
+                {"itemId": "1", "title": "Good", "price": {"value": "10.00", "currency": "GBP"}},
+                {"itemId": "2", "title": "Bad", "price": {"value": "not a number"}},
+                {"itemId": "3", "title": "Good", "price": {"value": "12.50", "currency": "GBP"},
+                 "shippingOptions": [{"shippingCost": {"value": "2.00"}}]},
+            ]
+        }
+
+        items = EbayBrowseService._parse_results(data)
+
+        assert [item.item_id for item in items] == ["1", "3"]
+        assert items[1].total_price == 14.5
+
+
+class TestInvalidUpstreamBodies:
+    """Tests for eBay responses that are not JSON."""
+
+    def _config(self) -> Config:
+        """Helper to create a Config with test credentials."""
+        return Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+
+    def test_browse_raises_api_error(self):
+        """Test a non-JSON Browse body surfaces as BrowseApiError (a 502), not a bare ValueError."""
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+        service = EbayBrowseService(self._config(), auth, executor=MagicMock(), guard=UpstreamGuard("browse"))
+        service._session = MagicMock()
+        service._session.get.return_value.content = b"<html>Service Unavailable</html>"
+
+        with pytest.raises(BrowseApiError) as exc_info:
+            service.search(BrowseSearchQuery(keywords="switch"), use_cache=False)
+
+        assert isinstance(exc_info.value.__cause__, ValueError)
+
+    def test_finding_raises_api_error(self):
+        """Test a non-JSON Finding body surfaces as EbayApiError."""
+        service = EbayFindingService(self._config(), executor=MagicMock(), guard=UpstreamGuard("finding"))
+        service._session = MagicMock()
+        service._session.get.return_value.content = b"<html>Service Unavailable</html>"
+
+        with pytest.raises(EbayApiError) as exc_info:
+            service.search(SearchQuery(keywords="switch", sold=True), use_cache=False)
+
+        assert isinstance(exc_info.value.__cause__, ValueError)
+
+    def test_async_browse_raises_api_error(self):
+        """Test the async Browse client maps a non-JSON body to BrowseApiError."""
+
+        def handler(request):
+            if "oauth2" in request.url.path:
+                return httpx.Response(200, json={"access_token": "tok"})
+            return httpx.Response(200, content=b"<html>Service Unavailable</html>")
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            auth = AsyncEbayAuthService("app", "cert", client=client)
+            service = AsyncEbayBrowseService(self._config(), auth, client=client)
+            await service.search(BrowseSearchQuery(keywords="switch"))
+
+        with pytest.raises(BrowseApiError):
+            asyncio.run(run())
+
+
+class TestResponseBodies:
+    """Tests for JSON response bodies from the Flask provider and the ASGI route."""
+
+    def test_provider_body(self, app, codec):
+        """Test jsonify output is the compact sorted encoding plus a newline."""
+        with app.app_context():
+            from flask import jsonify
+
+            response = jsonify(DOC)
+
+        assert response.get_data() == json_codec.dumps(DOC, sort_keys=True) + b"\n"
+        assert response.mimetype == "application/json"
+
+    def test_flask_and_asgi_bodies_match(self, app):
+        """Test /api/search returns the same bytes and ETag through Flask and ASGI."""
+        items = [_item("v1|1|0"), _item("v1|2|0", title="Switch OLED — boxed")]
+        browse = AsyncMock()
+        browse.search.return_value = items
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/search",
+            "query_string": b"q=switch&marketplace=EBAY_GB",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+        }
+
+        with patch("app.browse_service") as mock_service, patch("app.limiter.enabled", False):
+            mock_service.search.return_value = items
+            flask_response = app.test_client().get("/api/search?q=switch&marketplace=EBAY_GB")
+            asyncio.run(SnoutASGI(app, browse)(scope, receive, send))
+
+        asgi_headers = dict(messages[0]["headers"])
+        assert flask_response.status_code == messages[0]["status"] == 200
+        assert flask_response.get_data() == messages[1]["body"]
+        assert flask_response.headers["ETag"] == asgi_headers[b"etag"].decode()
+        assert "Switch OLED — boxed" in flask_response.get_data(as_text=True)
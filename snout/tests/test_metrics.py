@@ -0,0 +1,248 @@
+"""Tests for Prometheus metrics and the /metrics endpoint."""
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+from werkzeug.exceptions import TooManyRequests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ebay_browse_service import BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.ebay_service import EbayFindingService
+from services.metrics import (
+    PARSE_ERRORS,
+    PARSE_SECONDS,
+    RATE_LIMITED,
+    REQUEST_SECONDS,
+    SERIALIZE_SECONDS,
+    STATS_SECONDS,
+    TOKEN_REFRESH_SECONDS,
+    UPSTREAM_SECONDS,
+    MetricsRegistry,
+    render_family,
+)
+from services.resilience import UpstreamGuard
+from services.search_cache import MemoryCacheBackend, SearchCache
+
+
+class TestHistogram:
+    """Tests for Histogram."""
+
+    def test_buckets_are_cumulative(self):
+        """Test rendered buckets count every sample at or below the bound."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("h_seconds", "Test.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        text = registry.render()
+
+        assert '# TYPE h_seconds histogram' in text
+        assert 'h_seconds_bucket{le="0.1"} 2' in text
+        assert 'h_seconds_bucket{le="1"} 3' in text
+        assert 'h_seconds_bucket{le="+Inf"} 4' in text
+        assert 'h_seconds_sum 2.65' in text
+        assert 'h_seconds_count 4' in text
+
+    def test_labels(self):
+        """Test each label set is its own series."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("h_seconds", "Test.", labels=("api",), buckets=(1.0,))
+        histogram.labels("browse").observe(0.5)
+        histogram.labels("finding").observe(0.5)
+        histogram.labels("finding").observe(0.5)
+
+        text = registry.render()
+
+        assert histogram.count("browse") == 1
+        assert histogram.count("finding") == 2
+        assert 'h_seconds_count{api="browse"} 1' in text
+        assert 'h_seconds_bucket{api="finding",le="1"} 2' in text
+
+    def test_wrong_label_count(self):
+        """Test label values must match the declared label names."""
+        histogram = MetricsRegistry().histogram("h_seconds", "Test.", labels=("api",))
+
+        with pytest.raises(ValueError):
+            histogram.labels("browse", "extra")
+
+    def test_time(self):
+        """Test the timer observes one sample."""
+        histogram = MetricsRegistry().histogram("h_seconds", "Test.")
+
+        with histogram.time():
+            pass
+
+        assert histogram.count() == 1
+
+    def test_concurrent_observations(self):
+        """Test no samples are lost across threads."""
+        histogram = MetricsRegistry().histogram("h_seconds", "Test.")
+
+        def work():
+            for _ in range(1000):
+                histogram.observe(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histogram.count() == 8000
+
+
+class TestCounter:
+    """Tests for Counter and registry rendering."""
+
+    def test_counter(self):
+        """Test counters accumulate and render with escaped labels."""
+        registry = MetricsRegistry()
+        counter = registry.counter("c_total", "Test.", labels=("name",))
+        counter.labels('say "hi"').inc()
+        counter.labels('say "hi"').inc(2)
+
+        assert counter.value('say "hi"') == 3
+        assert 'c_total{name="say \\"hi\\""} 3' in registry.render()
+
+    def test_duplicate_name(self):
+        """Test a metric name can only be registered once."""
+        registry = MetricsRegistry()
+        registry.counter("c_total", "Test.")
+
+        with pytest.raises(ValueError):
+            registry.counter("c_total", "Test.")
+
+    def test_render_family(self):
+        """Test precomputed samples render as a family."""
+        text = render_family("g", "gauge", "Test.", [({}, 3), ({"a": "b"}, 1.5)])
+
+        assert text == '# HELP g Test.\n# TYPE g gauge\ng 3\ng{a="b"} 1.5\n'
+
+
+class TestInstrumentation:
+    """Tests for the timings recorded by the services."""
+
+    def test_browse_parse_recorded(self, mock_browse_response):
+        """Test Browse parsing is timed and parse errors counted."""
+        parses = PARSE_SECONDS.count("browse")
+        errors = PARSE_ERRORS.value("browse")
+        data = dict(mock_browse_response)
+        data["itemSummaries"] = data["itemSummaries"] + [{"price": {"value": "not a number"}}]
+
+        items = EbayBrowseService._parse_results(data)
+
+        assert len(items) == 2
+        assert PARSE_SECONDS.count("browse") == parses + 1
+        assert PARSE_ERRORS.value("browse") == errors + 1
+
+    def test_finding_parse_recorded(self, mock_ebay_sold_response):
+        """Test Finding parsing is timed."""
+        parses = PARSE_SECONDS.count("finding")
+
+        EbayFindingService._parse_results(mock_ebay_sold_response, True)
+
+        assert PARSE_SECONDS.count("finding") == parses + 1
+
+    def test_browse_upstream_recorded(self, mock_browse_response):
+        """Test Browse requests are timed per API and operation."""
+        config = MagicMock(ebay_browse_api="https://example.invalid", request_timeout=5)
+        service = EbayBrowseService(config, MagicMock(), executor=MagicMock(), guard=UpstreamGuard("browse"))
+        response = MagicMock()
+        response.content = json.dumps(mock_browse_response).encode()
+        service._session = MagicMock()
+        service._session.get.return_value = response
+        before = UPSTREAM_SECONDS.count("browse", "item_summary_search")
+
+        service._make_request(BrowseSearchQuery(keywords="switch"), "token")
+
+        assert UPSTREAM_SECONDS.count("browse", "item_summary_search") == before + 1
+
+    def test_token_refresh_recorded(self):
+        """Test token refreshes are timed."""
+        from services.auth_service import EbayAuthService
+        from services.http_transport import HttpTransport
+
+        transport = HttpTransport()
+        transport.session = MagicMock()
+        transport.session.post.return_value.json.return_value = {"access_token": "t", "expires_in": 7200}
+        before = TOKEN_REFRESH_SECONDS.count()
+
+        service = EbayAuthService("app", "cert", proactive_refresh=False, transport=transport)
+        service.get_token()
+
+        assert TOKEN_REFRESH_SECONDS.count() == before + 1
+
+
+class TestMetricsEndpoint:
+    """Tests for /metrics and the request-level instrumentation."""
+
+    def test_exposition_format(self, client):
+        """Test /metrics serves Prometheus text with every metric family."""
+        response = client.get("/metrics")
+
+        text = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        for name in (
+            "snout_upstream_request_seconds",
+            "snout_token_refresh_seconds",
+            "snout_parse_seconds",
+            "snout_parse_errors_total",
+            "snout_stats_seconds",
+            "snout_serialize_seconds",
+            "snout_request_seconds",
+            "snout_rate_limited_total",
+            "snout_cache_lookups_total",
+            "snout_fanout_active",
+            "snout_fanout_queued",
+        ):
+            assert f"# TYPE {name} " in text
+
+    @patch("app.browse_service")
+    @patch("app.config")
+    def test_search_records_stages(self, mock_config, mock_browse, client):
+        """Test a search records request, stats and serialisation timings."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_browse.search.return_value = [
+            BrowseItem("Switch", 100.0, 0.0, 100.0, "GBP", "1", "https://ebay.co.uk", "Used"),
+        ]
+        requests = REQUEST_SECONDS.count("api_search", "GET", "200")
+        stats = STATS_SECONDS.count("basic")
+        serialised = SERIALIZE_SECONDS.count()
+
+        response = client.get("/api/search?q=switch")
+
+        assert response.status_code == 200
+        assert REQUEST_SECONDS.count("api_search", "GET", "200") == requests + 1
+        assert STATS_SECONDS.count("basic") == stats + 1
+        assert SERIALIZE_SECONDS.count() > serialised
+
+    @patch("app.browse_service")
+    def test_cache_counters(self, mock_browse, client):
+        """Test cache hits are read from the search cache at scrape time."""
+        cache = SearchCache(MemoryCacheBackend(), ttl=60)
+        cache.set("k", [])
+        cache.lookup("k")
+        cache.lookup("missing")
+        mock_browse.cache = cache
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        assert 'snout_cache_lookups_total{cache="browse",result="hit"} 1' in text
+        assert 'snout_cache_lookups_total{cache="browse",result="miss"} 1' in text
+
+    def test_rate_limit_counted(self, app):
+        """Test rate-limit rejections are counted by endpoint."""
+        from app import handle_rate_limit
+
+        before = RATE_LIMITED.value("api_search")
+        with app.test_request_context("/api/search?q=switch"):
+            _, status = handle_rate_limit(TooManyRequests("10 per 1 minute"))
+
+        assert status == 429
+        assert RATE_LIMITED.value("api_search") == before + 1
@@ -0,0 +1,102 @@
+"""Tests for the streaming PriceAccumulator."""
+import json
+import random
+import statistics
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.price_analyzer import PriceAccumulator
+
+
+def _prices(n: int, seed: int = 1) -> list[float]:
+    """Helper to create reproducible, skewed price samples."""
+    rng = random.Random(seed)
+    return [round(rng.lognormvariate(4, 0.6), 2) for _ in range(n)]
+
+
+class TestExactMode:
+    """Tests for small samples, where results must match the statistics module."""
+
+    def test_matches_statistics_module(self):
+        """Test mean, median, stdev, min and max against statistics."""
+        prices = _prices(500)
+        acc = PriceAccumulator.from_prices(prices)
+
+        assert acc.count == 500
+        assert acc.mean == pytest.approx(statistics.mean(prices))
+        assert acc.median == pytest.approx(statistics.median(prices))
+        assert acc.std_dev == pytest.approx(statistics.stdev(prices))
+        assert acc.min == min(prices)
+        assert acc.max == max(prices)
+
+    def test_even_count_median_interpolates(self):
+        """Test the median of an even count averages the middle pair."""
+        acc = PriceAccumulator.from_prices([10, 20, 30, 40])
+        assert acc.median == 25
+        assert acc.quantile(0) == 10
+        assert acc.quantile(1) == 40
+
+    def test_non_positive_ignored(self):
+        """Test zero and negative prices are skipped."""
+        acc = PriceAccumulator.from_prices([0, -5, 100])
+        assert acc.count == 1
+        assert acc.to_stats().std_dev == 0
+
+    def test_empty(self):
+        """Test an empty accumulator has no stats."""
+        assert PriceAccumulator().to_stats() is None
+
+
+class TestSketchMode:
+    """Tests for large samples summarised by the quantile sketch."""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test sketch quantiles stay within 1% of the exact values."""
+        prices = _prices(10000)
+        acc = PriceAccumulator.from_prices(prices)
+        exact = sorted(prices)
+
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            true_value = exact[round(q * (len(exact) - 1))]
+            assert acc.quantile(q) == pytest.approx(true_value, rel=0.02)
+
+        assert acc.mean == pytest.approx(statistics.mean(prices))
+        assert acc.std_dev == pytest.approx(statistics.stdev(prices))
+
+
+class TestMergeAndSerialise:
+    """Tests for combining and serialising accumulators."""
+
+    @pytest.mark.parametrize("sizes", [(100, 200), (1000, 1000), (5000, 10)])
+    def test_merge_equals_single_pass(self, sizes):
+        """Test merging shards gives the same moments as one pass."""
+        prices = _prices(sum(sizes))
+        left = PriceAccumulator.from_prices(prices[:sizes[0]])
+        right = PriceAccumulator.from_prices(prices[sizes[0]:])
+        whole = PriceAccumulator.from_prices(prices)
+
+        left.merge(right)
+
+        assert left.count == whole.count
+        assert left.mean == pytest.approx(whole.mean)
+        assert left.std_dev == pytest.approx(whole.std_dev)
+        assert left.min == whole.min
+        assert left.max == whole.max
+        assert left.median == pytest.approx(whole.median, rel=0.02)
+
+    def test_merge_into_empty(self):
+        """Test merging into an empty accumulator copies the other."""
+        acc = PriceAccumulator()
+        acc.merge(PriceAccumulator.from_prices([1, 2, 3]))
+        assert acc.to_stats() == PriceAccumulator.from_prices([1, 2, 3]).to_stats()
+
+    @pytest.mark.parametrize("n", [10, 5000])
+    def test_round_trip(self, n):
+        """Test to_dict/from_dict survives JSON in both modes."""
+        acc = PriceAccumulator.from_prices(_prices(n))
+        restored = PriceAccumulator.from_dict(json.loads(json.dumps(acc.to_dict())))
+
+        assert restored.to_stats() == acc.to_stats()
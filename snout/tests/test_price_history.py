@@ -0,0 +1,318 @@
+"""Tests for the local price history store and /api/history endpoint."""
+import sqlite3
+import time
+from datetime import date
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ebay_browse_service import BrowseItem
+from services.ebay_service import EbayItem
+from services.price_history import PriceHistoryStore
+
+
+def _sold_item(item_id: str, price: float, sold_date: str | None = None) -> EbayItem:
+    """Helper to create a sold EbayItem."""
+    return EbayItem(
+        title=f"Switch {item_id}",
+        price=price,
+        currency="GBP",
+        item_id=item_id,
+        url=f"https://ebay.co.uk/itm/{item_id}",
+        condition="Used",
+        listing_type="FixedPrice",
+        sold_date=sold_date,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a price history store in a temporary directory."""
+    history = PriceHistoryStore(str(tmp_path / "history.sqlite3"))
+    yield history
+    history.close()
+
+
+class TestPriceHistoryStore:
+    """Tests for PriceHistoryStore."""
+
+    def test_record_and_query(self, store):
+        """Test recorded items are returned newest first."""
+        store.record("sold", "Nintendo Switch", [
+            _sold_item("1", 200.0, "2024-01-14T08:00:00.000Z"),
+            _sold_item("2", 250.0, "2024-01-15T10:30:00.000Z"),
+        ])
+        store.flush()
+
+        rows = store.query("nintendo  switch", "sold")
+
+        assert [r["item_id"] for r in rows] == ["2", "1"]
+        assert rows[0]["price"] == 250.0
+        assert rows[0]["event_at"] == "2024-01-15T10:30:00Z"
+
+    def test_deduplicates_by_item_id(self, store):
+        """Test a repeat sighting updates the price instead of adding a row."""
+        store.record("sold", "switch", [_sold_item("1", 200.0)])
+        store.record("sold", "switch", [_sold_item("1", 210.0)])
+        store.flush()
+
+        rows = store.query("switch", "sold")
+
+        assert len(rows) == 1
+        assert rows[0]["price"] == 210.0
+
+    def test_item_linked_to_every_keyword(self, store):
+        """Test one listing seen under two searches is found by both."""
+        store.record("sold", "switch", [_sold_item("1", 200.0)])
+        store.record("sold", "switch oled", [_sold_item("1", 200.0)])
+        store.flush()
+
+        assert len(store.query("switch", "sold")) == 1
+        assert len(store.query("switch oled", "sold")) == 1
+
+    def test_kinds_are_separate(self, store):
+        """Test sold and active observations don't mix."""
+        store.record("sold", "switch", [_sold_item("1", 200.0)])
+        store.record("active", "switch", [
+            BrowseItem("Switch", 100.0, 5.0, 105.0, "GBP", "2", "https://ebay.co.uk/2", "Used"),
+        ])
+        store.flush()
+
+        active = store.query("switch", "active")
+
+        assert [r["item_id"] for r in active] == ["2"]
+        assert active[0]["price"] == 105.0
+
+    def test_since_filter(self, store):
+        """Test the since filter applies to the sale time."""
+        store.record("sold", "switch", [
+            _sold_item("old", 100.0, "2020-01-01T00:00:00.000Z"),
+            _sold_item("new", 200.0),
+        ])
+        store.flush()
+
+        rows = store.query("switch", "sold", since=time.time() - 86400)
+
+        assert [r["item_id"] for r in rows] == ["new"]
+
+    def test_stats(self, store):
+        """Test stats cover every matching listing."""
+        store.record("sold", "switch", [_sold_item(str(i), float(p)) for i, p in enumerate([100, 200, 300])])
+        store.flush()
+
+        stats = store.stats("switch", "sold")
+
+        assert stats.count == 3
+        assert stats.average == 200.0
+        assert stats.median == 200.0
+
+    def test_stats_no_history(self, store):
+        """Test stats are None when nothing has been recorded."""
+        assert store.stats("nothing", "sold") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test history survives reopening the database."""
+        path = str(tmp_path / "history.sqlite3")
+        first = PriceHistoryStore(path)
+        first.record("sold", "switch", [_sold_item("1", 200.0)])
+        first.close()
+
+        second = PriceHistoryStore(path)
+        try:
+            assert len(second.query("switch", "sold")) == 1
+        finally:
+            second.close()
+
+
+class TestTrendRollups:
+    """Tests for the incremental sold-price rollups behind trend()."""
+
+    def test_daily_buckets(self, store):
+        """Test sales are bucketed by UTC sale day."""
+        store.record("sold", "switch", [
+            _sold_item("1", 100.0, "2024-01-15T10:30:00.000Z"),
+            _sold_item("2", 200.0, "2024-01-15T23:59:00.000Z"),
+            _sold_item("3", 300.0, "2024-01-16T00:01:00.000Z"),
+        ])
+        store.flush()
+
+        trend = store.trend("switch", "day")
+
+        assert [(start, stats.count) for start, stats in trend] == [
+            (date(2024, 1, 15), 2),
+            (date(2024, 1, 16), 1),
+        ]
+        assert trend[0][1].average == 150.0
+
+    def test_weekly_buckets_start_monday(self, store):
+        """Test week buckets start on Monday."""
+        store.record("sold", "switch", [
+            _sold_item("1", 100.0, "2024-01-15T10:00:00.000Z"),  # Monday
+            _sold_item("2", 200.0, "2024-01-21T10:00:00.000Z"),  # Sunday
+            _sold_item("3", 300.0, "2024-01-22T10:00:00.000Z"),  # next Monday
+        ])
+        store.flush()
+
+        trend = store.trend("switch", "week")
+
+        assert [(start, stats.count) for start, stats in trend] == [
+            (date(2024, 1, 15), 2),
+            (date(2024, 1, 22), 1),
+        ]
+
+    def test_rollups_update_incrementally(self, store):
+        """Test later batches merge into existing buckets."""
+        store.record("sold", "switch", [_sold_item("1", 100.0, "2024-01-15T10:00:00.000Z")])
+        store.flush()
+        store.record("sold", "switch", [_sold_item("2", 300.0, "2024-01-15T12:00:00.000Z")])
+        store.flush()
+
+        (_, stats), = store.trend("switch", "day")
+
+        assert stats.count == 2
+        assert stats.average == 200.0
+
+    def test_repeat_sighting_not_double_counted(self, store):
+        """Test a sold listing seen again is not added to the rollup twice."""
+        item = _sold_item("1", 100.0, "2024-01-15T10:00:00.000Z")
+        store.record("sold", "switch", [item])
+        store.record("sold", "switch", [item])
+        store.flush()
+
+        (_, stats), = store.trend("switch", "day")
+
+        assert stats.count == 1
+
+    def test_active_listings_not_rolled_up(self, store):
+        """Test only sold listings feed the trend."""
+        store.record("active", "switch", [_sold_item("1", 100.0)])
+        store.flush()
+
+        assert store.trend("switch", "day") == []
+
+    def test_date_range(self, store):
+        """Test since/until select whole buckets."""
+        store.record("sold", "switch", [
+            _sold_item("1", 100.0, "2024-01-10T10:00:00.000Z"),
+            _sold_item("2", 200.0, "2024-01-17T10:00:00.000Z"),
+            _sold_item("3", 300.0, "2024-02-01T10:00:00.000Z"),
+        ])
+        store.flush()
+
+        days = store.trend("switch", "day", since=date(2024, 1, 11), until=date(2024, 1, 31))
+        weeks = store.trend("switch", "week", since=date(2024, 1, 11), until=date(2024, 1, 31))
+
+        assert [start for start, _ in days] == [date(2024, 1, 17)]
+        assert [start for start, _ in weeks] == [date(2024, 1, 8), date(2024, 1, 15), date(2024, 1, 29)]
+
+    def test_rollups_rebuilt_for_existing_history(self, tmp_path):
+        """Test rollups are built from observations recorded before rollups existed."""
+        path = str(tmp_path / "history.sqlite3")
+        first = PriceHistoryStore(path)
+        first.record("sold", "switch", [_sold_item("1", 100.0, "2024-01-15T10:00:00.000Z")])
+        first.close()
+        with sqlite3.connect(path) as conn:
+            conn.execute("DELETE FROM sold_rollups")
+
+        second = PriceHistoryStore(path)
+        try:
+            (start, stats), = second.trend("switch", "day")
+        finally:
+            second.close()
+
+        assert start == date(2024, 1, 15)
+        assert stats.count == 1
+
+
+class TestHistoryEndpoint:
+    """Tests for /api/history."""
+
+    def test_not_enabled(self, client):
+        """Test 500 when the history store is disabled."""
+        with patch("app.price_history", None):
+            response = client.get("/api/history?q=switch")
+
+        assert response.status_code == 500
+        assert "not enabled" in response.get_json()["error"]
+
+    def test_invalid_type(self, client, store):
+        """Test an unknown type is rejected."""
+        with patch("app.price_history", store):
+            response = client.get("/api/history?q=switch&type=pending")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "type"
+
+    def test_returns_history(self, client, store):
+        """Test recorded listings and stats are served locally."""
+        store.record("sold", "switch", [_sold_item("1", 200.0), _sold_item("2", 300.0)])
+        store.flush()
+
+        with patch("app.price_history", store):
+            response = client.get("/api/history?q=Switch&days=7")
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["type"] == "sold"
+        assert data["stats"]["count"] == 2
+        assert len(data["items"]) == 2
+
+    @patch("app.ebay_service")
+    def test_sold_search_is_recorded(self, mock_service, client, store):
+        """Test /search/sold results are written to the history store."""
+        mock_service.search.return_value = [_sold_item("1", 200.0)]
+
+        with patch("app.price_history", store), patch("app.config") as mock_config:
+            mock_config.is_ebay_configured = True
+            mock_config.max_keyword_length = 1000
+            client.get("/search/sold?q=switch")
+            store.flush()
+
+        assert store.query("switch", "sold")[0]["item_id"] == "1"
+
+
+class TestTrendEndpoint:
+    """Tests for /api/trend."""
+
+    def test_returns_buckets(self, client, store):
+        """Test daily buckets are returned for the requested range."""
+        store.record("sold", "switch", [
+            _sold_item("1", 100.0, "2024-01-15T10:00:00.000Z"),
+            _sold_item("2", 200.0, "2024-01-16T10:00:00.000Z"),
+        ])
+        store.flush()
+
+        with patch("app.price_history", store):
+            response = client.get("/api/trend?q=switch&since=2024-01-01&until=2024-01-31")
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data["interval"] == "day"
+        assert [b["start"] for b in data["buckets"]] == ["2024-01-15", "2024-01-16"]
+        assert data["buckets"][1]["stats"]["average"] == 200.0
+
+    def test_invalid_interval(self, client, store):
+        """Test an unknown interval is rejected."""
+        with patch("app.price_history", store):
+            response = client.get("/api/trend?q=switch&interval=month")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "interval"
+
+    def test_invalid_date(self, client, store):
+        """Test a malformed date is rejected."""
+        with patch("app.price_history", store):
+            response = client.get("/api/trend?q=switch&since=15/01/2024")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "since"
+
+    def test_since_after_until(self, client, store):
+        """Test an inverted range is rejected."""
+        with patch("app.price_history", store):
+            response = client.get("/api/trend?q=switch&since=2024-02-01&until=2024-01-01")
+
+        assert response.status_code == 400
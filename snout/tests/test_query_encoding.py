@@ -0,0 +1,176 @@
+"""Tests for immutable, pre-encoded search queries."""
+import dataclasses
+import pytest
+from urllib.parse import parse_qs, urlsplit
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import BROWSE_BUYING_OPTIONS_MAP, BROWSE_CONDITION_MAP, BROWSE_SORT_MAP, CONDITION_MAP, SORT_MAP, Config
+from services.ebay_browse_service import BrowseSearchQuery
+from services.ebay_service import EbayFindingService, SearchQuery
+
+ENDPOINT = "https://api.ebay.com/buy/browse/v1/item_summary/search"
+
+
+def _decoded(url: str) -> dict[str, str]:
+    """Decode a URL's query string into single-valued params."""
+    return {name: values[0] for name, values in parse_qs(urlsplit(url).query, keep_blank_values=True).items()}
+
+
+class TestBrowseQuery:
+    """Tests for BrowseSearchQuery normalisation and encoding."""
+
+    def test_immutable_and_hashable(self):
+        """Test queries cannot be modified and can be used as dict keys."""
+        query = BrowseSearchQuery(keywords="switch")
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            query.limit = 10
+        assert {query: 1}[BrowseSearchQuery(keywords="switch")] == 1
+
+    def test_equivalent_queries_equal(self):
+        """Test queries producing the same request are equal and share a key."""
+        a = BrowseSearchQuery(keywords="switch", condition="USED", min_price=10, sort="Price_Asc")
+        b = BrowseSearchQuery(keywords="switch", condition="used", min_price=10.0, sort="price_asc")
+
+        assert a == b
+        assert hash(a) == hash(b)
+        assert a.url(ENDPOINT) == b.url(ENDPOINT)
+
+    def test_keywords_sent_as_given(self):
+        """Test keywords reach eBay unchanged while case and spacing variants share a cache key."""
+        a = BrowseSearchQuery(keywords="Nintendo  Switch OLED")
+        b = BrowseSearchQuery(keywords="nintendo switch oled")
+
+        assert _decoded(a.url(ENDPOINT))["q"] == "Nintendo  Switch OLED"
+        assert a.cache_key() == b.cache_key()
+        assert "q=nintendo+switch+oled" in a.cache_key()
+
+    @pytest.mark.parametrize("condition", sorted(BROWSE_CONDITION_MAP))
+    def test_condition_map(self, condition):
+        """Test each condition becomes its conditionIds filter."""
+        query = BrowseSearchQuery(keywords="switch", condition=condition)
+        assert query.filter_string == f"conditionIds:{{{BROWSE_CONDITION_MAP[condition]}}}"
+
+    @pytest.mark.parametrize("sort", sorted(BROWSE_SORT_MAP))
+    def test_sort_map(self, sort):
+        """Test each sort becomes its sort param."""
+        assert BrowseSearchQuery(keywords="switch", sort=sort).params["sort"] == BROWSE_SORT_MAP[sort]
+
+    @pytest.mark.parametrize("listing_type", sorted(BROWSE_BUYING_OPTIONS_MAP))
+    def test_buying_options_map(self, listing_type):
+        """Test each listing type becomes its buyingOptions filter."""
+        query = BrowseSearchQuery(keywords="switch", listing_type=listing_type)
+        assert query.filter_string == f"buyingOptions:{{{BROWSE_BUYING_OPTIONS_MAP[listing_type]}}}"
+
+    def test_unknown_values_dropped(self):
+        """Test unrecognised filter values are dropped rather than sent."""
+        query = BrowseSearchQuery(keywords="switch", condition="bogus", sort="nope", listing_type="swap")
+
+        assert query.condition is None and query.sort is None and query.listing_type is None
+        assert query.filter_string is None
+        assert "filter" not in query.params and "sort" not in query.params
+
+    def test_url_round_trip(self):
+        """Test the encoded URL decodes to the params, filters in order."""
+        query = BrowseSearchQuery(
+            keywords="switch oled & dock", condition="used", min_price=100, max_price=300,
+            listing_type="auction", uk_only=True, limit=20, offset=40,
+        )
+
+        url = query.url(ENDPOINT)
+
+        assert url.startswith(ENDPOINT + "?")
+        assert _decoded(url) == {
+            "q": "switch oled & dock",
+            "limit": "20",
+            "offset": "40",
+            "filter": "conditionIds:{3000},price:[100.0..],priceCurrency:GBP,price:[..300.0],priceCurrency:GBP,"
+                      "buyingOptions:{AUCTION},itemLocationCountry:GB",
+        }
+
+    def test_encoding_memoised(self):
+        """Test the encoded params are built once per query."""
+        query = BrowseSearchQuery(keywords="switch", condition="used")
+
+        assert query.query_string is query.query_string
+        assert query.params is query.params
+
+    def test_params_read_only(self):
+        """Test the memoised params cannot be modified by callers."""
+        with pytest.raises(TypeError):
+            BrowseSearchQuery(keywords="switch").params["q"] = "other"
+
+    def test_replace_keeps_canonical(self):
+        """Test dataclasses.replace yields a normalised query with its own encoding."""
+        query = BrowseSearchQuery(keywords="Switch", sort="PRICE_ASC")
+
+        page = dataclasses.replace(query, offset=200)
+
+        assert page.sort == "price_asc"
+        assert _decoded(page.url(ENDPOINT))["offset"] == "200"
+
+    def test_marketplace_in_key(self):
+        """Test the marketplace header is part of the cache key."""
+        a = BrowseSearchQuery(keywords="switch", marketplace="ebay_gb")
+        b = BrowseSearchQuery(keywords="switch", marketplace="EBAY_DE")
+
+        assert a.cache_key() != b.cache_key()
+        assert a.marketplace == "EBAY_GB"
+
+
+class TestFindingQuery:
+    """Tests for SearchQuery normalisation and encoding."""
+
+    def test_item_filters_numbered(self):
+        """Test item filters are numbered consecutively in a fixed order."""
+        query = SearchQuery(keywords="switch", sold=True, condition="used", max_price=200)
+
+        assert query.params["itemFilter(0).name"] == "SoldItemsOnly"
+        assert query.params["itemFilter(1).name"] == "Condition"
+        assert query.params["itemFilter(1).value"] == CONDITION_MAP["used"]
+        assert query.params["itemFilter(2).name"] == "MaxPrice"
+        assert query.params["itemFilter(2).value"] == "200.0"
+        assert "itemFilter(3).name" not in query.params
+
+    @pytest.mark.parametrize("sort", sorted(SORT_MAP))
+    def test_sort_map(self, sort):
+        """Test each sort becomes its sortOrder param."""
+        assert SearchQuery(keywords="switch", sort=sort).params["sortOrder"] == SORT_MAP[sort]
+
+    def test_operation(self):
+        """Test sold and active queries call different operations."""
+        assert SearchQuery(keywords="switch", sold=True).operation == "findCompletedItems"
+        assert SearchQuery(keywords="switch").params["OPERATION-NAME"] == "findItemsByKeywords"
+
+    def test_equivalent_queries_equal(self):
+        """Test normalised queries compare equal and share a key."""
+        a = SearchQuery(keywords="switch", condition="USED", min_price=5)
+        b = SearchQuery(keywords="switch", condition="used", min_price=5.0)
+
+        assert a == b
+        assert a.cache_key() == b.cache_key()
+
+    def test_keywords_sent_as_given(self):
+        """Test keywords reach eBay unchanged while case and spacing variants share a cache key."""
+        a = SearchQuery(keywords=" Switch  Lite ")
+        b = SearchQuery(keywords="switch lite")
+
+        assert a.params["keywords"] == " Switch  Lite "
+        assert a.cache_key() == b.cache_key()
+
+    def test_request_url(self):
+        """Test the request URL combines service and query params."""
+        config = Config(ebay_app_id="app-id", ebay_cert_id=None, ebay_oauth_token=None, max_results_per_page=25)
+        service = EbayFindingService(config, executor=object())
+        query = SearchQuery(keywords="switch lite", sold=True, page=2)
+
+        params = _decoded(service._request_url(query))
+
+        assert params == {**EbayFindingService._service_params(config), **_decoded("?" + query.query_string)}
+        assert params["SECURITY-APPNAME"] == "app-id"
+        assert params["paginationInput.entriesPerPage"] == "25"
+        assert params["paginationInput.pageNumber"] == "2"
+        assert params["keywords"] == "switch lite"
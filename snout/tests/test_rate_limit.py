@@ -0,0 +1,234 @@
+"""Tests for the shared rate-limit storage and the daily eBay quota."""
+import multiprocessing
+import time
+import pytest
+from limits import parse as parse_limit
+from limits.storage import MemoryStorage, storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.rate_limit import QuotaAccountant, QuotaExhaustedError, SqliteLimitStorage, seconds_until_reset
+from services.search_cache import MemoryCacheBackend, SearchCache
+
+
+def _hit_many(uri: str, count: int) -> None:
+    """Increment one counter count times through a fresh storage (run in a child process)."""
+    storage = storage_from_string(uri)
+    for _ in range(count):
+        storage.incr("shared", 60)
+
+
+@pytest.fixture
+def uri(tmp_path):
+    """URI of a fresh SQLite rate-limit database."""
+    return f"sqlite://{tmp_path / 'limits.sqlite3'}"
+
+
+class TestSqliteLimitStorage:
+    """Tests for SqliteLimitStorage."""
+
+    def test_scheme_registered(self, uri):
+        """Test sqlite:// URIs resolve to the SQLite storage."""
+        assert isinstance(storage_from_string(uri), SqliteLimitStorage)
+
+    def test_incr_get_clear(self, uri):
+        """Test counters increment, read back and clear."""
+        storage = storage_from_string(uri)
+
+        assert storage.incr("k", 60) == 1
+        assert storage.incr("k", 60, amount=2) == 3
+        assert storage.get("k") == 3
+        assert storage.get_expiry("k") > time.time()
+
+        storage.clear("k")
+        assert storage.get("k") == 0
+        assert storage.check()
+
+    def test_window_expires(self, uri):
+        """Test an expired counter starts a new window."""
+        storage = storage_from_string(uri)
+        storage.incr("k", 0.05)
+        time.sleep(0.06)
+
+        assert storage.get("k") == 0
+        assert storage.incr("k", 60) == 1
+
+    def test_shared_between_instances(self, uri):
+        """Test two storages on one file enforce a single limit."""
+        limit = parse_limit("3/minute")
+        first = FixedWindowRateLimiter(storage_from_string(uri))
+        second = FixedWindowRateLimiter(storage_from_string(uri))
+
+        results = [first.hit(limit, "client"), second.hit(limit, "client"), first.hit(limit, "client"),
+                   second.hit(limit, "client")]
+
+        assert results == [True, True, True, False]
+
+    def test_atomic_across_processes(self, uri):
+        """Test concurrent worker processes never lose an increment."""
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_hit_many, args=(uri, 50)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert storage_from_string(uri).get("shared") == 200
+
+
+class TestQuotaAccountant:
+    """Tests for QuotaAccountant."""
+
+    def test_spend_until_exhausted(self):
+        """Test calls are allowed up to the budget, then refused until reset."""
+        quota = QuotaAccountant(MemoryStorage(), {"browse": 3})
+
+        for _ in range(3):
+            quota.spend("browse")
+        with pytest.raises(QuotaExhaustedError) as exc_info:
+            quota.spend("browse")
+
+        assert 0 < exc_info.value.retry_after <= 86400
+        assert quota.used("browse") == 3
+
+    def test_cache_only_threshold(self):
+        """Test cache-only mode starts at the configured share of the budget."""
+        quota = QuotaAccountant(MemoryStorage(), {"browse": 10}, cache_only_fraction=0.8)
+
+        for _ in range(7):
+            quota.spend("browse")
+        assert not quota.cache_only("browse")
+
+        quota.spend("browse")
+        assert quota.cache_only("browse")
+
+    def test_zero_budget_unlimited(self):
+        """Test a budget of 0 never refuses or degrades."""
+        quota = QuotaAccountant(MemoryStorage(), {"finding": 0})
+
+        for _ in range(100):
+            quota.spend("finding")
+
+        assert not quota.cache_only("finding")
+        assert quota.metrics()["finding"]["remaining"] is None
+
+    def test_shared_through_storage(self, uri):
+        """Test accountants on one storage file draw on one budget."""
+        first = QuotaAccountant(storage_from_string(uri), {"browse": 2})
+        second = QuotaAccountant(storage_from_string(uri), {"browse": 2})
+
+        first.spend("browse")
+        second.spend("browse")
+
+        with pytest.raises(QuotaExhaustedError):
+            first.spend("browse")
+
+    def test_memory_storage_warning(self, uri, caplog):
+        """Test a quota counted in memory:// storage logs a startup warning."""
+        with caplog.at_level("WARNING", logger="snout.ratelimit"):
+            QuotaAccountant.from_config(Config("app", "cert", None))
+            QuotaAccountant.from_config(Config("app", "cert", None, ebay_daily_quota_browse=0, ebay_daily_quota_finding=0))
+            QuotaAccountant.from_config(Config("app", "cert", None, rate_limit_storage_uri=uri))
+
+        assert len(caplog.records) == 1
+        assert "each worker can spend the full budget" in caplog.records[0].getMessage()
+
+    def test_metrics(self):
+        """Test metrics report budget, usage and remaining calls."""
+        quota = QuotaAccountant(MemoryStorage(), {"browse": 5})
+        quota.spend("browse")
+
+        assert quota.metrics()["browse"] == {"budget": 5, "used": 1, "remaining": 4, "cache_only": False}
+
+    def test_seconds_until_reset(self):
+        """Test the quota day ends at UTC midnight."""
+        from datetime import datetime, timezone
+
+        assert seconds_until_reset(datetime(2026, 1, 1, 23, 59, 0, tzinfo=timezone.utc)) == 60
+
+
+@pytest.fixture
+def browse_service():
+    """Create a Browse service with a cache and a 10-call daily quota."""
+    config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+    cache = SearchCache(MemoryCacheBackend(), ttl=300, stale_ttl=300)
+    auth = MagicMock()
+    auth.get_token.return_value = "token"
+    quota = QuotaAccountant(MemoryStorage(), {"browse": 10}, cache_only_fraction=0.5)
+    return EbayBrowseService(config, auth, cache=cache, executor=MagicMock(), quota=quota)
+
+
+class TestServiceQuota:
+    """Tests for quota accounting inside the Browse service."""
+
+    def _item(self) -> BrowseItem:
+        """Helper to create a BrowseItem."""
+        return BrowseItem("Switch", 100.0, 0.0, 100.0, "GBP", "v1|1|0", "https://ebay.co.uk", "Used")
+
+    def test_upstream_calls_counted(self, browse_service, mock_browse_response):
+        """Test each upstream request spends one call."""
+        browse_service._make_request = MagicMock(return_value=mock_browse_response)
+
+        browse_service.search(BrowseSearchQuery(keywords="switch"))
+
+        assert browse_service._quota.used("browse") == 1
+
+    def test_low_quota_serves_cache_without_refresh(self, browse_service):
+        """Test past the threshold stale and bypassed cache entries are served without refreshing."""
+        query = BrowseSearchQuery(keywords="switch")
+        browse_service.cache.set(query.cache_key(), [self._item()], ttl=0)
+        for _ in range(5):
+            browse_service._quota.spend("browse")
+        browse_service._make_request = MagicMock()
+
+        items = browse_service.search(query, use_cache=False)
+
+        assert len(items) == 1
+        browse_service._make_request.assert_not_called()
+        browse_service._executor.submit.assert_not_called()
+
+    def test_exhausted_quota_fails(self, browse_service):
+        """Test a cache miss fails with the quota error once the budget is spent."""
+        for _ in range(10):
+            browse_service._quota.spend("browse")
+        browse_service._make_request = MagicMock()
+
+        with pytest.raises(BrowseApiError) as exc_info:
+            browse_service.search(BrowseSearchQuery(keywords="switch"))
+
+        assert isinstance(exc_info.value.__cause__, QuotaExhaustedError)
+        browse_service._make_request.assert_not_called()
+
+
+class TestEndpoints:
+    """Tests for quota state in HTTP responses."""
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_exhausted_quota_returns_503(self, mock_service, mock_config, client):
+        """Test an exhausted quota surfaces as 503 with Retry-After."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        error = BrowseApiError("quota")
+        error.__cause__ = QuotaExhaustedError("browse", 3600)
+        mock_service.search.side_effect = error
+
+        response = client.get("/api/search?q=switch")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3600"
+        assert "quota" in response.get_json()["error"]
+
+    def test_health_reports_quota(self, client):
+        """Test /health includes per-API quota usage."""
+        data = client.get("/health").get_json()
+
+        assert data["quota"]["browse"]["budget"] == 5000
+        assert "cache_only" in data["quota"]["finding"]
@@ -0,0 +1,335 @@
+"""Tests for upstream retries, hedging and circuit breaking."""
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+import requests
+from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.resilience import CircuitBreaker, CircuitOpenError, UpstreamGuard, is_retryable
+from services.search_cache import MemoryCacheBackend, SearchCache
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    """Build an HTTPError carrying a response with this status."""
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def _guard(**overrides) -> UpstreamGuard:
+    """Build a guard with no backoff delay."""
+    settings = {"attempts": 3, "base_delay": 0, "max_delay": 0, "failure_threshold": 2, "reset_timeout": 60}
+    settings.update(overrides)
+    return UpstreamGuard("test", **settings)
+
+
+class TestRetries:
+    """Tests for retry classification and backoff."""
+
+    def test_retryable_errors(self):
+        """Test timeouts, connection errors, 429 and 5xx are retryable and 4xx are not."""
+        assert is_retryable(requests.Timeout())
+        assert is_retryable(requests.ConnectionError())
+        assert is_retryable(_http_error(503))
+        assert is_retryable(_http_error(429))
+        assert is_retryable(httpx.ReadTimeout("slow"))
+        assert is_retryable(httpx.ConnectError("refused"))
+        assert is_retryable(httpx.HTTPStatusError("503", request=None, response=httpx.Response(503)))
+        assert not is_retryable(httpx.HTTPStatusError("404", request=None, response=httpx.Response(404)))
+        assert not is_retryable(_http_error(400))
+        assert not is_retryable(ValueError("bad json"))
+
+    def test_retries_until_success(self):
+        """Test a transient failure is retried and the result returned."""
+        guard = _guard()
+        fn = MagicMock(side_effect=[requests.Timeout(), _http_error(502), {"ok": True}])
+
+        assert guard.call(fn) == {"ok": True}
+        assert fn.call_count == 3
+        assert guard.retries == 2
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+
+    def test_gives_up_after_attempts(self):
+        """Test the last error is raised once attempts are used up."""
+        guard = _guard(attempts=2)
+        fn = MagicMock(side_effect=requests.Timeout("slow"))
+
+        with pytest.raises(requests.Timeout):
+            guard.call(fn)
+        assert fn.call_count == 2
+
+    def test_client_errors_not_retried(self):
+        """Test a 4xx is raised immediately and does not count against the circuit."""
+        guard = _guard()
+        fn = MagicMock(side_effect=_http_error(400))
+
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                guard.call(fn)
+
+        assert fn.call_count == 3
+        assert guard.breaker.state == CircuitBreaker.CLOSED
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test backoff delays fall within the exponential cap."""
+        guard = _guard(base_delay=0.1, max_delay=0.3)
+
+        delays = [guard.backoff(attempt) for attempt in range(5) for _ in range(50)]
+
+        assert all(0 <= d <= 0.3 for d in delays)
+        assert len(set(delays)) > 1
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker state changes."""
+
+    def test_opens_after_threshold(self):
+        """Test consecutive failed calls open the circuit and later calls fail fast."""
+        guard = _guard(attempts=1)
+        fn = MagicMock(side_effect=requests.ConnectionError())
+
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                guard.call(fn)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            guard.call(fn)
+
+        assert fn.call_count == 2
+        assert exc_info.value.retry_after > 0
+        assert guard.metrics()["state"] == "open"
+        assert guard.metrics()["trips"] == 1
+
+    def test_success_resets_failures(self):
+        """Test a success between failures keeps the circuit closed."""
+        breaker = CircuitBreaker("test", failure_threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_probe(self):
+        """Test one probe is let through after the timeout and closes the circuit on success."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failed probe re-opens the circuit and counts another trip."""
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.trips == 2
+
+
+class TestHedging:
+    """Tests for hedged requests."""
+
+    def test_no_hedge_without_history(self):
+        """Test calls run inline until enough latencies are known."""
+        guard = _guard(hedge=True)
+
+        assert guard.hedge_delay() is None
+        assert guard.call(lambda: threading.current_thread().name) == threading.current_thread().name
+
+    def test_slow_request_hedged(self):
+        """Test a request slower than p95 gets a duplicate, and the faster answer wins."""
+        guard = _guard(hedge=True, hedge_min_delay=0.01)
+        for _ in range(20):
+            guard.latency.add(0.01)
+        calls = []
+        lock = threading.Lock()
+
+        def fn():
+            with lock:
+                calls.append(None)
+                first = len(calls) == 1
+            if first:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        try:
+            started = time.perf_counter()
+            assert guard.call(fn) == "fast"
+            assert time.perf_counter() - started < 0.4
+            assert guard.hedges == 1
+            assert guard.hedge_wins == 1
+        finally:
+            guard.shutdown()
+
+    def test_fast_request_not_hedged(self):
+        """Test a request answering within p95 sends no duplicate."""
+        guard = _guard(hedge=True, hedge_min_delay=0.2)
+        for _ in range(20):
+            guard.latency.add(0.2)
+
+        try:
+            assert guard.call(lambda: "ok") == "ok"
+            assert guard.hedges == 0
+        finally:
+            guard.shutdown()
+
+
+class TestAsyncGuard:
+    """Tests for UpstreamGuard.acall."""
+
+    def test_retries_until_success(self):
+        """Test a transient failure is retried and the result returned."""
+        guard = _guard()
+        fn = AsyncMock(side_effect=[httpx.ReadTimeout("slow"), {"ok": True}])
+
+        assert asyncio.run(guard.acall(fn)) == {"ok": True}
+        assert fn.await_count == 2
+        assert guard.retries == 1
+
+    def test_breaker_shared_with_call(self):
+        """Test failures through acall open the circuit for call too, and vice versa."""
+        guard = _guard(attempts=1)
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                asyncio.run(guard.acall(AsyncMock(side_effect=httpx.ConnectError("refused"))))
+
+        with pytest.raises(CircuitOpenError):
+            guard.call(MagicMock())
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(guard.acall(AsyncMock()))
+
+    def test_cancelled_probe_released(self):
+        """Test a half-open probe cancelled mid-request frees the probe slot."""
+        guard = _guard(reset_timeout=0)
+        guard.breaker.record_failure()
+        guard.breaker.record_failure()
+
+        async def run():
+            task = asyncio.ensure_future(guard.acall(lambda: asyncio.sleep(10)))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+        assert guard.breaker.allow()
+
+    def test_slow_request_hedged(self):
+        """Test a request slower than p95 gets a duplicate, the faster answer wins and the other is cancelled."""
+        guard = _guard(hedge=True, hedge_min_delay=0.01)
+        for _ in range(20):
+            guard.latency.add(0.01)
+        calls = []
+
+        async def fn():
+            calls.append(None)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(0.5)
+                except asyncio.CancelledError:
+                    calls.append("cancelled")
+                    raise
+                return "slow"
+            return "fast"
+
+        async def run():
+            result = await guard.acall(fn)
+            await asyncio.sleep(0)
+            return result
+
+        try:
+            started = time.perf_counter()
+            assert asyncio.run(run()) == "fast"
+            assert time.perf_counter() - started < 0.4
+            assert guard.hedges == 1
+            assert guard.hedge_wins == 1
+            assert "cancelled" in calls
+        finally:
+            guard.shutdown()
+
+
+@pytest.fixture
+def browse_service():
+    """Create a Browse service with a cache and a quick-tripping guard."""
+    config = Config(ebay_app_id="app", ebay_cert_id="cert", ebay_oauth_token=None)
+    cache = SearchCache(MemoryCacheBackend(), ttl=300)
+    auth = MagicMock()
+    auth.get_token.return_value = "token"
+    return EbayBrowseService(config, auth, cache=cache, executor=MagicMock(), guard=_guard(attempts=1, failure_threshold=1))
+
+
+class TestServiceIntegration:
+    """Tests for the guard inside the Browse service."""
+
+    def _item(self) -> BrowseItem:
+        """Helper to create a BrowseItem."""
+        return BrowseItem("Switch", 100.0, 0.0, 100.0, "GBP", "v1|1|0", "https://ebay.co.uk", "Used")
+
+    def test_open_circuit_fails_fast(self, browse_service):
+        """Test searches raise BrowseApiError without calling eBay while the circuit is open."""
+        browse_service._make_request = MagicMock(side_effect=requests.Timeout())
+
+        with pytest.raises(BrowseApiError):
+            browse_service.search(BrowseSearchQuery(keywords="switch"))
+        with pytest.raises(BrowseApiError) as exc_info:
+            browse_service.search(BrowseSearchQuery(keywords="switch lite"))
+
+        assert isinstance(exc_info.value.__cause__, CircuitOpenError)
+        assert browse_service._make_request.call_count == 1
+
+    def test_open_circuit_serves_cache(self, browse_service):
+        """Test a cached result is served while open even when the cache is bypassed."""
+        query = BrowseSearchQuery(keywords="switch")
+        browse_service.cache.set(query.cache_key(), [self._item()])
+        browse_service.guard.breaker.record_failure()
+
+        items = browse_service.search(query, use_cache=False)
+
+        assert [i.item_id for i in items] == ["v1|1|0"]
+
+
+class TestEndpoints:
+    """Tests for circuit state in HTTP responses."""
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_open_circuit_returns_503(self, mock_service, mock_config, client):
+        """Test an open circuit surfaces as 503 with Retry-After."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        error = BrowseApiError("circuit open")
+        error.__cause__ = CircuitOpenError("browse", 12.3)
+        mock_service.search.side_effect = error
+
+        response = client.get("/api/search?q=switch")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "13"
+        assert response.get_json()["retry_after"] == 13
+
+    def test_health_reports_circuits(self, client):
+        """Test /health includes circuit state and trip counts."""
+        data = client.get("/health").get_json()
+
+        assert data["circuits"]["finding"]["state"] == "closed"
+        assert data["circuits"]["finding"]["trips"] == 0
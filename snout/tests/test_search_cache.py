@@ -0,0 +1,182 @@
+"""Tests for the search response cache."""
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_browse_service import BrowseItem, BrowseSearchQuery, EbayBrowseService
+from services.search_cache import (
+    CacheEntry,
+    DiskCacheBackend,
+    MemoryCacheBackend,
+    SearchCache,
+    build_search_cache,
+)
+
+
+def _make_config(**overrides) -> Config:
+    """Helper to create a Config with test credentials."""
+    return Config(
+        ebay_app_id="test_app_id",
+        ebay_cert_id="test_cert_id",
+        ebay_oauth_token=None,
+        **overrides,
+    )
+
+
+class TestBrowseCacheKey:
+    """Tests for BrowseSearchQuery.cache_key."""
+
+    def test_keywords_normalised(self):
+        """Test case and whitespace differences share a key."""
+        a = BrowseSearchQuery(keywords="Nintendo  Switch")
+        b = BrowseSearchQuery(keywords=" nintendo switch ")
+        assert a.cache_key() == b.cache_key()
+
+    def test_filters_normalised(self):
+        """Test filter case and int/float prices share a key."""
+        a = BrowseSearchQuery(keywords="switch", condition="USED", min_price=10, sort="Price_Asc")
+        b = BrowseSearchQuery(keywords="switch", condition="used", min_price=10.0, sort="price_asc")
+        assert a.cache_key() == b.cache_key()
+
+    def test_unknown_filter_ignored(self):
+        """Test filter values the request builder ignores do not split the key."""
+        a = BrowseSearchQuery(keywords="switch", condition="bogus")
+        b = BrowseSearchQuery(keywords="switch")
+        assert a.cache_key() == b.cache_key()
+
+    def test_pagination_distinguishes(self):
+        """Test different pages get different keys."""
+        a = BrowseSearchQuery(keywords="switch", offset=0)
+        b = BrowseSearchQuery(keywords="switch", offset=50)
+        assert a.cache_key() != b.cache_key()
+
+
+class TestSearchCache:
+    """Tests for SearchCache with both backends."""
+
+    @pytest.fixture(params=["memory", "disk"])
+    def backend(self, request, tmp_path):
+        """Create each backend type with a small size bound."""
+        if request.param == "memory":
+            return MemoryCacheBackend(max_entries=2)
+        return DiskCacheBackend(
+            str(tmp_path / "cache.sqlite3"),
+            encode=lambda value: value,
+            decode=lambda value: value,
+            max_entries=2,
+        )
+
+    def test_hit_and_miss_counters(self, backend):
+        """Test hits and misses are counted."""
+        cache = SearchCache(backend, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", "value")
+        assert cache.get("a") == "value"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_expired_entry_is_miss(self, backend):
+        """Test entries past their TTL are not returned."""
+        cache = SearchCache(backend, ttl=60)
+        cache.set("a", "value", ttl=-1)
+        assert cache.get("a") is None
+        assert len(backend) == 0
+
+    def test_lru_eviction(self, backend):
+        """Test the least recently used entry is evicted at the size bound."""
+        cache = SearchCache(backend, ttl=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("a") == "1"
+        assert cache.get("b") is None
+        assert cache.get("c") == "3"
+
+    def test_disk_backend_survives_restart(self, tmp_path):
+        """Test a new disk backend on the same file sees earlier entries."""
+        path = str(tmp_path / "cache.sqlite3")
+        first = DiskCacheBackend(path, encode=str, decode=str)
+        first.set("a", CacheEntry("value", 0, 2**40))
+
+        second = DiskCacheBackend(path, encode=str, decode=str)
+        assert second.get("a").value == "value"
+
+
+class TestBuildSearchCache:
+    """Tests for build_search_cache."""
+
+    def test_disabled(self):
+        """Test the none backend disables caching."""
+        assert build_search_cache(_make_config(search_cache_backend="none"), BrowseItem) is None
+
+    def test_disk_round_trips_items(self, tmp_path):
+        """Test the disk backend rebuilds BrowseItem objects."""
+        config = _make_config(
+            search_cache_backend="disk",
+            search_cache_path=str(tmp_path / "cache.sqlite3"),
+        )
+        cache = build_search_cache(config, BrowseItem)
+        item = BrowseItem("Switch", 100.0, 5.0, 105.0, "GBP", "v1|1|0", "https://ebay.co.uk/1", "Used")
+
+        cache.set("k", [item])
+        assert cache.get("k") == [item]
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            build_search_cache(_make_config(search_cache_backend="redis"), BrowseItem)
+
+
+class TestBrowseServiceCaching:
+    """Tests for caching inside EbayBrowseService.search."""
+
+    @pytest.fixture
+    def service(self, mock_browse_response):
+        """Create a Browse service with a memory cache and mocked HTTP session."""
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+        cache = SearchCache(MemoryCacheBackend(), ttl=60)
+        service = EbayBrowseService(_make_config(), auth, cache=cache)
+        service._session = MagicMock()
+        service._session.get.return_value.content = json.dumps(mock_browse_response).encode()
+        return service
+
+    def test_repeat_query_served_from_cache(self, service):
+        """Test an equivalent query does not hit eBay twice."""
+        first = service.search(BrowseSearchQuery(keywords="Switch"))
+        second = service.search(BrowseSearchQuery(keywords="switch"))
+
+        assert first == second
+        assert service._session.get.call_count == 1
+        assert service.cache.stats()["hits"] == 1
+
+    def test_bypass_refetches(self, service):
+        """Test use_cache=False goes upstream even when cached."""
+        service.search(BrowseSearchQuery(keywords="switch"))
+        service.search(BrowseSearchQuery(keywords="switch"), use_cache=False)
+
+        assert service._session.get.call_count == 2
+
+
+class TestApiSearchCacheBypass:
+    """Tests for the cache bypass parameter on /api/search."""
+
+    @patch("app.browse_service")
+    def test_cache_false_bypasses(self, mock_service, client):
+        """Test ?cache=false is passed through as use_cache=False."""
+        mock_service.search.return_value = []
+
+        response = client.get("/api/search?q=switch&cache=false")
+
+        assert response.status_code == 200
+        assert mock_service.search.call_args.kwargs["use_cache"] is False
@@ -0,0 +1,136 @@
+"""Tests for request coalescing and stale-while-revalidate."""
+import json
+import pytest
+import threading
+import time
+from unittest.mock import MagicMock
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from services.ebay_browse_service import BrowseSearchQuery, EbayBrowseService
+from services.ebay_service import EbayFindingService, SearchQuery
+from services.search_cache import MemoryCacheBackend, SearchCache
+from services.singleflight import SingleFlight
+
+
+def _make_config() -> Config:
+    """Helper to create a Config with test credentials."""
+    return Config(ebay_app_id="test_app_id", ebay_cert_id="test_cert_id", ebay_oauth_token=None)
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight.do."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test concurrent callers for one key run fn once."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "result"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", work)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        while flight.coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["result"] * 5
+
+    def test_error_propagates_to_followers(self):
+        """Test every waiting caller sees the leader's exception."""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def work():
+            release.wait(timeout=5)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                flight.do("k", work)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        while flight.coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+
+        assert len(errors) == 3
+        assert not flight.in_flight("k")
+
+    def test_sequential_calls_run_again(self):
+        """Test a finished call is not reused by later callers."""
+        flight = SingleFlight()
+        assert flight.do("k", lambda: 1) == 1
+        assert flight.do("k", lambda: 2) == 2
+
+
+class TestStaleWhileRevalidate:
+    """Tests for stale cache entries in the search services."""
+
+    @pytest.fixture
+    def browse_service(self, mock_browse_response):
+        """Create a Browse service with a cache that allows stale hits."""
+        auth = MagicMock()
+        auth.get_token.return_value = "token"
+        cache = SearchCache(MemoryCacheBackend(), ttl=60, stale_ttl=60)
+        service = EbayBrowseService(_make_config(), auth, cache=cache)
+        service._session = MagicMock()
+        service._session.get.return_value.content = json.dumps(mock_browse_response).encode()
+        return service
+
+    def test_stale_entry_served_and_refreshed(self, browse_service):
+        """Test a stale entry is returned immediately and refreshed in the background."""
+        query = BrowseSearchQuery(keywords="switch")
+        browse_service.cache.set(query.cache_key(), ["stale"], ttl=-1)
+
+        assert browse_service.search(query) == ["stale"]
+
+        deadline = time.time() + 5
+        while browse_service.cache.get(query.cache_key()) is None and time.time() < deadline:
+            time.sleep(0.01)
+
+        refreshed = browse_service.cache.get(query.cache_key())
+        assert len(refreshed) == 2
+        assert browse_service.cache.stats()["stale_hits"] == 1
+
+    def test_expired_beyond_stale_window_is_miss(self, browse_service):
+        """Test entries past the stale window are fetched synchronously."""
+        query = BrowseSearchQuery(keywords="switch")
+        browse_service.cache.set(query.cache_key(), ["old"], ttl=-120)
+
+        assert len(browse_service.search(query)) == 2
+
+    def test_finding_service_uses_cache(self, mock_ebay_sold_response):
+        """Test the Finding service serves repeat queries from its cache."""
+        cache = SearchCache(MemoryCacheBackend(), ttl=60)
+        service = EbayFindingService(_make_config(), cache=cache)
+        service._session = MagicMock()
+        service._session.get.return_value.content = json.dumps(mock_ebay_sold_response).encode()
+
+        service.search(SearchQuery(keywords="Switch", sold=True))
+        items = service.search(SearchQuery(keywords="switch", sold=True))
+
+        assert len(items) == 3
+        assert service._session.get.call_count == 1
@@ -0,0 +1,77 @@
+"""Tests for streamed /api/search responses."""
+import json
+from unittest.mock import patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ebay_browse_service import BrowseApiError, BrowseItem
+
+
+def _item(item_id: str, price: float) -> BrowseItem:
+    """Helper to create a BrowseItem."""
+    return BrowseItem(f"Item {item_id}", price, 0.0, price, "GBP", item_id, f"https://ebay.co.uk/{item_id}", "Used")
+
+
+class TestNdjsonStream:
+    """Tests for stream=ndjson."""
+
+    @patch("app.browse_service")
+    def test_frames(self, mock_service, client):
+        """Test a query frame, one frame per unique item and a final stats frame."""
+        mock_service.iter_pages.return_value = iter([
+            [_item("1", 100.0), _item("2", 200.0)],
+            [_item("2", 200.0), _item("3", 300.0)],
+        ])
+
+        response = client.get("/api/search?q=switch&deep=400&stream=ndjson")
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        frames = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [f["type"] for f in frames] == ["query", "item", "item", "item", "stats"]
+        assert frames[0]["query"] == "switch"
+        assert frames[-1]["stats"]["count"] == 3
+        assert frames[-1]["stats"]["average"] == 200.0
+        assert frames[-1]["pagination"]["returned"] == 3
+
+    @patch("app.browse_service")
+    def test_upstream_error_frame(self, mock_service, client):
+        """Test a failure mid-stream ends with an error frame."""
+        def pages(*args, **kwargs):
+            yield [_item("1", 100.0)]
+            raise BrowseApiError("boom")
+
+        mock_service.iter_pages.side_effect = pages
+
+        response = client.get("/api/search?q=switch&stream=ndjson")
+
+        frames = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert frames[-1]["type"] == "error"
+
+    def test_invalid_format(self, client):
+        """Test an unknown stream format is rejected."""
+        with patch("app.browse_service"):
+            response = client.get("/api/search?q=switch&stream=xml")
+
+        assert response.status_code == 400
+        assert response.get_json()["field"] == "stream"
+
+
+class TestSseStream:
+    """Tests for stream=sse."""
+
+    @patch("app.browse_service")
+    def test_events(self, mock_service, client):
+        """Test frames are framed as server-sent events."""
+        mock_service.iter_pages.return_value = iter([[_item("1", 100.0)]])
+
+        response = client.get("/api/search?q=switch&stream=sse")
+
+        assert response.mimetype == "text/event-stream"
+        body = response.get_data(as_text=True)
+        events = [block for block in body.split("\n\n") if block]
+        assert events[0].startswith("event: query\ndata: ")
+        assert events[1].startswith("event: item\ndata: ")
+        assert events[-1].startswith("event: stats\ndata: ")
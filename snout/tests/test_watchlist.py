@@ -0,0 +1,459 @@
+"""Tests for the background watchlist refresher."""
+import asyncio
+import json
+import time
+import pytest
+from limits.storage import MemoryStorage
+from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asgi import SnoutASGI
+from config import Config
+from services.ebay_browse_service import BrowseApiError, BrowseItem, BrowseSearchQuery
+from services.fanout import FanOutExecutor
+from services.rate_limit import QuotaAccountant
+from services.watchlist import MemoryWatchlistStore, SqliteWatchlistStore, Watchlist, WatchlistFullError, watch_id
+
+
+def _items(*prices: float) -> list[BrowseItem]:
+    """Helper to create BrowseItems with the given total prices."""
+    return [
+        BrowseItem(f"Switch {i}", price, 0.0, price, "GBP", f"v1|{i}|0", f"https://ebay.co.uk/itm/{i}", "Used")
+        for i, price in enumerate(prices)
+    ]
+
+
+class InlineExecutor:
+    """Executor running each call immediately, or holding it when paused."""
+
+    def __init__(self):
+        self.paused = False
+        self.held = []
+
+    def submit(self, fn, *args):
+        if self.paused:
+            self.held.append((fn, args))
+        else:
+            fn(*args)
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Manually advanced clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def search():
+    """Search function returning two items."""
+    return MagicMock(return_value=_items(100.0, 110.0))
+
+
+@pytest.fixture
+def watchlist(search, clock):
+    """Watchlist on an inline executor and a fake clock."""
+    return Watchlist(
+        search, InlineExecutor(), workers=2, min_interval=60, max_interval=3600, initial_interval=300,
+        max_entries=10, change_threshold=0.05, clock=clock,
+    )
+
+
+class TestRegistration:
+    """Tests for adding and removing watched queries."""
+
+    @patch.object(Watchlist, "_start")
+    def test_add_is_idempotent(self, _start, watchlist):
+        """Test equivalent queries share one entry and id."""
+        first = watchlist.add([BrowseSearchQuery(keywords="Switch")])
+        second = watchlist.add([BrowseSearchQuery(keywords="switch")])
+
+        assert first[0] is second[0]
+        assert first[0].id == watch_id(BrowseSearchQuery(keywords="switch"))
+        assert len(watchlist.entries()) == 1
+
+    @patch.object(Watchlist, "_start")
+    def test_full_adds_nothing(self, _start, watchlist):
+        """Test a registration that does not fit is refused whole."""
+        watchlist.add([BrowseSearchQuery(keywords=f"item {i}") for i in range(8)])
+
+        with pytest.raises(WatchlistFullError):
+            watchlist.add([BrowseSearchQuery(keywords=f"other {i}") for i in range(3)])
+
+        assert len(watchlist.entries()) == 8
+
+    @patch.object(Watchlist, "_start")
+    def test_remove(self, _start, watchlist):
+        """Test removed queries are no longer watched."""
+        entry = watchlist.add([BrowseSearchQuery(keywords="switch")])[0]
+
+        assert watchlist.remove(entry.id)
+        assert not watchlist.remove(entry.id)
+        assert watchlist.entries() == []
+
+
+class TestRefresh:
+    """Tests for scheduled refreshes and snapshots."""
+
+    @patch.object(Watchlist, "_start")
+    def test_refresh_stores_snapshot(self, _start, watchlist, search):
+        """Test a due entry is refreshed and its snapshot served while fresh."""
+        query = BrowseSearchQuery(keywords="switch")
+        entry = watchlist.add([query])[0]
+
+        assert watchlist.snapshot(query) is None
+        assert watchlist.run_due() == 1
+
+        search.assert_called_once_with(query)
+        assert entry.stats.count == 2 and entry.stats.median == 105.0
+        assert len(watchlist.snapshot(query)) == 2
+        assert watchlist.run_due() == 0
+
+    @patch.object(Watchlist, "_start")
+    def test_snapshot_expires_with_interval(self, _start, watchlist, clock):
+        """Test a snapshot older than its interval is not served."""
+        query = BrowseSearchQuery(keywords="switch")
+        watchlist.add([query])
+        watchlist.run_due()
+
+        clock.now += 301
+
+        assert watchlist.snapshot(query) is None
+
+    @patch.object(Watchlist, "_start")
+    def test_snapshot_age_capped(self, _start, search, clock):
+        """Test a snapshot is not served past the maximum age even within a longer interval."""
+        watchlist = Watchlist(
+            search, InlineExecutor(), initial_interval=3600, max_interval=3600, max_snapshot_age=300, clock=clock
+        )
+        query = BrowseSearchQuery(keywords="switch")
+        watchlist.add([query])
+        watchlist.run_due()
+
+        clock.now += 300
+        assert watchlist.snapshot(query) is not None
+        clock.now += 1
+        assert watchlist.snapshot(query) is None
+
+    @patch.object(Watchlist, "_start")
+    def test_workers_bound_refreshes(self, _start, watchlist):
+        """Test no more than workers refreshes are in flight."""
+        watchlist._executor.paused = True
+        watchlist.add([BrowseSearchQuery(keywords=f"item {i}") for i in range(5)])
+
+        assert watchlist.run_due() == 2
+        assert watchlist.run_due() == 0
+        assert watchlist.metrics()["in_flight"] == 2
+
+        fn, args = watchlist._executor.held.pop(0)
+        fn(*args)
+        assert watchlist.run_due() == 1
+
+    @patch.object(Watchlist, "_start")
+    def test_failure_recorded_and_rescheduled(self, _start, watchlist, search, clock):
+        """Test a failed refresh keeps the old snapshot and waits an interval."""
+        query = BrowseSearchQuery(keywords="switch")
+        entry = watchlist.add([query])[0]
+        search.side_effect = BrowseApiError("down")
+
+        watchlist.run_due()
+
+        assert entry.failures == 1
+        assert entry.last_error == "down"
+        assert entry.next_due == clock.now + 300
+        assert watchlist.metrics()["failures"] == 1
+
+    @patch.object(Watchlist, "_start")
+    def test_low_quota_postpones(self, _start, search, clock):
+        """Test due refreshes are postponed while the quota is cache-only."""
+        quota = QuotaAccountant(MemoryStorage(), {"browse": 2}, cache_only_fraction=0.5)
+        quota.spend("browse")
+        watchlist = Watchlist(search, InlineExecutor(), quota=quota, initial_interval=300, clock=clock)
+        entry = watchlist.add([BrowseSearchQuery(keywords="switch")])[0]
+
+        assert watchlist.run_due() == 0
+
+        search.assert_not_called()
+        assert entry.next_due == clock.now + 300
+        assert watchlist.metrics()["quota_deferrals"] == 1
+
+
+class TestAdaptiveInterval:
+    """Tests for refresh cadence following price movement."""
+
+    def _refresh_with(self, watchlist, search, clock, entry, *prices):
+        """Helper to run the next refresh returning items at prices."""
+        search.return_value = _items(*prices)
+        clock.now = entry.next_due
+        watchlist.run_due()
+
+    @patch.object(Watchlist, "_start")
+    def test_stable_prices_slow_down(self, _start, watchlist, search, clock):
+        """Test unchanged prices lengthen the interval up to the maximum."""
+        entry = watchlist.add([BrowseSearchQuery(keywords="switch")])[0]
+        watchlist.run_due()
+
+        self._refresh_with(watchlist, search, clock, entry, 100.0, 110.0)
+        assert entry.interval == 450
+
+        for _ in range(10):
+            self._refresh_with(watchlist, search, clock, entry, 100.0, 110.0)
+        assert entry.interval == 3600
+
+    @patch.object(Watchlist, "_start")
+    def test_moving_prices_speed_up(self, _start, watchlist, search, clock):
+        """Test a median move past the threshold halves the interval down to the minimum."""
+        entry = watchlist.add([BrowseSearchQuery(keywords="switch")])[0]
+        watchlist.run_due()
+
+        self._refresh_with(watchlist, search, clock, entry, 120.0, 130.0)
+        assert entry.interval == 150
+
+        for price in (150.0, 180.0, 220.0):
+            self._refresh_with(watchlist, search, clock, entry, price)
+        assert entry.interval == 60
+
+
+class TestScheduler:
+    """Tests for the background scheduler thread."""
+
+    def test_refreshes_in_background(self, search):
+        """Test registering a query gets it refreshed without calling run_due."""
+        executor = FanOutExecutor(2)
+        watchlist = Watchlist(search, executor, initial_interval=60)
+        query = BrowseSearchQuery(keywords="switch")
+        try:
+            watchlist.add([query])
+            deadline = time.monotonic() + 5
+            while watchlist.snapshot(query) is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert watchlist.snapshot(query) is not None
+            assert watchlist.metrics()["refreshes"] == 1
+        finally:
+            watchlist.close()
+            executor.shutdown()
+
+    def test_store_read_without_lock(self, search):
+        """Test the scheduler reads the next due time without holding the watchlist lock."""
+        executor = InlineExecutor()
+        executor.paused = True  # no refresh thread can take the lock meanwhile
+        store = MemoryWatchlistStore()
+        watchlist = Watchlist(search, executor, store=store, initial_interval=60)
+        lock_held = []
+        next_due = store.next_due
+
+        def recording_next_due(now):
+            lock_held.append(watchlist._lock.locked())
+            return next_due(now)
+
+        store.next_due = recording_next_due
+        try:
+            watchlist.add([BrowseSearchQuery(keywords="switch")])
+            deadline = time.monotonic() + 5
+            while not lock_held and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            watchlist.close()
+
+        assert lock_held and not any(lock_held)
+
+
+class TestSharedStore:
+    """Tests for a watchlist shared by worker processes through SQLite."""
+
+    def _worker(self, path, search, clock, **overrides) -> Watchlist:
+        """Helper to build one worker's watchlist on the shared file."""
+        settings = {"initial_interval": 300, "max_entries": 3, "clock": clock}
+        settings.update(overrides)
+        return Watchlist(search, InlineExecutor(), store=SqliteWatchlistStore(str(path)), **settings)
+
+    @patch.object(Watchlist, "_start")
+    def test_registry_shared(self, _start, tmp_path, search, clock):
+        """Test entries registered or removed in one worker are seen by another."""
+        path = tmp_path / "shared.sqlite3"
+        first, second = self._worker(path, search, clock), self._worker(path, search, clock)
+
+        entry = first.add([BrowseSearchQuery(keywords="switch", condition="used")])[0]
+
+        assert [e.id for e in second.entries()] == [entry.id]
+        assert second.entries()[0].query == BrowseSearchQuery(keywords="switch", condition="used")
+        with pytest.raises(WatchlistFullError):
+            second.add([BrowseSearchQuery(keywords=f"item {i}") for i in range(3)])
+        assert second.remove(entry.id)
+        assert first.entries() == []
+
+    @patch.object(Watchlist, "_start")
+    def test_refreshed_once_across_workers(self, _start, tmp_path, search, clock):
+        """Test a due entry is refreshed by one worker and its snapshot served by all."""
+        path = tmp_path / "shared.sqlite3"
+        first, second = self._worker(path, search, clock), self._worker(path, search, clock)
+        query = BrowseSearchQuery(keywords="switch")
+        first.add([query])
+
+        assert first.run_due() + second.run_due() == 1
+
+        search.assert_called_once_with(query)
+        assert second.snapshot(query) == _items(100.0, 110.0)
+        entry = second.entries()[0]
+        assert entry.stats.median == 105.0
+        assert entry.refreshes == 1
+        assert entry.next_due == clock.now + 300
+
+    @patch.object(Watchlist, "_start")
+    def test_claimed_entry_not_refreshed_twice(self, _start, tmp_path, search, clock):
+        """Test an entry claimed by one worker is skipped by another until its lease expires."""
+        path = tmp_path / "shared.sqlite3"
+        first, second = self._worker(path, search, clock), self._worker(path, search, clock)
+        first._executor.paused = True
+        first.add([BrowseSearchQuery(keywords="switch")])
+
+        assert first.run_due() == 1
+        assert second.run_due() == 0
+
+        clock.now += 601
+        assert second.run_due() == 1
+
+    @patch.object(Watchlist, "_start")
+    def test_removed_during_refresh_stays_removed(self, _start, tmp_path, search, clock):
+        """Test finishing a refresh does not bring back an entry removed meanwhile."""
+        watchlist = self._worker(tmp_path / "shared.sqlite3", search, clock)
+        watchlist._executor.paused = True
+        entry = watchlist.add([BrowseSearchQuery(keywords="switch")])[0]
+        watchlist.run_due()
+
+        watchlist.remove(entry.id)
+        fn, args = watchlist._executor.held.pop(0)
+        fn(*args)
+
+        assert watchlist.entries() == []
+        assert watchlist.metrics()["in_flight"] == 0
+
+    def test_from_config_uses_sqlite_rate_limit_storage(self, tmp_path, search):
+        """Test the watchlist is shared when rate limits are stored in SQLite, with the cache TTL as max age."""
+        path = tmp_path / "limits.sqlite3"
+        config = Config("app", "cert", None, rate_limit_storage_uri=f"sqlite://{path}", search_cache_ttl=120)
+
+        watchlist = Watchlist.from_config(config, search, InlineExecutor())
+
+        assert watchlist.metrics()["shared"] is True
+        assert watchlist._store.path == str(path)
+        assert watchlist._max_snapshot_age == 120
+        assert Watchlist.from_config(Config("app", "cert", None), search, InlineExecutor()).metrics()["shared"] is False
+
+
+@pytest.fixture
+def app_watchlist(search, clock):
+    """Inline watchlist patched into the app, with rate limits off."""
+    watchlist = Watchlist(search, InlineExecutor(), initial_interval=300, clock=clock)
+    with patch("app.watchlist", watchlist), patch.object(Watchlist, "_start"), patch("app.limiter.enabled", False):
+        yield watchlist
+
+
+class TestEndpoints:
+    """Tests for the /api/watchlist endpoints and snapshot-backed searches."""
+
+    @patch("app.browse_service")
+    def test_register_list_remove(self, mock_service, client, app_watchlist):
+        """Test queries can be registered, listed and removed."""
+        response = client.post("/api/watchlist", json={"queries": [{"q": "switch", "condition": "used"}]})
+
+        assert response.status_code == 201
+        entry = response.get_json()["entries"][0]
+        assert entry["query"]["keywords"] == "switch"
+        assert entry["query"]["condition"] == "used"
+
+        listed = client.get("/api/watchlist").get_json()
+        assert [e["id"] for e in listed["entries"]] == [entry["id"]]
+
+        assert client.delete(f"/api/watchlist/{entry['id']}").status_code == 204
+        assert client.delete(f"/api/watchlist/{entry['id']}").status_code == 404
+
+    @patch("app.browse_service")
+    def test_register_validates(self, mock_service, client, app_watchlist):
+        """Test invalid specs are rejected before anything is registered."""
+        response = client.post("/api/watchlist", json={"queries": [{"q": "switch"}, {"condition": "used"}]})
+
+        assert response.status_code == 400
+        assert app_watchlist.entries() == []
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_search_served_from_snapshot(self, mock_service, mock_config, client, app_watchlist, search):
+        """Test a watched query is answered from its fresh snapshot."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_config.default_marketplace = "EBAY_GB"
+        app_watchlist.add([BrowseSearchQuery(keywords="switch", marketplace="EBAY_GB")])
+        app_watchlist.run_due()
+
+        response = client.get("/api/search?q=switch")
+
+        assert response.status_code == 200
+        assert response.get_json()["stats"]["count"] == 2
+        mock_service.search.assert_not_called()
+        assert app_watchlist.metrics()["snapshot_hits"] == 1
+
+    @patch("app.config")
+    @patch("app.browse_service")
+    def test_cache_bypass_skips_snapshot(self, mock_service, mock_config, client, app_watchlist):
+        """Test cache=false goes upstream even for a watched query."""
+        mock_config.is_ebay_configured = True
+        mock_config.max_keyword_length = 1000
+        mock_config.default_marketplace = "EBAY_GB"
+        mock_service.search.return_value = _items(50.0)
+        app_watchlist.add([BrowseSearchQuery(keywords="switch", marketplace="EBAY_GB")])
+        app_watchlist.run_due()
+
+        response = client.get("/api/search?q=switch&cache=false")
+
+        assert response.status_code == 200, response.get_json()
+        assert response.get_json()["stats"]["count"] == 1
+        mock_service.search.assert_called_once()
+
+    def test_asgi_search_served_from_snapshot(self, app, app_watchlist):
+        """Test the ASGI /api/search route answers a watched query from its snapshot."""
+        app_watchlist.add([BrowseSearchQuery(keywords="switch", marketplace="EBAY_GB")])
+        app_watchlist.run_due()
+        browse = AsyncMock()
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/search",
+            "query_string": b"q=switch&marketplace=EBAY_GB",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+        }
+        asyncio.run(SnoutASGI(app, browse)(scope, receive, send))
+
+        assert messages[0]["status"] == 200
+        assert json.loads(messages[1]["body"])["stats"]["count"] == 2
+        browse.search.assert_not_called()
+
+    def test_index_lists_watchlist(self, client):
+        """Test the API index lists the watchlist endpoint."""
+        assert "/api/watchlist" in client.get("/").get_json()["endpoints"]
+
+    def test_health_reports_watchlist(self, client):
+        """Test /health includes watchlist metrics."""
+        assert "entries" in client.get("/health").get_json()["watchlist"]
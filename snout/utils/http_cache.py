@@ -0,0 +1,142 @@
+"""
+HTTP caching semantics for JSON search responses.
+
+Strong ETags are a hash of the encoded body, so an identical result set
+gives an identical validator and ``If-None-Match`` revalidations can be
+answered with ``304 Not Modified``. Large bodies are compressed with brotli
+(when installed) or gzip; compressed representations get their own ETag
+(``"<hash>-gzip"``) as RFC 9110 requires, but match the same validators.
+"""
+import gzip
+import hashlib
+from dataclasses import dataclass
+
+try:
+    import brotli
+except ImportError:  # optional: brotli-compressed responses
+    brotli = None
+
+# Levels that trade a little ratio for speed on per-request compression
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Cache-Control settings for one endpoint."""
+
+    max_age: int
+    stale_while_revalidate: int = 0
+
+    def header(self) -> str:
+        """Render the Cache-Control header value."""
+        if self.max_age <= 0:
+            return "no-cache"
+        value = f"public, max-age={self.max_age}"
+        if self.stale_while_revalidate > 0:
+            value += f", stale-while-revalidate={self.stale_while_revalidate}"
+        return value
+
+
+def strong_etag(body: bytes) -> str:
+    """Quoted strong entity tag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _base_tag(tag: str) -> str:
+    """Strip the weak prefix and any content-coding suffix from an entity tag."""
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ('-gzip"', '-br"'):
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag.
+
+    Uses weak comparison, as RFC 9110 specifies for If-None-Match, and treats
+    the compressed and identity representations of one body as equal.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _base_tag(etag)
+    return any(_base_tag(tag.strip()) == target for tag in if_none_match.split(","))
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Returns:
+        "br" (if brotli is installed), "gzip", or None for identity
+    """
+    if not accept_encoding:
+        return None
+
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    for coding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with the negotiated content coding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def cacheable_response(
+    body: bytes,
+    policy: CachePolicy,
+    if_none_match: str | None,
+    accept_encoding: str | None,
+    vary: tuple[str, ...] = ("Accept-Encoding",),
+    min_compress_size: int = 1024,
+) -> tuple[int, bytes, dict[str, str]]:
+    """
+    Add validators and caching headers to a 200 JSON body.
+
+    Args:
+        body: Encoded response body
+        policy: Cache-Control settings for the endpoint
+        if_none_match: The request's If-None-Match header
+        accept_encoding: The request's Accept-Encoding header
+        vary: Request headers the response varies on
+        min_compress_size: Bodies smaller than this many bytes are sent as-is
+
+    Returns:
+        Tuple of (status, body, headers): 304 with an empty body when the
+        client's validator matches, else 200 with the possibly compressed body
+    """
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= min_compress_size else None
+    etag = strong_etag(body)
+    if encoding is not None:
+        etag = f'{etag[:-1]}-{encoding}"'
+
+    headers = {"ETag": etag, "Cache-Control": policy.header(), "Vary": ", ".join(vary)}
+    if etag_matches(if_none_match, etag):
+        return 304, b"", headers
+
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return 200, body, headers
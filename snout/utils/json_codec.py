@@ -0,0 +1,41 @@
+"""
+JSON decoding and encoding, using orjson when it is installed.
+
+orjson parses eBay responses and encodes response bodies several times
+faster than the standard library; without it these fall back to ``json``
+with the same results.
+"""
+import json
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, default: Callable[[Any], Any] | None = None, sort_keys: bool = False) -> bytes:
+    """
+    Encode obj as compact UTF-8 JSON.
+
+    Args:
+        obj: Value to encode
+        default: Called for objects the encoder does not support natively
+        sort_keys: Whether to sort object keys
+
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(
+        obj, default=default, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False
+    ).encode()
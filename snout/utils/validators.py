@@ -66,6 +66,11 @@ def validate_keywords(
     return keywords
 
 
+def normalize_keyword(keywords: str) -> str:
+    """Fold case and whitespace so equivalent searches share cache and history keys."""
+    return " ".join(keywords.lower().split())
+
+
 def validate_price(
     value: float | None,
     field_name: str,
@@ -6,7 +6,7 @@ function estimateTimeToSell(market) {
   if (!market) return null;
 
   const { activeCount, soldCount } = market;
-  if (soldCount === null || soldCount === undefined) return null;
+  if (soldCount == null || activeCount == null) return null;
 
   const total = soldCount + activeCount;
   if (total === 0) return { label: "No data", bg: "bg-slate-700 text-slate-400" };
@@ -166,7 +166,7 @@ export default function ItemCard({ item, market, includeTax }) {
             <span className="text-slate-500">
               {formatGBP(fees)} fees + £2.80 P&P
             </span>
-            {market && (
+            {market && market.activeCount !== null && (
               <span className="rounded-full bg-slate-700 px-2 py-0.5 text-slate-300">
                 {market.activeCount} listed
                 {market.soldCount !== null && ` / ${market.soldCount} sold`}
@@ -1,5 +1,5 @@
 import { useState, useCallback } from "react";
-import { searchItems, searchSoldCount } from "../utils/api";
+import { searchCompare, searchItems } from "../utils/api";
 
 const MOCK_ITEMS = [
   { title: "Sony WH-1000XM5 Wireless Noise Cancelling Headphones - Black", item_price: 189.99, shipping_cost: 0, total_price: 189.99, condition: "New", url: "#", image_url: "https://placehold.co/160x160/1e293b/f59e0b?text=XM5" },
@@ -49,24 +49,22 @@ export function useSearch() {
     }
 
     try {
-      // Fire active + sold searches in parallel
-      const [data, soldData] = await Promise.all([
-        searchItems(keywords, filters, offset),
-        offset === 0 && !filters.showSold
-          ? searchSoldCount(keywords).catch(() => null)
-          : Promise.resolve(null),
-      ]);
-
-      const activeCount = data.pagination?.total || data.items?.length || 0;
+      // First page of active listings: the server fetches sold data alongside
+      const withMarket = offset === 0 && !filters.showSold;
+      const data = withMarket
+        ? await searchCompare(keywords, filters)
+        : await searchItems(keywords, filters, offset);
 
       setResults((prev) => (offset === 0 ? data.items : [...prev, ...data.items]));
       setStats(data.stats);
       setPagination(data.pagination);
 
-      if (soldData) {
-        setMarket({ activeCount, soldCount: soldData.soldCount, soldAvg: soldData.soldAvg });
-      } else if (offset === 0) {
-        setMarket({ activeCount, soldCount: null, soldAvg: null });
+      if (withMarket) {
+        setMarket({
+          activeCount: data.market.active_count,
+          soldCount: data.market.sold_count,
+          soldAvg: data.sold?.stats?.average ?? null,
+        });
       }
     } catch (err) {
       setError(err.message || "Search failed");
@@ -3,15 +3,30 @@ const API_KEY = import.meta.env.VITE_SNOUT_API_KEY || "";
 
 const headers = API_KEY ? { "X-Snout-Key": API_KEY } : {};
 
-export async function searchSoldCount(keywords) {
+function browseParams(keywords, filters = {}, offset = 0) {
   const params = new URLSearchParams({ q: keywords });
-  const response = await fetch(`${API_URL}/search/sold?${params}`, { headers });
-  if (!response.ok) return null;
-  const data = await response.json();
-  return {
-    soldCount: data.stats?.count || 0,
-    soldAvg: data.stats?.average || 0,
-  };
+
+  if (filters.condition) params.set("condition", filters.condition);
+  if (filters.minPrice) params.set("min_price", filters.minPrice);
+  if (filters.maxPrice) params.set("max_price", filters.maxPrice);
+  if (filters.sort) params.set("sort", filters.sort);
+  if (filters.listingType) params.set("listing_type", filters.listingType);
+  if (filters.ukOnly) params.set("uk_only", "true");
+  if (offset > 0) params.set("offset", String(offset));
+  return params;
+}
+
+// Active listings plus sold stats and market summary in one round trip.
+export async function searchCompare(keywords, filters = {}) {
+  const params = browseParams(keywords, filters);
+  const response = await fetch(`${API_URL}/api/compare?${params}`, { headers });
+
+  if (!response.ok) {
+    const body = await response.json().catch(() => ({}));
+    throw new Error(body.error || `Search failed (${response.status})`);
+  }
+
+  return response.json();
 }
 
 export async function searchItems(keywords, filters = {}, offset = 0) {
@@ -36,11 +51,7 @@ export async function searchItems(keywords, filters = {}, offset = 0) {
   }
 
   // Active listings: Browse API supports all filters.
-  if (filters.listingType) params.set("listing_type", filters.listingType);
-  if (filters.ukOnly) params.set("uk_only", "true");
-  if (offset > 0) params.set("offset", String(offset));
-
-  const response = await fetch(`${API_URL}/api/search?${params}`, { headers });
+  const response = await fetch(`${API_URL}/api/search?${browseParams(keywords, filters, offset)}`, { headers });
 
   if (!response.ok) {
     const body = await response.json().catch(() => ({}));